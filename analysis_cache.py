@@ -0,0 +1,116 @@
+import sys
+import json
+import zlib
+import struct
+import hashlib
+from array import array
+from pathlib import Path
+from typing import Union
+from cache_directory import CacheDirectory
+from pdf_analyzer import PDFResumeAnalyzer, TextBlockTable, ANALYZER_VERSION
+
+# Entry layout: MAGIC, then a zlib-compressed payload of
+#   uint32 metadata length | metadata JSON | raw column arrays
+MAGIC = b"RAC1"
+ARRAY_COLUMNS = ("x0", "y0", "x1", "y1", "font_size", "font_id", "color", "page_num")
+
+def hash_pdf(pdf_source: Union[str, Path, bytes]) -> str:
+    """SHA-256 of the PDF content (file path or raw bytes)"""
+    digest = hashlib.sha256()
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        digest.update(pdf_source)
+    else:
+        with open(pdf_source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """
+    Persistent, size-bounded cache of PDFResumeAnalyzer results
+
+    Entries are keyed by PDF content hash plus ANALYZER_VERSION, and hold the
+    extracted text blocks, section ranges and layout info. Least recently
+    used entries are evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = ".analysis_cache", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = CacheDirectory(cache_dir, "*.rac", max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.directory.path(f"{content_hash}.v{ANALYZER_VERSION}.rac")
+
+    def load(self, analyzer: PDFResumeAnalyzer, content_hash: str) -> bool:
+        """
+        Restore analysis results into analyzer if cached
+
+        Returns:
+            bool: True on a cache hit
+        """
+        path = self._entry_path(content_hash)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            table, meta = self._decode(data)
+        except (OSError, ValueError, zlib.error, struct.error, KeyError):
+            # Missing, truncated or foreign entries are treated as misses
+            self.misses += 1
+            return False
+
+        analyzer.restore_analysis(
+            table,
+            {name: tuple(r) for name, r in meta["section_ranges"].items()},
+            meta["layout_info"]
+        )
+
+        self.directory.touch(path)
+        self.hits += 1
+        return True
+
+    def store(self, analyzer: PDFResumeAnalyzer, content_hash: str):
+        """Persist the analyzer's current results"""
+        self.directory.write(self._entry_path(content_hash), self._encode(analyzer), "analysis")
+
+    def _encode(self, analyzer: PDFResumeAnalyzer) -> bytes:
+        table = analyzer.text_blocks
+        meta = {
+            "byteorder": sys.byteorder,
+            "fonts": table.fonts,
+            "text": table.text,
+            "section_ranges": analyzer.section_ranges,
+            "layout_info": analyzer.get_layout_info()
+        }
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        parts = [struct.pack("<I", len(meta_bytes)), meta_bytes]
+        parts.extend(getattr(table, column).tobytes() for column in ARRAY_COLUMNS)
+        return MAGIC + zlib.compress(b"".join(parts), 6)
+
+    def _decode(self, data: bytes):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not an analysis cache entry")
+
+        payload = zlib.decompress(data[len(MAGIC):])
+        (meta_len,) = struct.unpack_from("<I", payload)
+        offset = 4 + meta_len
+        meta = json.loads(payload[4:offset].decode("utf-8"))
+
+        table = TextBlockTable()
+        table.text = meta["text"]
+        table.fonts = meta["fonts"]
+        table._font_ids = {font: i for i, font in enumerate(table.fonts)}
+
+        count = len(table.text)
+        for column in ARRAY_COLUMNS:
+            values = array(getattr(table, column).typecode)
+            size = values.itemsize * count
+            values.frombytes(payload[offset:offset + size])
+            if meta["byteorder"] != sys.byteorder:
+                values.byteswap()
+            if len(values) != count:
+                raise ValueError("Truncated analysis cache entry")
+            setattr(table, column, values)
+            offset += size
+
+        return table, meta
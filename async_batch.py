@@ -0,0 +1,153 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Rough peak memory per in-flight file, as a multiple of its size: the input
+# bytes, the open document and the edited output bytes
+MEMORY_FACTOR = 3
+
+class _ByteBudget:
+    """Async counting budget in bytes; an oversized item runs when nothing else does"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, amount: int):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.used == 0 or self.used + amount <= self.limit
+            )
+            self.used += amount
+
+    async def release(self, amount: int):
+        async with self._condition:
+            self.used -= amount
+            self._condition.notify_all()
+
+class AsyncBatchDriver:
+    """
+    asyncio driver that overlaps file I/O with PyMuPDF work
+
+    Reads and writes run on a small thread pool while edits run on the
+    executor from executor_factory (normally a process pool), so the next
+    PDFs are already being read, and finished ones written, while others
+    are edited. Concurrency is bounded by max_in_flight files and by a
+    memory budget estimated from file sizes.
+    """
+
+    def __init__(self, executor_factory: Callable[[], Executor],
+                 edit_fn: Callable[[bytes, str], Tuple[Optional[bytes], Dict]],
+                 output_path_for: Callable[[Path], Path],
+                 max_in_flight: int = 8, memory_budget: int = 512 * 1024 * 1024,
+                 io_threads: int = 4):
+        self.executor_factory = executor_factory
+        self.edit_fn = edit_fn
+        self.output_path_for = output_path_for
+        self.max_in_flight = max(1, max_in_flight)
+        self.memory_budget = memory_budget
+        self.io_threads = io_threads
+
+        self._executor: Optional[Executor] = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._isolation_lock: Optional[asyncio.Lock] = None
+
+    def run(self, pdf_files: List[Path], on_result: Callable[[int, Dict], None]):
+        """Process pdf_files, calling on_result(index, result) as each finishes"""
+        asyncio.run(self._run(pdf_files, on_result))
+
+    async def _run(self, pdf_files: List[Path], on_result: Callable[[int, Dict], None]):
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        budget = _ByteBudget(self.memory_budget)
+        tasks = set()
+        self._isolation_lock = asyncio.Lock()
+
+        self._executor = self.executor_factory()
+        self._io_executor = ThreadPoolExecutor(max_workers=self.io_threads)
+        try:
+            for index, pdf_file in enumerate(pdf_files):
+                # Admission control: wait for a slot and enough budget before
+                # reading, so at most max_in_flight inputs are held at once
+                await in_flight.acquire()
+                size = await loop.run_in_executor(self._io_executor, _file_size, pdf_file)
+                cost = size * MEMORY_FACTOR
+                await budget.acquire(cost)
+
+                task = asyncio.ensure_future(
+                    self._process_one(index, pdf_file, cost, in_flight, budget, on_result)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            self._executor.shutdown()
+            self._io_executor.shutdown()
+
+    async def _process_one(self, index: int, pdf_file: Path, cost: int,
+                           in_flight: asyncio.Semaphore, budget: _ByteBudget,
+                           on_result: Callable[[int, Dict], None]):
+        loop = asyncio.get_running_loop()
+        try:
+            start = time.perf_counter()
+            data = await loop.run_in_executor(self._io_executor, pdf_file.read_bytes)
+            read_ms = (time.perf_counter() - start) * 1000
+
+            edited, result = await self._edit(data, pdf_file.name)
+            del data
+
+            if edited is not None:
+                output_pdf = self.output_path_for(pdf_file)
+                start = time.perf_counter()
+                await loop.run_in_executor(self._io_executor, output_pdf.write_bytes, edited)
+                write_ms = (time.perf_counter() - start) * 1000
+                result["output_path"] = str(output_pdf)
+
+                stages = result.setdefault("timings", {"stages": {}, "total_ms": 0})["stages"]
+                stages["read"] = {"wall_ms": round(read_ms, 3)}
+                stages["write"] = {"wall_ms": round(write_ms, 3)}
+                result["timings"]["total_ms"] = round(
+                    sum(m["wall_ms"] for m in stages.values()), 3
+                )
+            print(f"{'✅' if result['success'] else '❌'} {pdf_file.name}")
+        except Exception as e:
+            result = {"filename": pdf_file.name, "success": False, "experience_added": False,
+                      "skills_modified": 0, "certifications_added": 0, "errors": [str(e)]}
+            print(f"❌ {pdf_file.name}: {str(e)}")
+        finally:
+            in_flight.release()
+            await budget.release(cost)
+
+        on_result(index, result)
+
+    async def _edit(self, data: bytes, filename: str) -> Tuple[Optional[bytes], Dict]:
+        """Run edit_fn on the shared executor, isolating the file if a worker crashes"""
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, self.edit_fn, data, filename)
+        except BrokenProcessPool:
+            # Every in-flight file sees the crash; only one replaces the pool
+            if self._executor is executor:
+                executor.shutdown(wait=False)
+                self._executor = self.executor_factory()
+
+        # Re-run crash victims one at a time in their own executor to pin the
+        # failure on the file that actually caused it
+        async with self._isolation_lock:
+            isolated = self.executor_factory()
+            try:
+                return await loop.run_in_executor(isolated, self.edit_fn, data, filename)
+            except BrokenProcessPool:
+                raise RuntimeError("Worker process crashed")
+            finally:
+                isolated.shutdown(wait=False)
+
+def _file_size(path: Path) -> int:
+    return path.stat().st_size
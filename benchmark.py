@@ -0,0 +1,535 @@
+import io
+import sys
+import json
+import shutil
+import platform
+import statistics
+import time
+import random
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import make_dataclass
+from pathlib import Path
+from typing import Dict, List
+import fitz  # PyMuPDF
+from pdf_analyzer import PDFResumeAnalyzer, TextBlock, TextBlockTable
+from pdf_editor import PDFResumeEditor, SAVE_PROFILES, EDITED_SECTIONS, CERTIFICATION_ANCHORS
+from synthetic_resumes import generate_resume
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _open_and_analyze(pdf_path: str, mode: str) -> float:
+    """Open a resume the way the editor does and analyze it, returning seconds"""
+    start = time.perf_counter()
+    doc = fitz.open(pdf_path)
+    if mode == "double":
+        # Old behavior: the analyzer re-opens and re-parses the same file
+        analyzer = PDFResumeAnalyzer(pdf_path)
+    else:
+        analyzer = PDFResumeAnalyzer(doc)
+    analyzer.extract_text_blocks()
+    analyzer.identify_sections()
+    elapsed = time.perf_counter() - start
+    analyzer.close()
+    doc.close()
+    return elapsed
+
+def run_open_child(pdf_files: List[str], mode: str, repeat: int) -> Dict:
+    """Measure one open mode in the current process"""
+    timings = []
+    for _ in range(repeat):
+        for pdf_path in pdf_files:
+            timings.append(_open_and_analyze(pdf_path, mode))
+    return {
+        "mode": mode,
+        "files": len(timings),
+        "avg_ms": sum(timings) / len(timings) * 1000,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+def bench_open(pdf_files: List[str], repeat: int):
+    """Compare double-open vs shared-document cost per file"""
+    print("\n" + "="*60)
+    print("📊 Open + analyze cost per file")
+    print("="*60)
+
+    results = []
+    # Each mode runs in a fresh interpreter so peak RSS is not shared
+    for mode in ("double", "shared"):
+        output = subprocess.check_output([
+            sys.executable, __file__, "open", "--child", mode,
+            "--repeat", str(repeat), *pdf_files
+        ])
+        results.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    for r in results:
+        print(f"  {r['mode']:<8} {r['avg_ms']:8.2f} ms/file   peak RSS {r['peak_rss_mb']:7.1f} MB")
+
+    before, after = results
+    if after["avg_ms"]:
+        print(f"\n⚡ Speedup: {before['avg_ms'] / after['avg_ms']:.2f}x")
+
+def synthetic_blocks(span_count: int, seed: int = 0) -> List[TextBlock]:
+    """Build a dense fake resume: body spans with keyword-heavy prose and periodic headers"""
+    rng = random.Random(seed)
+    words = ["built", "led", "python", "services", "team", "skills", "experience",
+             "profile", "projects", "summary", "data", "platform", "delivery"]
+    headers = ["EXPERIENCE", "SKILLS", "EDUCATION", "CERTIFICATIONS", "PROJECTS"]
+    blocks = []
+    y = 50.0
+    for i in range(span_count):
+        if i % 200 == 0:
+            text, size = headers[(i // 200) % len(headers)], 14.0
+        else:
+            text, size = " ".join(rng.choice(words) for _ in range(8)), 10.0
+        blocks.append(TextBlock(text, 50.0, y, 300.0, y + size, "Helvetica", size, 0, i // 60))
+        y = 50.0 if i % 60 == 59 else y + size * 1.2
+    return blocks
+
+def _identify_sections_legacy(analyzer: PDFResumeAnalyzer) -> Dict:
+    """The original per-block, per-keyword scan, kept for comparison"""
+    sections = {}
+    current_section = None
+    section_blocks = []
+    for block in analyzer.text_blocks:
+        text_lower = block.text.lower().strip()
+        section_name = None
+        for keyword in analyzer.SECTION_KEYWORDS:
+            if keyword in text_lower:
+                avg_font_size = sum(b.font_size for b in analyzer.text_blocks) / len(analyzer.text_blocks)
+                if block.font_size >= avg_font_size * 0.9:
+                    section_name = keyword.title()
+                    break
+        if section_name:
+            if current_section and section_blocks:
+                sections[current_section] = analyzer._create_section(current_section, section_blocks)
+            current_section = section_name
+            section_blocks = [block]
+        elif current_section:
+            section_blocks.append(block)
+    if current_section and section_blocks:
+        sections[current_section] = analyzer._create_section(current_section, section_blocks)
+    return sections
+
+def bench_sections(span_counts: List[int]):
+    """Time identify_sections against the legacy scan on synthetic documents"""
+    print("\n" + "="*60)
+    print("📊 identify_sections on synthetic documents")
+    print("="*60)
+    print(f"  {'spans':>7} {'legacy ms':>12} {'current ms':>12} {'speedup':>9}")
+
+    # Section detection only reads text_blocks, so an empty document will do
+    with fitz.open() as doc:
+        analyzer = PDFResumeAnalyzer(doc)
+        for count in span_counts:
+            analyzer.text_blocks = synthetic_blocks(count)
+
+            start = time.perf_counter()
+            legacy = _identify_sections_legacy(analyzer)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            current = analyzer.identify_sections()
+            current_ms = (time.perf_counter() - start) * 1000
+
+            assert legacy.keys() == current.keys(), "section detection changed"
+            print(f"  {count:>7} {legacy_ms:>12.1f} {current_ms:>12.1f} {legacy_ms / current_ms:>8.1f}x")
+
+def _measure_alloc(build) -> int:
+    """Bytes still allocated after build() returns its result"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def bench_blocks(span_count: int):
+    """Memory of per-object vs columnar block storage"""
+    print("\n" + "="*60)
+    print(f"📊 Block storage for {span_count} spans")
+    print("="*60)
+
+    rows = [
+        (b.text, b.x0, b.y0, b.x1, b.y1, f"Font-{i % 6}", b.font_size, b.color, b.page_num)
+        for i, b in enumerate(synthetic_blocks(span_count))
+    ]
+    # The pre-__slots__ TextBlock: one instance __dict__ per span
+    DictBlock = make_dataclass("DictBlock", [
+        "text", "x0", "y0", "x1", "y1", "font_name", "font_size", "color", "page_num"
+    ])
+
+    def build_table():
+        table = TextBlockTable()
+        for row in rows:
+            table.append(*row)
+        return table
+
+    layouts = [
+        ("dataclass", lambda: [DictBlock(*row) for row in rows]),
+        ("__slots__", lambda: [TextBlock(*row) for row in rows]),
+        ("columnar", build_table)
+    ]
+    # Texts are shared with the input rows, so only per-span overhead is counted
+    for name, build in layouts:
+        size = _measure_alloc(build)
+        print(f"  {name:<10} {size / 1024:9.1f} KB   {size / span_count:6.1f} B/span")
+
+def _apply_default_edits(editor: PDFResumeEditor):
+    """The edits main.py makes with the default configuration"""
+    from main import ResumeEditConfig
+    config = ResumeEditConfig()
+    editor.add_experience(config.get_experience_lines(), position="top")
+    editor.modify_skills({m["old"]: m["new"] for m in config.get_skill_modifications()})
+    for cert in config.get_certifications():
+        editor.add_certification(cert)
+
+def bench_save(pdf_files: List[str], repeat: int):
+    """Save time vs output size for each save profile"""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in SAVE_PROFILES:
+            timings = []
+            total_size = 0
+            for pdf_path in pdf_files:
+                output_path = str(Path(tmp_dir) / f"{profile}_{Path(pdf_path).name}")
+                for _ in range(repeat):
+                    editor = PDFResumeEditor(pdf_path, output_path, save_profile=profile)
+                    _apply_default_edits(editor)
+                    start = time.perf_counter()
+                    editor.save()
+                    timings.append(time.perf_counter() - start)
+                    editor.close()
+                total_size += Path(output_path).stat().st_size
+            rows.append((profile, sum(timings) / len(timings) * 1000, total_size))
+
+    input_size = sum(Path(p).stat().st_size for p in pdf_files)
+
+    print("\n" + "="*60)
+    print(f"📊 save() by profile over {len(pdf_files)} file(s)")
+    print("="*60)
+    print(f"  {'profile':<10} {'ms/file':>10} {'output KB':>12} {'vs input':>10}")
+    for profile, avg_ms, total_size in rows:
+        print(f"  {profile:<10} {avg_ms:>10.2f} {total_size / 1024:>12.1f} {total_size / input_size:>9.2f}x")
+
+def _words_in(page: "fitz.Page", rect: "fitz.Rect") -> str:
+    """Words whose middle lies in rect, in extraction order"""
+    return " ".join(w[4] for w in page.get_text("words")
+                    if fitz.Point((w[0] + w[2]) / 2, (w[1] + w[3]) / 2) in rect)
+
+def _leftover_spans(input_path: str, output_path: str, skill_ops: List) -> int:
+    """Replaced skill spans whose old text can still be extracted from the output"""
+    leftover = 0
+    with fitz.open(input_path) as before, fitz.open(output_path) as after:
+        # plan_skills emits each cover/redact op right before its text op
+        for cover, new in zip(skill_ops[::2], skill_ops[1::2]):
+            rect = fitz.Rect(cover.rect)
+            old_text = _words_in(before[cover.page_num], rect)
+            expected = " ".join(new.text.split()).count(old_text)
+            if _words_in(after[cover.page_num], rect).count(old_text) > expected:
+                leftover += 1
+    return leftover
+
+def bench_replace(pdf_files: List[str], repeat: int, profile: str):
+    """Skill replacement by white overlay vs redaction: time, size, leftover text"""
+    from main import ResumeEditConfig
+    config = ResumeEditConfig()
+    mapping = {m["old"]: m["new"] for m in config.get_skill_modifications()}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode, redact in (("overlay", False), ("redact", True)):
+            timings = []
+            total_size = 0
+            leftover = 0
+            for pdf_path in pdf_files:
+                output_path = str(Path(tmp_dir) / f"{mode}_{Path(pdf_path).name}")
+                for _ in range(repeat):
+                    with redirect_stdout(io.StringIO()):
+                        editor = PDFResumeEditor(pdf_path, output_path, save_profile=profile,
+                                                 redact=redact)
+                        plan = editor.compile_plan(config.get_experience_lines(), mapping,
+                                                   config.get_certifications())
+                        start = time.perf_counter()
+                        editor.apply_plan(plan)
+                        editor.save()
+                        timings.append(time.perf_counter() - start)
+                        editor.close()
+                total_size += Path(output_path).stat().st_size
+                leftover += _leftover_spans(pdf_path, output_path, [op for op in plan.ops if op.edit == "skills"])
+            rows.append((mode, sum(timings) / len(timings) * 1000, total_size, leftover))
+
+    print("\n" + "="*60)
+    print(f"📊 Skill replacement over {len(pdf_files)} file(s), {profile} profile")
+    print("="*60)
+    print(f"  {'mode':<10} {'apply+save ms':>14} {'output KB':>12} {'old spans left':>15}")
+    for mode, avg_ms, total_size, leftover in rows:
+        print(f"  {mode:<10} {avg_ms:>14.2f} {total_size / 1024:>12.1f} {leftover:>15}")
+
+def _extract_default_flags(analyzer: PDFResumeAnalyzer):
+    """Extraction as it was before text-only flags: images decoded too"""
+    for page in analyzer.doc:
+        page.get_text("dict")
+
+def bench_extract(pdf_files: List[str], repeat: int):
+    """Eager extraction with default vs text-only flags, and lazy extraction"""
+    modes = {
+        "default flags": _extract_default_flags,
+        "text-only": lambda a: (a.extract_text_blocks(), a.identify_sections()),
+        "lazy": lambda a: a.extract_until_sections(EDITED_SECTIONS, {"certif": CERTIFICATION_ANCHORS})
+    }
+    rows = []
+    pages_read = 0
+    total_pages = 0
+    for name, run in modes.items():
+        timings = []
+        for pdf_path in pdf_files:
+            with fitz.open(pdf_path) as doc:
+                for _ in range(repeat):
+                    analyzer = PDFResumeAnalyzer(doc)
+                    start = time.perf_counter()
+                    run(analyzer)
+                    timings.append(time.perf_counter() - start)
+                if name == "lazy":
+                    pages_read += analyzer.pages_extracted
+                    total_pages += len(doc)
+        rows.append((name, sum(timings) / len(timings) * 1000))
+
+    print("\n" + "="*60)
+    print(f"📊 Text extraction over {len(pdf_files)} file(s)")
+    print("="*60)
+    print(f"  {'mode':<14} {'ms/file':>10}")
+    for name, avg_ms in rows:
+        print(f"  {name:<14} {avg_ms:>10.2f}")
+    print(f"\n  lazy extracted {pages_read}/{total_pages} pages")
+
+# Synthetic documents timed by the suite: name -> generate_resume() arguments
+SUITE_CASES = {
+    "p1_s100_f1": {"pages": 1, "spans": 100, "font_count": 1},
+    "p1_s300_f3": {"pages": 1, "spans": 300, "font_count": 3},
+    "p2_s1000_f3": {"pages": 2, "spans": 1000, "font_count": 3},
+    "p2_s1000_f3_no_experience": {"pages": 2, "spans": 1000, "font_count": 3,
+                                  "sections": ("skills", "certifications", "education")},
+    "p2_s1000_f3_no_skills": {"pages": 2, "spans": 1000, "font_count": 3,
+                              "sections": ("experience", "certifications", "education")},
+    "p2_s1000_f3_no_certifications": {"pages": 2, "spans": 1000, "font_count": 3,
+                                      "sections": ("experience", "skills", "education")},
+    "p10_s2000_f1": {"pages": 10, "spans": 2000, "font_count": 1},
+    "p10_s5000_f3": {"pages": 10, "spans": 5000, "font_count": 3},
+    "p50_s20000_f4": {"pages": 50, "spans": 20000, "font_count": 4},
+}
+# Cases skipped by --quick
+LARGE_CASES = {"p50_s20000_f4"}
+
+def _time_case(pdf_path: str, repeat: int) -> Dict[str, float]:
+    """Median ms per analysis and editor operation on one document"""
+    from main import ResumeEditConfig
+    config = ResumeEditConfig()
+    samples: Dict[str, List[float]] = {}
+
+    def timed(name: str, operation):
+        start = time.perf_counter()
+        result = operation()
+        samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = str(Path(tmp_dir) / "edited.pdf")
+        for _ in range(repeat):
+            with fitz.open(pdf_path) as doc:
+                analyzer = PDFResumeAnalyzer(doc)
+                timed("extract_text_blocks", analyzer.extract_text_blocks)
+                timed("identify_sections", analyzer.identify_sections)
+
+            editor = PDFResumeEditor(pdf_path, output_path)
+            timed("add_experience", lambda: editor.add_experience(config.get_experience_lines()))
+            timed("modify_skills", lambda: editor.modify_skills(
+                {m["old"]: m["new"] for m in config.get_skill_modifications()}
+            ))
+            for cert in config.get_certifications():
+                timed("add_certification", lambda: editor.add_certification(cert))
+            timed("save", editor.save)
+            editor.close()
+
+    return {name: round(statistics.median(values), 3) for name, values in samples.items()}
+
+def _time_batch(input_dir: Path, repeat: int) -> float:
+    """Median ms for a full single-worker batch over input_dir"""
+    from main import BatchResumeProcessor
+    timings = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as output_dir:
+            processor = BatchResumeProcessor(str(input_dir), output_dir)
+            start = time.perf_counter()
+            processor.process_all_resumes()
+            timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+def _environment() -> Dict:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "platform": platform.platform()
+    }
+
+def run_suite(repeat: int, quick: bool, keep_dir: str = None) -> Dict:
+    """Generate the synthetic corpus and time every stage on it"""
+    cases = {name: params for name, params in SUITE_CASES.items()
+             if not (quick and name in LARGE_CASES)}
+    suite = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "repeat": repeat,
+        "cases": {}
+    }
+
+    corpus_dir = Path(keep_dir or tempfile.mkdtemp(prefix="resume_bench_"))
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        for name, params in cases.items():
+            pdf_path = str(corpus_dir / f"{name}.pdf")
+            generated = generate_resume(pdf_path, **params)
+            print(f"⏱️  {name}")
+            # Editor progress output would swamp the results
+            with redirect_stdout(io.StringIO()):
+                timings = _time_case(pdf_path, repeat)
+            suite["cases"][name] = dict(generated, timings_ms=timings)
+
+        print("⏱️  batch")
+        with redirect_stdout(io.StringIO()):
+            batch_ms = _time_batch(corpus_dir, repeat)
+        suite["cases"]["batch"] = {"files": len(cases), "timings_ms": {"process_all_resumes": batch_ms}}
+    finally:
+        if not keep_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    return suite
+
+def print_suite(suite: Dict):
+    print("\n" + "="*60)
+    print(f"📊 Benchmark suite (median of {suite['repeat']}, ms)")
+    print("="*60)
+    for name, case in suite["cases"].items():
+        print(f"\n  {name}")
+        for operation, ms in case["timings_ms"].items():
+            print(f"    {operation:<22} {ms:>10.2f}")
+
+def compare_suites(baseline: Dict, current: Dict, threshold: float, min_delta_ms: float) -> List:
+    """
+    Operations that got slower than baseline by more than threshold
+
+    Differences under min_delta_ms are ignored, so sub-millisecond noise on
+    tiny documents doesn't count as a regression.
+    """
+    print("\n" + "="*60)
+    print(f"📊 Compared with baseline {baseline['environment'].get('commit') or ''} "
+          f"({baseline['created']})")
+    print("="*60)
+    print(f"  {'case / operation':<48} {'base':>9} {'now':>9} {'ratio':>7}")
+
+    regressions = []
+    for name, case in current["cases"].items():
+        base_case = baseline["cases"].get(name)
+        if not base_case:
+            continue
+        for operation, ms in case["timings_ms"].items():
+            base_ms = base_case["timings_ms"].get(operation)
+            if base_ms is None:
+                continue
+            ratio = ms / base_ms if base_ms else float("inf")
+            regressed = ratio > threshold and ms - base_ms > min_delta_ms
+            marker = "  ❌" if regressed else ""
+            print(f"  {name + ' / ' + operation:<48} {base_ms:>9.2f} {ms:>9.2f} {ratio:>6.2f}x{marker}")
+            if regressed:
+                regressions.append((name, operation, base_ms, ms))
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PDF Resume Editor benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    open_parser = sub.add_parser("open", help="Document open + analysis cost")
+    open_parser.add_argument("pdfs", nargs="*")
+    open_parser.add_argument("--repeat", type=int, default=20)
+    open_parser.add_argument("--child", choices=["double", "shared"], help=argparse.SUPPRESS)
+
+    sections_parser = sub.add_parser("sections", help="Section detection scaling")
+    sections_parser.add_argument("--spans", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+
+    blocks_parser = sub.add_parser("blocks", help="Text block storage memory")
+    blocks_parser.add_argument("--spans", type=int, default=10000)
+
+    save_parser = sub.add_parser("save", help="Save profile time vs output size")
+    save_parser.add_argument("pdfs", nargs="*")
+    save_parser.add_argument("--repeat", type=int, default=3)
+
+    replace_parser = sub.add_parser("replace", help="Skill replacement: overlay vs redaction")
+    replace_parser.add_argument("pdfs", nargs="*")
+    replace_parser.add_argument("--repeat", type=int, default=3)
+    replace_parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default="smallest")
+
+    extract_parser = sub.add_parser("extract", help="Eager vs lazy text extraction")
+    extract_parser.add_argument("pdfs", nargs="*")
+    extract_parser.add_argument("--repeat", type=int, default=5)
+
+    suite_parser = sub.add_parser("suite", help="Synthetic corpus timings, saved or compared as a JSON baseline")
+    suite_parser.add_argument("--repeat", type=int, default=3)
+    suite_parser.add_argument("--quick", action="store_true", help="Skip the 50-page case")
+    suite_parser.add_argument("--output", metavar="JSON", help="Write results as a baseline")
+    suite_parser.add_argument("--compare", metavar="JSON", help="Compare results with a baseline")
+    suite_parser.add_argument("--threshold", type=float, default=1.25,
+                              help="Slowdown ratio that counts as a regression (default: 1.25)")
+    suite_parser.add_argument("--min-delta", type=float, default=1.0,
+                              help="Ignore slowdowns smaller than this many ms (default: 1.0)")
+    suite_parser.add_argument("--keep-corpus", metavar="DIR", help="Generate the PDFs here and keep them")
+
+    args = parser.parse_args()
+
+    if args.command == "open":
+        pdf_files = args.pdfs or [str(p) for p in sorted(Path("input_resumes").glob("*.pdf"))]
+        if args.child:
+            print(json.dumps(run_open_child(pdf_files, args.child, args.repeat)))
+        else:
+            bench_open(pdf_files, args.repeat)
+    elif args.command == "sections":
+        bench_sections(args.spans)
+    elif args.command == "blocks":
+        bench_blocks(args.spans)
+    elif args.command == "save":
+        pdf_files = args.pdfs or [str(p) for p in sorted(Path("input_resumes").glob("*.pdf"))]
+        bench_save(pdf_files, args.repeat)
+    elif args.command == "replace":
+        pdf_files = args.pdfs or [str(p) for p in sorted(Path("input_resumes").glob("*.pdf"))]
+        bench_replace(pdf_files, args.repeat, args.save_profile)
+    elif args.command == "extract":
+        pdf_files = args.pdfs or [str(p) for p in sorted(Path("input_resumes").glob("*.pdf"))]
+        bench_extract(pdf_files, args.repeat)
+    elif args.command == "suite":
+        suite = run_suite(args.repeat, args.quick, args.keep_corpus)
+        print_suite(suite)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(suite, f, indent=2)
+            print(f"\n💾 Baseline saved: {args.output}")
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            regressions = compare_suites(baseline, suite, args.threshold, args.min_delta)
+            if regressions:
+                print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.2f}x")
+                sys.exit(1)
+            print("\n✅ No regressions")
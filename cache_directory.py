@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+class CacheDirectory:
+    """
+    Directory of cache entry files, bounded by total size and/or entry count
+
+    Entries are written atomically and touched on every hit; once a limit
+    is exceeded the least recently used entries are evicted. Several
+    processes may share the directory.
+
+    Usage:
+        store = CacheDirectory(".analysis_cache", "*.rac", max_bytes=256 << 20)
+        path = store.path(f"{content_hash}.rac")
+        store.write(path, data, "analysis")
+    """
+
+    def __init__(self, cache_dir: str, pattern: str, max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory holding the entries (created if missing)
+            pattern: Glob matching this cache's entries
+            max_bytes: Size limit for all entries (None: unbounded)
+            max_entries: Entry count limit (None: unbounded)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.pattern = pattern
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # Approximate size and count; recounted from disk when evicting
+        self._total_bytes: Optional[int] = None
+        self._entry_count: Optional[int] = None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        return self.cache_dir / name
+
+    def touch(self, path: Path):
+        """Mark an entry as just used, so eviction is least-recently-used"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def write(self, path: Path, data: bytes, kind: str) -> bool:
+        """
+        Store an entry, then evict if a limit is exceeded
+
+        A failed write is reported and otherwise ignored: a cache must never
+        fail the work it speeds up.
+
+        Args:
+            path: Entry path, from path()
+            data: Entry content
+            kind: What is cached, for the warning (e.g. "analysis")
+
+        Returns:
+            bool: Whether the entry was written
+        """
+        existed = path.exists()
+        # Write-then-rename so concurrent workers never read a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write {kind} cache entry: {str(e)}")
+            return False
+
+        if self._total_bytes is None:
+            entries = self._scan()
+            self._total_bytes = sum(size for _, size, _ in entries)
+            self._entry_count = len(entries)
+        else:
+            self._total_bytes += len(data)
+            if not existed:
+                self._entry_count += 1
+        if self._over(self._total_bytes, self._entry_count, 1.0):
+            self._evict()
+        return True
+
+    def _over(self, total: int, count: int, share: float) -> bool:
+        return ((self.max_bytes is not None and total > self.max_bytes * share)
+                or (self.max_entries is not None and count > self.max_entries * share))
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """List (mtime, size, path) for all entries"""
+        entries = []
+        for path in self.cache_dir.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until comfortably under the limits"""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        # Evict down to 90% so the next few writes don't each trigger a scan
+        for _, size, path in entries:
+            if not self._over(total, count, 0.9):
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+
+        self._total_bytes = total
+        self._entry_count = count
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+
+Rect = Tuple[float, float, float, float]
+
+class EditNotApplicable(Exception):
+    """The resume has nothing for an edit to apply to (e.g. no Skills section)"""
+
+@dataclass
+class DrawOp:
+    """One positioned drawing operation produced by the edit planner"""
+    __slots__ = ("kind", "edit", "page_num", "rect", "text", "font_name", "font_size", "color")
+
+    # "cover" (white box over old text), "redact" (old text removed) or "text"
+    kind: str
+    # Label of the edit that produced it: "experience", "skills" or
+    # "certification:<text>"
+    edit: str
+    page_num: int
+    # Area the op paints; for text, from the top of the line to the baseline
+    rect: Rect
+    text: Optional[str]
+    font_name: Optional[str]
+    font_size: Optional[float]
+    color: Tuple[float, float, float]
+
+    @property
+    def baseline(self) -> Tuple[float, float]:
+        """insert_text point for a text op"""
+        return (self.rect[0], self.rect[1] + self.font_size)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DrawOp":
+        return cls(
+            kind=data["kind"], edit=data["edit"], page_num=data["page_num"],
+            rect=tuple(data["rect"]), text=data.get("text"),
+            font_name=data.get("font_name"), font_size=data.get("font_size"),
+            color=tuple(data.get("color", (0, 0, 0)))
+        )
+
+@dataclass
+class ShiftOp:
+    """Moves existing content down a page to open space for new content"""
+    __slots__ = ("edit", "page_num", "band", "dy", "cut", "spill_top", "new_page")
+
+    edit: str
+    page_num: int
+    # Content inside this area moves down by dy
+    band: Rect
+    dy: float
+    # Content from this y down goes to the next page instead, starting at
+    # spill_top (None: everything fits on the page)
+    cut: Optional[float]
+    spill_top: Optional[float]
+    # Whether that next page is a new one inserted after page_num
+    new_page: bool
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ShiftOp":
+        return cls(
+            edit=data["edit"], page_num=data["page_num"], band=tuple(data["band"]),
+            dy=data["dy"], cut=data.get("cut"), spill_top=data.get("spill_top"),
+            new_page=data.get("new_page", True)
+        )
+
+@dataclass
+class EditPlan:
+    """
+    Every edit for one document, resolved to draw operations before drawing
+
+    Plain data: to_dict()/from_dict() round-trip through JSON, so a plan can
+    be inspected (dry runs) or stored and applied later to the same PDF.
+    """
+    ops: List[DrawOp] = field(default_factory=list)
+    # Content moves (reflow mode), applied in order before any op is drawn;
+    # ops are in the coordinates after all shifts
+    shifts: List[ShiftOp] = field(default_factory=list)
+    # Predicted outcome per edit kind, in the batch result's terms
+    experience_added: bool = False
+    skills_modified: Dict[str, int] = field(default_factory=dict)
+    certifications_added: List[str] = field(default_factory=list)
+    # Edits that could not be planned, with the reason
+    failures: Dict[str, str] = field(default_factory=dict)
+    # (edit, edit) pairs whose operations paint over each other
+    collisions: List[Tuple[str, str]] = field(default_factory=list)
+    # Edits drawn over content because reflow could not make room
+    overdrawn: List[str] = field(default_factory=list)
+
+    def ops_by_page(self) -> Dict[int, List[DrawOp]]:
+        pages = defaultdict(list)
+        for op in self.ops:
+            pages[op.page_num].append(op)
+        return dict(pages)
+
+    def to_dict(self) -> Dict:
+        return {
+            "ops": [op.to_dict() for op in self.ops],
+            "shifts": [shift.to_dict() for shift in self.shifts],
+            "experience_added": self.experience_added,
+            "skills_modified": self.skills_modified,
+            "certifications_added": self.certifications_added,
+            "failures": self.failures,
+            "collisions": [list(pair) for pair in self.collisions],
+            "overdrawn": self.overdrawn
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EditPlan":
+        return cls(
+            ops=[DrawOp.from_dict(op) for op in data["ops"]],
+            shifts=[ShiftOp.from_dict(shift) for shift in data.get("shifts", [])],
+            experience_added=data["experience_added"],
+            skills_modified=dict(data["skills_modified"]),
+            certifications_added=list(data["certifications_added"]),
+            failures=dict(data.get("failures", {})),
+            collisions=[tuple(pair) for pair in data.get("collisions", [])],
+            overdrawn=list(data.get("overdrawn", []))
+        )
+
+def find_collisions(ops: List[DrawOp]) -> List[Tuple[str, str]]:
+    """
+    Pairs of different edits whose operations overlap on a page
+
+    New text overlapping new text, or a cover box or redaction over another
+    edit's new text, would hide or garble it. Ops of the same edit (a cover
+    and its replacement text) are expected to overlap and are not reported.
+    """
+    collisions = []
+    pages: Dict[int, List[DrawOp]] = defaultdict(list)
+    for op in ops:
+        pages[op.page_num].append(op)
+
+    for page_ops in pages.values():
+        for i, op in enumerate(page_ops):
+            for j, text_op in enumerate(page_ops):
+                if text_op.kind != "text" or text_op.edit == op.edit:
+                    continue
+                # Text/text pairs are seen twice; count them once
+                if op.kind == "text" and j <= i:
+                    continue
+                ax0, ay0, ax1, ay1 = op.rect
+                bx0, by0, bx1, by1 = text_op.rect
+                if ax0 < bx1 and ax1 > bx0 and ay0 < by1 and ay1 > by0:
+                    pair = (op.edit, text_op.edit)
+                    if pair not in collisions:
+                        collisions.append(pair)
+    return collisions
@@ -0,0 +1,314 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from analysis_cache import AnalysisCache
+from instrumentation import percentile
+from template_cache import TemplateCache
+from main import ResumeEditConfig, edit_resume_bytes
+from pdf_editor import SAVE_PROFILES
+
+# Per-process state for warm pool workers (set by _init_service_worker)
+_worker_config: Optional[ResumeEditConfig] = None
+_worker_options: Dict = {}
+
+def _init_service_worker(config: Dict, options: Dict, quiet: bool):
+    """Load everything once per worker so requests only pay for the PDF work"""
+    global _worker_config, _worker_options
+    _worker_config = ResumeEditConfig.from_dict(config)
+    _worker_options = options
+    if quiet:
+        # The editor reports progress with print(); a service has no use for it
+        sys.stdout = open(os.devnull, 'w')
+
+def _warm_up() -> int:
+    """No-op task used to force every worker to start before serving"""
+    return os.getpid()
+
+def _edit_in_worker(pdf_bytes: bytes, overrides: Optional[Dict],
+                    filename: str) -> Tuple[Optional[bytes], Dict]:
+    """Run the configured edits on one uploaded PDF inside a worker"""
+    config = _worker_config
+    if overrides:
+        config = ResumeEditConfig.from_dict(dict(_worker_config.config, **overrides))
+    return edit_resume_bytes(pdf_bytes, config, filename=filename, **_worker_options)
+
+class EditService:
+    """
+    Resident PDF edit service backed by a pre-started process pool
+
+    At most max_pending requests are accepted at once (running plus
+    queued inside the pool); beyond that requests are rejected with 503 so
+    callers back off instead of piling up. A request that times out keeps
+    its slot until its worker actually finishes the edit.
+    """
+
+    def __init__(self, config: ResumeEditConfig, workers: int = 2, max_pending: int = 16,
+                 request_timeout: float = 60.0, save_profile: str = "balanced",
+                 cache_dir: Optional[str] = None, quiet: bool = True,
+                 template_cache_dir: Optional[str] = None, lazy: bool = False,
+                 reflow: bool = False, redact: bool = False):
+        self.config = config
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.quiet = quiet
+        self.worker_options = {
+            "save_profile": save_profile,
+            "analysis_cache": AnalysisCache(cache_dir) if cache_dir else None,
+            "template_cache": TemplateCache(template_cache_dir) if template_cache_dir else None,
+            "lazy": lazy,
+            "reflow": reflow,
+            "redact": redact
+        }
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool_lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self._started = time.time()
+        self._counters = {"requests": 0, "succeeded": 0, "failed": 0,
+                          "rejected": 0, "timeouts": 0, "worker_crashes": 0,
+                          "worker_errors": 0}
+        self._in_flight = 0
+        self._latencies = deque(maxlen=1000)
+
+    def start(self):
+        """Start the pool and wait until every worker is up"""
+        with self._pool_lock:
+            self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_service_worker,
+            initargs=(self.config.config, self.worker_options, self.quiet)
+        )
+        # Submit one task per worker so imports and config loading happen now
+        for future in [pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def stop(self):
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _count(self, name: str):
+        with self._metrics_lock:
+            self._counters[name] += 1
+
+    def edit(self, pdf_bytes: bytes, overrides: Optional[Dict] = None,
+             filename: str = "upload.pdf") -> Tuple[int, Optional[bytes], Dict]:
+        """
+        Edit one PDF through the pool
+
+        Returns:
+            Tuple of (HTTP status, edited PDF bytes or None, result dict)
+        """
+        self._count("requests")
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            return 503, None, {"errors": ["Server busy, retry later"]}
+
+        start = time.perf_counter()
+        with self._metrics_lock:
+            self._in_flight += 1
+        release_slot = True
+        try:
+            with self._pool_lock:
+                pool = self._pool
+            future = pool.submit(_edit_in_worker, pdf_bytes, overrides, filename)
+            edited, result = future.result(timeout=self.request_timeout)
+            status = 200 if edited is not None else 422
+        except TimeoutError:
+            self._count("timeouts")
+            # The worker is still running the edit; its slot is freed only
+            # when it finishes, so max_pending keeps bounding real work
+            release_slot = False
+            future.add_done_callback(lambda _: self._slots.release())
+            status, edited, result = 504, None, {"errors": ["Edit timed out"]}
+        except BrokenProcessPool:
+            self._count("worker_crashes")
+            self._replace_pool(pool)
+            status, edited, result = 500, None, {"errors": ["Worker process crashed"]}
+        except Exception as e:
+            self._count("worker_errors")
+            status, edited, result = 500, None, {"errors": [f"Edit failed: {str(e)}"]}
+        finally:
+            with self._metrics_lock:
+                self._in_flight -= 1
+                self._latencies.append((time.perf_counter() - start) * 1000)
+            if release_slot:
+                self._slots.release()
+
+        self._count("succeeded" if status == 200 else "failed")
+        return status, edited, result
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """Swap in a fresh pool once, however many requests saw the crash"""
+        with self._pool_lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False)
+                self._pool = self._new_pool()
+
+    def metrics(self) -> Dict:
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            return dict(
+                self._counters,
+                in_flight=self._in_flight,
+                max_pending=self.max_pending,
+                workers=self.workers,
+                uptime_s=round(time.time() - self._started, 1),
+                latency_ms={
+                    "p50": round(percentile(latencies, 50), 2),
+                    "p95": round(percentile(latencies, 95), 2),
+                    "p99": round(percentile(latencies, 99), 2)
+                }
+            )
+
+def make_handler(service: EditService, max_body: int):
+    """Build the request handler class bound to a service"""
+
+    class EditRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 503:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send_json(200, service.metrics())
+            else:
+                self._send_json(404, {"errors": ["Not found"]})
+
+        def do_POST(self):
+            if self.path != "/edit":
+                # The body is left unread, so the connection cannot be reused
+                self.close_connection = True
+                self._send_json(404, {"errors": ["Not found"]})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            if length <= 0:
+                self._send_json(400, {"errors": ["Empty request body"]})
+                return
+            if length > max_body:
+                self.close_connection = True
+                self._send_json(413, {"errors": [f"PDF larger than {max_body} bytes"]})
+                return
+            pdf_bytes = self.rfile.read(length)
+
+            overrides = None
+            if self.headers.get("X-Edit-Config"):
+                try:
+                    overrides = json.loads(self.headers["X-Edit-Config"])
+                except ValueError:
+                    self._send_json(400, {"errors": ["X-Edit-Config is not valid JSON"]})
+                    return
+                if not isinstance(overrides, dict):
+                    self._send_json(400, {"errors": ["X-Edit-Config must be a JSON object"]})
+                    return
+
+            filename = self.headers.get("X-Filename", "upload.pdf")
+            status, edited, result = service.edit(pdf_bytes, overrides, filename)
+
+            if edited is None:
+                self._send_json(status, result)
+                return
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(edited)))
+            self.send_header("X-Edit-Result", json.dumps(
+                {k: v for k, v in result.items() if k != "timings"}
+            ))
+            self.end_headers()
+            self.wfile.write(edited)
+
+        def log_message(self, format, *args):
+            if not service.quiet:
+                super().log_message(format, *args)
+
+    return EditRequestHandler
+
+def serve(service: EditService, host: str = "127.0.0.1", port: int = 8080,
+          max_body: int = 20 * 1024 * 1024):
+    """Start the pool and serve HTTP requests until interrupted"""
+    service.start()
+    server = ThreadingHTTPServer((host, port), make_handler(service, max_body))
+    server.daemon_threads = True
+
+    print(f"🚀 Edit service listening on http://{host}:{server.server_port}")
+    print(f"⚙️  Workers: {service.workers} | Max pending: {service.max_pending}")
+    print("   POST /edit  (PDF body, optional X-Edit-Config JSON header)")
+    print("   GET  /health, GET /metrics")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        service.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resident PDF resume edit service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--max-pending", type=int, default=32,
+                        help="Requests accepted at once before answering 503")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Per-request edit timeout in seconds")
+    parser.add_argument("--config", default="edit_config.json")
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default="balanced")
+    parser.add_argument("--cache-dir", help="Reuse PDF analysis results stored in this directory")
+    parser.add_argument("--template-cache", metavar="DIR",
+                        help="Reuse section geometry of known resume templates")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Stop extracting pages once the edited sections are found")
+    parser.add_argument("--reflow", action="store_true",
+                        help="Move existing content down to make room for inserted lines")
+    parser.add_argument("--redact", action="store_true",
+                        help="Remove replaced skill text instead of covering it")
+    parser.add_argument("--verbose", action="store_true", help="Log requests and editor output")
+    args = parser.parse_args()
+    if args.lazy and args.reflow:
+        parser.error("--lazy cannot be combined with --reflow")
+
+    service = EditService(
+        ResumeEditConfig(args.config),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        request_timeout=args.timeout,
+        save_profile=args.save_profile,
+        cache_dir=args.cache_dir,
+        quiet=not args.verbose,
+        template_cache_dir=args.template_cache,
+        lazy=args.lazy,
+        reflow=args.reflow,
+        redact=args.redact
+    )
+    serve(service, args.host, args.port)
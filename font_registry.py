@@ -0,0 +1,317 @@
+import re
+import struct
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import fitz  # PyMuPDF
+
+# OS/2 fsType embedding permission bits
+FSTYPE_RESTRICTED = 0x0002
+FSTYPE_PREVIEW_PRINT = 0x0004
+FSTYPE_EDITABLE = 0x0008
+FSTYPE_BITMAP_ONLY = 0x0200
+
+# Subset fonts are named like "ABCDEF+Calibri"
+SUBSET_PREFIX = re.compile(r"^[A-Z]{6}\+")
+
+# Names of re-embedded fonts in page resources: prefix + content hash
+ALIAS_PREFIX = "rf"
+
+def base14_for(font_name: str) -> str:
+    """Closest Base-14 font for an extracted font name (family, bold, italic)"""
+    name = font_name.lower()
+    if any(k in name for k in ("courier", "mono", "consol")):
+        family = ("cour", "cobo", "coit", "cobi")
+    elif any(k in name for k in ("times", "roman", "serif", "georgia", "garamond", "cambria")) \
+            and "sans" not in name:
+        family = ("tiro", "tibo", "tiit", "tibi")
+    else:
+        family = ("helv", "hebo", "heit", "hebi")
+
+    bold = any(k in name for k in ("bold", "black", "heavy", "semibold", "demi"))
+    italic = any(k in name for k in ("italic", "oblique"))
+    return family[bold + 2 * italic]
+
+def embedding_fstype(buffer: bytes) -> Optional[int]:
+    """fsType from a TrueType/OpenType font's OS/2 table, or None if it has none"""
+    try:
+        num_tables = struct.unpack(">H", buffer[4:6])[0]
+        for i in range(num_tables):
+            entry = 12 + 16 * i
+            tag, _, offset, _ = struct.unpack(">4sIII", buffer[entry:entry + 16])
+            if tag == b"OS/2":
+                return struct.unpack(">H", buffer[offset + 8:offset + 10])[0]
+    except struct.error:
+        pass
+    return None
+
+def editing_allowed(fstype: Optional[int]) -> bool:
+    """
+    Whether a font's license lets it be used for new text in an edited document
+
+    Only installable (0) and editable fonts qualify. Restricted,
+    preview & print and bitmap-only fonts do not, and neither do fonts
+    without licensing flags (we can't tell).
+    """
+    if fstype is None:
+        return False
+    if fstype & FSTYPE_BITMAP_ONLY:
+        return False
+    return fstype & 0x000F in (0, FSTYPE_EDITABLE)
+
+class FontMetrics:
+    """Glyph coverage and cached advance widths (at size 1) of one font"""
+    __slots__ = ("font", "_advances", "_words")
+
+    def __init__(self, font: "fitz.Font"):
+        self.font = font
+        # Advance per character; None when the font has no glyph for it
+        self._advances: Dict[str, Optional[float]] = {}
+        # Width per word, so repeated words are never measured again
+        self._words: Dict[str, float] = {}
+
+    def _advance(self, char: str) -> Optional[float]:
+        advance = self._advances.get(char, -1.0)
+        if advance == -1.0:
+            code = ord(char)
+            advance = self.font.glyph_advance(code) if self.font.has_glyph(code) else None
+            self._advances[char] = advance
+        return advance
+
+    def covers(self, text: str) -> bool:
+        """Whether every character of text has a glyph"""
+        return all(self._advance(c) is not None for c in text)
+
+    def text_length(self, text: str, font_size: float) -> float:
+        return sum(self._advance(c) or 0.0 for c in text) * font_size
+
+    def word_widths(self, words: List[str]) -> List[float]:
+        """Widths (at size 1) of many words, measuring only unseen ones"""
+        cache = self._words
+        missing = [w for w in set(words) if w not in cache]
+        for word in missing:
+            cache[word] = self.text_length(word, 1.0)
+        return [cache[w] for w in words]
+
+    def char_advances(self, text: str) -> List[float]:
+        """Advance (at size 1) of each character, for breaking overlong words"""
+        return [self._advance(c) or 0.0 for c in text]
+
+class SharedFont:
+    """A font binary found in an input PDF, parsed once per process"""
+
+    def __init__(self, digest: str, buffer: bytes):
+        self.digest = digest
+        self.buffer = buffer
+        self.alias = ALIAS_PREFIX + digest[:12]
+        self.editable = editing_allowed(embedding_fstype(buffer))
+        self.metrics: Optional[FontMetrics] = None
+        if self.editable:
+            try:
+                self.metrics = FontMetrics(fitz.Font(fontbuffer=buffer))
+            except Exception:
+                self.editable = False
+        self._to_unicode: Optional[bytes] = None
+
+    def usable_for(self, text: str) -> bool:
+        return self.editable and self.metrics.covers(text)
+
+    def to_unicode(self) -> bytes:
+        """
+        ToUnicode CMap for the re-embedded font
+
+        PyMuPDF's own map sends glyphs shared by several code points to the
+        last of them (space to U+00A0, hyphen to U+00AD), which breaks text
+        extraction of the edited PDF. Here the lowest code point wins.
+        """
+        if self._to_unicode is None:
+            font = self.metrics.font
+            glyphs: Dict[int, int] = {}
+            for code in sorted(font.valid_codepoints()):
+                gid = font.has_glyph(code)
+                if gid and gid not in glyphs:
+                    glyphs[gid] = code
+
+            lines = [
+                "/CIDInit /ProcSet findresource begin", "12 dict begin", "begincmap",
+                "/CIDSystemInfo <</Registry(Adobe)/Ordering(UCS)/Supplement 0>> def",
+                "/CMapName /Adobe-Identity-UCS def", "/CMapType 2 def",
+                "1 begincodespacerange", "<0000> <FFFF>", "endcodespacerange"
+            ]
+            items = sorted(glyphs.items())
+            # bfchar blocks are limited to 100 entries each
+            for start in range(0, len(items), 100):
+                chunk = items[start:start + 100]
+                lines.append(f"{len(chunk)} beginbfchar")
+                lines.extend(f"<{gid:04x}> <{chr(code).encode('utf-16-be').hex()}>"
+                             for gid, code in chunk)
+                lines.append("endbfchar")
+            lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+            self._to_unicode = "\n".join(lines).encode("ascii")
+        return self._to_unicode
+
+class FontCache:
+    """
+    Fonts shared by every document a process edits, keyed by content hash
+
+    Resumes from one template embed the same font binaries, so each is
+    parsed, license-checked and measured once per process instead of once
+    per document. Base-14 metrics are cached here as well.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._fonts: "OrderedDict[str, SharedFont]" = OrderedDict()
+        self._base14: Dict[str, FontMetrics] = {}
+
+    def get(self, buffer: bytes) -> SharedFont:
+        digest = hashlib.sha1(buffer).hexdigest()
+        font = self._fonts.get(digest)
+        if font is None:
+            font = self._fonts[digest] = SharedFont(digest, buffer)
+            if len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+        else:
+            self._fonts.move_to_end(digest)
+        return font
+
+    def base14(self, font_name: str) -> FontMetrics:
+        metrics = self._base14.get(font_name)
+        if metrics is None:
+            metrics = self._base14[font_name] = FontMetrics(fitz.Font(font_name))
+        return metrics
+
+# Process-wide cache used by editors that are not given one
+DEFAULT_FONT_CACHE = FontCache()
+
+class FontRegistry:
+    """
+    Fonts available to one document's edits
+
+    resolve() picks the font for new text: the document's own embedded
+    font when its license allows editing and it has every glyph needed
+    (subset fonts often don't), otherwise the closest Base-14 font. Each
+    font is put into the PDF once and then only referenced from the other
+    pages that use it.
+    """
+
+    def __init__(self, doc: "fitz.Document", cache: Optional[FontCache] = None):
+        self.doc = doc
+        self.cache = cache or DEFAULT_FONT_CACHE
+        # Embedded font xrefs per font name (subset prefix removed), built
+        # on first use
+        self._xrefs_by_name: Optional[Dict[str, List[int]]] = None
+        self._extracted: Dict[int, Optional[SharedFont]] = {}
+        # Re-embedded fonts by alias, and the xref each was embedded as
+        self._aliases: Dict[str, SharedFont] = {}
+        self._embedded: Dict[str, int] = {}
+        # (page number, alias) pairs already usable on that page
+        self._on_page: Set[Tuple[int, str]] = set()
+
+    def _font_xrefs(self) -> Dict[str, List[int]]:
+        if self._xrefs_by_name is None:
+            by_name: Dict[str, List[int]] = {}
+            for page_num in range(len(self.doc)):
+                for xref, ext, _, basefont, *_ in self.doc.get_page_fonts(page_num):
+                    if ext == "n/a":  # not embedded
+                        continue
+                    xrefs = by_name.setdefault(SUBSET_PREFIX.sub("", basefont), [])
+                    if xref not in xrefs:
+                        xrefs.append(xref)
+            self._xrefs_by_name = by_name
+        return self._xrefs_by_name
+
+    def _shared_font(self, xref: int) -> Optional[SharedFont]:
+        if xref not in self._extracted:
+            try:
+                _, _, _, buffer = self.doc.extract_font(xref)
+            except Exception:
+                buffer = b""
+            self._extracted[xref] = self.cache.get(buffer) if buffer else None
+        return self._extracted[xref]
+
+    def resolve(self, font_name: str, text: str) -> str:
+        """
+        Font to draw text in, given the font of the text it sits with
+
+        Args:
+            font_name: Extracted span font name, or a Base-14 name
+            text: All text that will be drawn in this font (so glyph
+                coverage can be checked)
+
+        Returns:
+            str: Name to pass as fontname when drawing
+        """
+        if font_name.lower() in fitz.Base14_fontdict:
+            return font_name.lower()
+
+        for xref in self._font_xrefs().get(SUBSET_PREFIX.sub("", font_name), []):
+            font = self._shared_font(xref)
+            if font is not None and font.usable_for(text):
+                self._aliases[font.alias] = font
+                return font.alias
+
+        return base14_for(font_name)
+
+    def _alias_font(self, alias: str) -> SharedFont:
+        font = self._aliases.get(alias)
+        if font is None:
+            # A plan compiled by another editor for the same PDF
+            for xrefs in self._font_xrefs().values():
+                for xref in xrefs:
+                    candidate = self._shared_font(xref)
+                    if candidate is not None and candidate.alias == alias:
+                        font = self._aliases[alias] = candidate
+            if font is None:
+                raise ValueError(f"Unknown font '{alias}'")
+        return font
+
+    def known(self, font_name: str) -> bool:
+        """Whether font_name can be drawn with (Base-14 or resolved here)"""
+        return font_name.lower() in fitz.Base14_fontdict or font_name in self._aliases
+
+    def metrics(self, font_name: str) -> FontMetrics:
+        """Width metrics of a font returned by resolve()"""
+        if font_name.lower() in fitz.Base14_fontdict:
+            return self.cache.base14(font_name.lower())
+        return self._alias_font(font_name).metrics
+
+    def text_length(self, font_name: str, text: str, font_size: float) -> float:
+        """Width of text in a font returned by resolve()"""
+        return self.metrics(font_name).text_length(text, font_size)
+
+    def register(self, page: "fitz.Page", font_name: str):
+        """Make a resolved font usable for drawing on page"""
+        key = (page.number, font_name)
+        if key in self._on_page:
+            return
+
+        if font_name.lower() in fitz.Base14_fontdict:
+            page.insert_font(fontname=font_name)
+        elif font_name in self._embedded and self._share(page, font_name):
+            pass
+        else:
+            font = self._alias_font(font_name)
+            xref = page.insert_font(fontname=font_name, fontbuffer=font.buffer)
+            kind, value = self.doc.xref_get_key(xref, "ToUnicode")
+            if kind == "xref":
+                self.doc.update_stream(int(value.split()[0]), font.to_unicode())
+            self._embedded.setdefault(font_name, xref)
+        self._on_page.add(key)
+
+    def forget_pages(self):
+        """Pages were inserted or rewritten: register fonts with them again"""
+        self._on_page.clear()
+
+    def _share(self, page: "fitz.Page", font_name: str) -> bool:
+        """Reference an already embedded font from page's resources"""
+        reference = f"{self._embedded[font_name]} 0 R"
+        kind, value = self.doc.xref_get_key(page.xref, "Resources/Font")
+        if kind == "xref":
+            self.doc.xref_set_key(int(value.split()[0]), font_name, reference)
+        elif kind == "dict":
+            self.doc.xref_set_key(page.xref, f"Resources/Font/{font_name}", reference)
+        else:
+            # Inherited or missing resources: embed again instead
+            return False
+        return True
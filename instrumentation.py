@@ -0,0 +1,89 @@
+import math
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+class StageTimer:
+    """
+    Per-stage wall time, CPU time and (optionally) peak allocation
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("save"):
+            editor.save()
+        result["timings"] = timer.as_dict()
+
+    Peak allocation comes from tracemalloc, so it covers Python-level
+    allocations only (PyMuPDF's C heap is not visible) and is off by
+    default because tracing slows allocation-heavy code noticeably.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`"""
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            metrics = {
+                "wall_ms": round((time.perf_counter() - wall_start) * 1000, 3),
+                "cpu_ms": round((time.process_time() - cpu_start) * 1000, 3)
+            }
+            if tracing:
+                metrics["peak_alloc_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                tracemalloc.stop()
+            self.stages[name] = metrics
+
+    def total_wall_ms(self) -> float:
+        return round(sum(m["wall_ms"] for m in self.stages.values()), 3)
+
+    def as_dict(self) -> Dict:
+        """Metrics for the report: per-stage numbers plus the total"""
+        return {"stages": self.stages, "total_ms": self.total_wall_ms()}
+
+class _NullTimer:
+    """Stand-in when no instrumentation is requested"""
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+NULL_TIMER = _NullTimer()
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def stage_percentiles(results: Iterable[Dict]) -> Dict[str, Dict[str, float]]:
+    """p50/p95/p99 wall time per stage (and for the whole file) across results"""
+    samples: Dict[str, List[float]] = {}
+    for result in results:
+        timings = result.get("timings")
+        if not timings:
+            continue
+        for name, metrics in timings["stages"].items():
+            samples.setdefault(name, []).append(metrics["wall_ms"])
+        samples.setdefault("total", []).append(timings["total_ms"])
+
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99)
+        }
+    return summary
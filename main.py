@@ -1,9 +1,28 @@
 
+import io
 import os
 import json
+import heapq
+import cProfile
+import tempfile
+import contextlib
+import socket
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List
-from pdf_editor import PDFResumeEditor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from pdf_editor import PDFResumeEditor, SAVE_PROFILES
+from edit_plan import EditPlan
+from analysis_cache import AnalysisCache
+from async_batch import AsyncBatchDriver
+from template_cache import TemplateCache
+from manifest import OutputManifest
+from work_queue import WorkQueue
+from report_writer import ReportWriter, latest_results, successful_filenames, summarize
+from instrumentation import NULL_TIMER, StageTimer, stage_percentiles
 from datetime import datetime
 
 class ResumeEditConfig:
@@ -47,6 +66,19 @@ class ResumeEditConfig:
             print(f"✅ Created default configuration: {self.config_file}")
             return default_config
 
+    @classmethod
+    def from_dict(cls, config: Dict) -> "ResumeEditConfig":
+        """Config built from an in-memory dict (nothing is read or written)"""
+        instance = cls.__new__(cls)
+        instance.config_file = None
+        instance.config = config
+        return instance
+
+    def config_hash(self) -> str:
+        """Stable hash of the edit configuration"""
+        canonical = json.dumps(self.config, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
     def get_experience_lines(self) -> List[str]:
         return self.config.get("experience_to_add", [])
 
@@ -56,19 +88,203 @@ class ResumeEditConfig:
     def get_certifications(self) -> List[str]:
         return self.config.get("certifications_to_add", [])
 
+    def get_min_font_scale(self) -> float:
+        return self.config.get("min_font_scale", 1.0)
+
+    def get_edited_sections(self) -> Tuple[str, ...]:
+        """Sections the configured edits need (lowercase name fragments)"""
+        # Experience and skills are always planned, certifications per entry
+        sections = ("experience", "skill")
+        if self.get_certifications():
+            sections += ("certif",)
+        return sections
+
+def _new_result(filename: str) -> Dict:
+    """Empty result record for one resume"""
+    return {
+        "filename": filename,
+        "success": False,
+        "experience_added": False,
+        "skills_modified": 0,
+        "certifications_added": 0,
+        "errors": []
+    }
+
+def plan_config_edits(editor: PDFResumeEditor, config: ResumeEditConfig,
+                      timer: Optional[StageTimer] = None) -> EditPlan:
+    """Resolve the configured edits to draw operations, without drawing"""
+    timer = timer or NULL_TIMER
+    print("\n🧭 Planning edits...")
+    skill_mods = config.get_skill_modifications()
+    mapping = {skill_mod["old"]: skill_mod["new"] for skill_mod in skill_mods}
+    with timer.stage("plan_edits"):
+        return editor.compile_plan(config.get_experience_lines(), mapping,
+                                   config.get_certifications(), position="top",
+                                   min_font_scale=config.get_min_font_scale())
+
+def record_plan_outcome(plan: EditPlan, config: ResumeEditConfig, result: Dict):
+    """Fill result's edit counts from a plan (what was, or would be, applied)"""
+    if plan.experience_added:
+        result["experience_added"] = True
+        print(f"✅ Added {len(config.get_experience_lines())} lines of experience")
+    else:
+        result["errors"].append("Failed to add experience")
+
+    result["skills_modified"] = sum(1 for count in plan.skills_modified.values() if count)
+    if result["skills_modified"] == 0:
+        print("ℹ️  No skills were modified (may not exist in resume)")
+
+    for cert in plan.certifications_added:
+        result["certifications_added"] += 1
+        print(f"✅ Added: {cert}")
+
+    if plan.failures:
+        result["plan_failures"] = dict(plan.failures)
+    if plan.collisions:
+        result["edit_collisions"] = [list(pair) for pair in plan.collisions]
+    if plan.overdrawn:
+        result["overdrawn_edits"] = list(plan.overdrawn)
+
+def apply_config_edits(editor: PDFResumeEditor, config: ResumeEditConfig, result: Dict,
+                       timer: Optional[StageTimer] = None):
+    """Run the configured experience, skill and certification edits, updating result"""
+    timer = timer or NULL_TIMER
+
+    # Resolve every edit to draw operations first, then draw them in one
+    # pass per page
+    plan = plan_config_edits(editor, config, timer)
+
+    print("\n✏️  Applying edits...")
+    with timer.stage("apply_edits"):
+        editor.apply_plan(plan)
+
+    record_plan_outcome(plan, config, result)
+
+def edit_resume_bytes(pdf_bytes: Union[bytes, bytearray, memoryview],
+                      config: Optional[ResumeEditConfig] = None,
+                      filename: str = "resume.pdf",
+                      analysis_cache: Optional[AnalysisCache] = None,
+                      save_profile: str = "smallest",
+                      template_cache: Optional[TemplateCache] = None,
+                      lazy: bool = False, reflow: bool = False,
+                      redact: bool = False,
+                      trace_memory: bool = False) -> Tuple[Optional[bytes], Dict]:
+    """
+    Edit an in-memory resume with the configured edits, without disk I/O
+
+    Args:
+        pdf_bytes: The resume PDF
+        config: Edits to apply (default: edit_config.json)
+        filename: Name recorded in the result
+        analysis_cache: Optional cache of analysis results
+        save_profile: One of SAVE_PROFILES
+        template_cache: Optional cache of recurring resume templates
+        lazy: Only extract pages up to the edited sections
+        reflow: Move existing content down to make room for inserted lines
+        redact: Remove replaced skill text instead of covering it
+        trace_memory: Record tracemalloc peaks per stage
+
+    Returns:
+        Tuple of (edited PDF bytes or None on failure, result dict)
+    """
+    config = config or ResumeEditConfig()
+    result = _new_result(filename)
+    timer = StageTimer(trace_memory=trace_memory)
+    edited = None
+
+    try:
+        editor = PDFResumeEditor.from_bytes(pdf_bytes, analysis_cache=analysis_cache,
+                                            timer=timer, save_profile=save_profile,
+                                            template_cache=template_cache, lazy=lazy,
+                                            reflow=reflow, redact=redact,
+                                            lazy_sections=config.get_edited_sections())
+        if analysis_cache:
+            result["analysis_cached"] = editor.analysis_cached
+        if editor.template_hit is not None:
+            result["template_hit"] = editor.template_hit
+        try:
+            apply_config_edits(editor, config, result, timer)
+            with timer.stage("save"):
+                edited = editor.to_bytes()
+            result["success"] = True
+        finally:
+            editor.close()
+    except Exception as e:
+        result["errors"].append(str(e))
+        print(f"\n❌ Error processing {filename}: {str(e)}")
+
+    result["timings"] = timer.as_dict()
+    return edited, result
+
+# Per-process processor used by pool workers (set by _init_worker)
+_worker_processor = None
+
+def _init_worker(input_dir: str, output_dir: str, options: Dict):
+    """Build one processor per worker process, mirroring the parent's options"""
+    global _worker_processor
+    _worker_processor = BatchResumeProcessor(input_dir, output_dir, **options)
+
+def _process_in_worker(pdf_path: str) -> Dict:
+    """Process a single resume inside a pool worker"""
+    return _worker_processor.process_single_resume(Path(pdf_path))
+
+def _process_bytes_in_worker(pdf_bytes: bytes, filename: str) -> Tuple[Optional[bytes], Dict]:
+    """Edit an already-read resume inside a pool worker (used by the async driver)"""
+    processor = _worker_processor
+    return edit_resume_bytes(pdf_bytes, processor.config, filename=filename,
+                             analysis_cache=processor.analysis_cache,
+                             save_profile=processor.save_profile,
+                             template_cache=processor.template_cache,
+                             lazy=processor.lazy, reflow=processor.reflow,
+                             redact=processor.redact,
+                             trace_memory=processor.trace_memory)
+
 class BatchResumeProcessor:
     """Process multiple resumes with same edits"""
 
-    def __init__(self, input_dir: str = "input_resumes", output_dir: str = "output_resumes"):
+    def __init__(self, input_dir: str = "input_resumes", output_dir: str = "output_resumes",
+                 workers: int = 1, config: Optional[ResumeEditConfig] = None,
+                 analysis_cache: Optional[AnalysisCache] = None, incremental: bool = False,
+                 resume_from: Optional[str] = None, trace_memory: bool = False,
+                 profile_slowest: int = 0, save_profile: str = "smallest",
+                 async_io: bool = False, max_in_flight: Optional[int] = None,
+                 memory_budget: int = 512 * 1024 * 1024,
+                 template_cache: Optional[TemplateCache] = None, lazy: bool = False,
+                 dry_run: bool = False, reflow: bool = False, redact: bool = False):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
-        self.config = ResumeEditConfig()
+        self.config = config or ResumeEditConfig()
+        self.workers = max(1, workers)
+        self.analysis_cache = analysis_cache
+        self.template_cache = template_cache
+        self.lazy = lazy
+        # Reflow: insertions push the content below them down
+        self.reflow = reflow
+        # Redact: replaced skill text is removed rather than covered
+        self.redact = redact
+        self.incremental = incremental
+        self.resume_from = resume_from
+        # Instrumentation: tracemalloc peaks per stage, and cProfile dumps
+        # of the N slowest files (re-run after the batch, so the timings
+        # in the report are never taken under the profiler)
+        self.trace_memory = trace_memory
+        self.profile_slowest = profile_slowest
+        self.save_profile = save_profile
+        # Async driver: overlap reads/writes with editing, bounded by file
+        # count and an estimated memory budget
+        self.async_io = async_io
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.memory_budget = memory_budget
+        # Dry run: analyze and plan only; nothing is drawn or saved
+        self.dry_run = dry_run
 
         # Create directories if they don't exist
         self.output_dir.mkdir(exist_ok=True)
 
-        # Results tracking
-        self.results = []
+        # Results are streamed to report_file rather than kept in memory
+        self.report_file: Optional[Path] = None
+        self.summary: Dict = {}
+        self.slowest_profiles: List[str] = []
 
     def process_all_resumes(self):
         """Process all PDF resumes in input directory"""
@@ -86,29 +302,416 @@ class BatchResumeProcessor:
 
         print(f"\n📁 Found {len(pdf_files)} PDF file(s) to process")
         print(f"📂 Output directory: {self.output_dir}")
+        if self.dry_run:
+            print("🧪 Dry run: planning edits only, no PDFs will be written")
+
+        # Resuming appends to the earlier report and skips its successes
+        if self.resume_from:
+            self.report_file = Path(self.resume_from)
+            if self.report_file.exists():
+                done = successful_filenames(self.report_file)
+                pdf_files = [p for p in pdf_files if p.name not in done]
+                print(f"⏩ Resuming {self.report_file}: {len(done)} already done, "
+                      f"{len(pdf_files)} remaining")
+        else:
+            prefix = "dryrun" if self.dry_run else "report"
+            self.report_file = self.output_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+        # In incremental mode, carry forward results whose output is current
+        carried: Dict[int, Dict] = {}
+        manifest = None
+        if self.incremental:
+            manifest = OutputManifest(self.output_dir)
+            config_hash = self.config.config_hash()
+            options = self._output_options()
+            input_hashes = [manifest.input_hash(pdf_file) for pdf_file in pdf_files]
+            for i, pdf_file in enumerate(pdf_files):
+                previous = manifest.up_to_date_result(pdf_file, input_hashes[i], config_hash, options)
+                if previous:
+                    carried[i] = dict(previous, up_to_date=True)
+
+            print(f"♻️  Up to date: {len(carried)}, to process: {len(pdf_files) - len(carried)}")
+
+        writer = ReportWriter(self.report_file)
+        # Results are streamed in input order; out-of-order ones wait here
+        buffered: Dict[int, Dict] = {}
+        next_index = 0
+
+        def emit(index: int, result: Dict):
+            nonlocal next_index
+            if manifest:
+                # Carried-forward entries are re-recorded to refresh size/mtime
+                manifest.record(pdf_files[index], input_hashes[index], config_hash, options, result)
+            buffered[index] = result
+            while next_index in buffered:
+                writer.write(buffered.pop(next_index))
+                next_index += 1
 
-        # Process each resume
-        for i, pdf_file in enumerate(pdf_files, 1):
-            print(f"\n{'='*70}")
-            print(f"Processing {i}/{len(pdf_files)}: {pdf_file.name}")
-            print('='*70)
+        try:
+            for i, result in carried.items():
+                emit(i, result)
+
+            pending = [i for i in range(len(pdf_files)) if i not in carried]
+
+            if self.async_io and not self.dry_run:
+                self._process_async(
+                    [pdf_files[i] for i in pending],
+                    lambda n, result: emit(pending[n], result)
+                )
+            elif self.workers > 1:
+                self._process_parallel(
+                    [pdf_files[i] for i in pending],
+                    lambda n, result: emit(pending[n], result)
+                )
+            else:
+                # Process each resume
+                for n, i in enumerate(pending, 1):
+                    print(f"\n{'='*70}")
+                    print(f"Processing {n}/{len(pending)}: {pdf_files[i].name}")
+                    print('='*70)
+
+                    emit(i, self.process_single_resume(pdf_files[i]))
+        finally:
+            writer.close()
+            if manifest:
+                manifest.save()
 
-            result = self.process_single_resume(pdf_file)
-            self.results.append(result)
+        if self.profile_slowest:
+            self._profile_slowest()
 
         # Generate report
         self._generate_report()
 
+    def coordinate_queue(self, queue_path: str, lease_seconds: float = 300.0,
+                         poll_interval: float = 5.0):
+        """
+        Coordinator side of a distributed run
+
+        Enqueues every PDF in input_dir, waits until workers (on any host
+        sharing the queue file) have finished them all, then merges their
+        per-file results into one report.
+        """
+        print("\n" + "="*70)
+        print("🚀 BATCH RESUME COORDINATOR")
+        print("="*70)
+
+        pdf_files = sorted(self.input_dir.glob("*.pdf"))
+        queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+        try:
+            added = queue.enqueue(p.name for p in pdf_files)
+            print(f"\n📥 Queued {added} new file(s) in {queue_path} "
+                  f"({len(pdf_files) - added} already queued)")
+            print(f"   Start workers with: python main.py {self.input_dir} {self.output_dir} "
+                  f"--queue {queue_path}")
+
+            last = None
+            while True:
+                counts = queue.counts()
+                if counts != last:
+                    finished = counts["done"] + counts["failed"]
+                    print(f"⏳ {finished}/{sum(counts.values())} finished "
+                          f"({counts['claimed']} in progress, {counts['failed']} failed)")
+                    last = counts
+                if counts["pending"] + counts["claimed"] == 0:
+                    break
+                time.sleep(poll_interval)
+
+            self.report_file = self.output_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            writer = ReportWriter(self.report_file)
+            try:
+                for result in queue.results():
+                    writer.write(result)
+            finally:
+                writer.close()
+        finally:
+            queue.close()
+
+        self._generate_report()
+
+    def process_queue(self, queue_path: str, lease_seconds: float = 300.0,
+                      poll_interval: float = 2.0) -> int:
+        """
+        Worker side of a distributed run
+
+        Claims files from the shared queue, processes them and acknowledges
+        each result, until nothing is pending or claimed. While other
+        workers still hold claims, keeps polling so expired ones are
+        picked up.
+
+        Returns:
+            int: Number of files this worker processed
+        """
+        queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        try:
+            while True:
+                filename = queue.claim(worker)
+                if filename is None:
+                    if queue.outstanding() == 0:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                print(f"\n{'='*70}")
+                print(f"Processing {filename} ({worker})")
+                print('='*70)
+                result = self.process_single_resume(self.input_dir / filename)
+                if not queue.ack(filename, worker, result):
+                    print(f"⚠️  Claim on {filename} expired before it finished; result discarded")
+                processed += 1
+        finally:
+            queue.close()
+        return processed
+
+    def run_queue_workers(self, queue_path: str, lease_seconds: float = 300.0,
+                          poll_interval: float = 2.0):
+        """
+        Drain the shared queue with self.workers local worker processes
+
+        This process claims files and hands them to the pool one at a
+        time, so a hard crash in one worker only takes down the files
+        running at that moment. As in _process_parallel, those are re-run
+        one at a time to pin the crash on the file that caused it, which
+        is recorded as failed; the rest carries on in a fresh pool until
+        nothing is pending or claimed.
+        """
+        print(f"⚙️  Queue: {queue_path} | Workers: {self.workers}")
+        if self.workers == 1:
+            processed = self.process_queue(queue_path, lease_seconds, poll_interval)
+            print(f"\n✅ Worker finished: processed {processed} file(s)")
+            return
+
+        queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        # Files leased to this worker and not yet submitted
+        claimed: deque = deque()
+        suspects: deque = deque()
+        try:
+            while True:
+                if suspects:
+                    count, crashed = self._run_queue_pool(queue, worker, suspects, 1,
+                                                          False, poll_interval)
+                    for filename in crashed:
+                        print(f"\n❌ Worker crashed on {filename}")
+                        queue.ack(filename, worker, self._failed_result(
+                            self.input_dir / filename, "Worker process crashed"))
+                        count += 1
+                else:
+                    count, crashed = self._run_queue_pool(queue, worker, claimed, self.workers,
+                                                          True, poll_interval)
+                    if not crashed:
+                        processed += count
+                        break
+                    suspects.extend(crashed)
+                processed += count
+        finally:
+            queue.close()
+        print(f"\n✅ Worker finished: processed {processed} file(s)")
+
+    def _run_queue_pool(self, queue: WorkQueue, worker: str, claimed: deque, workers: int,
+                        claim: bool, poll_interval: float) -> Tuple[int, List[str]]:
+        """
+        Run queued files in a fresh pool until none are left or the pool breaks
+
+        Files in claimed, already leased to worker, go first. With claim,
+        more are then claimed from the queue, and the pool keeps polling
+        while other workers hold claims, so expired ones are picked up.
+
+        Returns:
+            Tuple of (files processed, files running when the pool broke)
+        """
+        processed = 0
+        crashed = []
+        in_flight: Dict = {}
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(self.input_dir), str(self.output_dir), self._worker_options())
+        ) as pool:
+            while True:
+                while len(in_flight) < workers and not crashed:
+                    filename = claimed.popleft() if claimed else None
+                    if filename is None and claim:
+                        filename = queue.claim(worker)
+                    if filename is None:
+                        break
+                    try:
+                        in_flight[pool.submit(_process_in_worker,
+                                              str(self.input_dir / filename))] = filename
+                    except BrokenProcessPool:
+                        claimed.appendleft(filename)
+                        break
+                if not in_flight:
+                    if crashed or not claim or queue.outstanding() == 0:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(filename)
+                        continue
+                    except Exception as e:
+                        result = self._failed_result(self.input_dir / filename, str(e))
+
+                    status = "✅" if result["success"] else "❌"
+                    print(f"{status} {filename} ({worker})")
+                    if not queue.ack(filename, worker, result):
+                        print(f"⚠️  Claim on {filename} expired before it finished; result discarded")
+                    processed += 1
+
+        return processed, crashed
+
+    def _process_parallel(self, pdf_files: List[Path], on_result: Callable[[int, Dict], None]):
+        """
+        Process resumes across a pool of worker processes
+
+        Each worker opens its own PyMuPDF documents; nothing fitz-related
+        crosses process boundaries, only paths and result dicts.
+
+        Args:
+            pdf_files: Resumes to process
+            on_result: Called with (index into pdf_files, result) as each finishes
+        """
+        if not pdf_files:
+            return
+
+        print(f"⚙️  Workers: {self.workers}")
+        progress = {"done": 0, "total": len(pdf_files)}
+        remaining = deque(range(len(pdf_files)))
+        suspects: deque = deque()
+
+        # A hard crash (segfault, OOM kill) breaks the whole pool and every
+        # file running in it. Those are re-run one at a time in a 1-worker
+        # pool to pin the failure on the file that caused it; the rest of
+        # the batch carries on in a fresh pool of full size.
+        while remaining or suspects:
+            if suspects:
+                for index in self._run_pool(pdf_files, suspects, on_result, 1, progress):
+                    print(f"\n❌ Worker crashed on {pdf_files[index].name}")
+                    on_result(index, self._failed_result(pdf_files[index], "Worker process crashed"))
+            else:
+                suspects.extend(self._run_pool(pdf_files, remaining, on_result,
+                                               self.workers, progress))
+
+    def _process_async(self, pdf_files: List[Path], on_result: Callable[[int, Dict], None]):
+        """
+        Process resumes with the asyncio driver
+
+        Inputs are read and outputs written on I/O threads while the
+        PyMuPDF work runs in worker processes, so slow storage (e.g. a
+        network mount) overlaps with editing instead of stalling it.
+        """
+        if not pdf_files:
+            return
+
+        print(f"⚙️  Workers: {self.workers} | In flight: {self.max_in_flight} | "
+              f"Memory budget: {self.memory_budget // (1024 * 1024)} MB")
+
+        driver = AsyncBatchDriver(
+            executor_factory=lambda: ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(str(self.input_dir), str(self.output_dir), self._worker_options())
+            ),
+            edit_fn=_process_bytes_in_worker,
+            output_path_for=lambda pdf_file: self.output_dir / f"edited_{pdf_file.name}",
+            max_in_flight=self.max_in_flight,
+            memory_budget=self.memory_budget
+        )
+        driver.run(pdf_files, on_result)
+
+    def _run_pool(self, pdf_files: List[Path], queue: deque,
+                  on_result: Callable[[int, Dict], None], workers: int,
+                  progress: Dict) -> List[int]:
+        """
+        Run files from queue in a fresh pool until it is empty or the pool breaks
+
+        At most `workers` files are submitted at a time, so a crash only
+        takes down the files actually running. Files not submitted yet stay
+        in queue.
+
+        Returns:
+            Indices of the files that were running when the pool broke
+        """
+        crashed = []
+        in_flight: Dict = {}
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(self.input_dir), str(self.output_dir), self._worker_options())
+        ) as pool:
+            while queue or in_flight:
+                while queue and len(in_flight) < workers and not crashed:
+                    index = queue.popleft()
+                    try:
+                        in_flight[pool.submit(_process_in_worker, str(pdf_files[index]))] = index
+                    except BrokenProcessPool:
+                        queue.appendleft(index)
+                        break
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(index)
+                        continue
+                    except Exception as e:
+                        result = self._failed_result(pdf_files[index], str(e))
+
+                    progress["done"] += 1
+                    status = "✅" if result["success"] else "❌"
+                    print(f"{status} [{progress['done']}/{progress['total']}] {pdf_files[index].name}")
+                    on_result(index, result)
+
+        return sorted(crashed)
+
+    def _worker_options(self) -> Dict:
+        """Constructor options a worker needs to process single files like this one"""
+        return {
+            "config": self.config,
+            "analysis_cache": self.analysis_cache,
+            "trace_memory": self.trace_memory,
+            "save_profile": self.save_profile,
+            "template_cache": self.template_cache,
+            "lazy": self.lazy,
+            "dry_run": self.dry_run,
+            "reflow": self.reflow,
+            "redact": self.redact
+        }
+
+    def _output_options(self) -> Dict:
+        """Options besides the edit config that change the PDFs written"""
+        return {
+            "save_profile": self.save_profile,
+            "lazy": self.lazy,
+            "reflow": self.reflow,
+            "redact": self.redact
+        }
+
+    @staticmethod
+    def _failed_result(input_pdf: Path, error: str) -> Dict:
+        """Result entry for a file that never produced its own result"""
+        result = _new_result(input_pdf.name)
+        result["errors"].append(error)
+        return result
+
     def process_single_resume(self, input_pdf: Path) -> Dict:
         """Process a single resume"""
-        result = {
-            "filename": input_pdf.name,
-            "success": False,
-            "experience_added": False,
-            "skills_modified": 0,
-            "certifications_added": 0,
-            "errors": []
-        }
+        result = _new_result(input_pdf.name)
+        timer = StageTimer(trace_memory=self.trace_memory)
 
         try:
             # Create output filename
@@ -116,41 +719,39 @@ class BatchResumeProcessor:
 
             # Initialize editor
             print("\n🔧 Initializing editor...")
-            editor = PDFResumeEditor(str(input_pdf), str(output_pdf))
-
-            # Add Experience
-            print("\n📝 Adding Experience...")
-            experience_lines = self.config.get_experience_lines()
-            if editor.add_experience(experience_lines, position="top"):
-                result["experience_added"] = True
-                print(f"✅ Added {len(experience_lines)} lines of experience")
-            else:
-                result["errors"].append("Failed to add experience")
-
-            # Modify Skills
-            print("\n🔄 Modifying Skills...")
-            skill_mods = self.config.get_skill_modifications()
-            for skill_mod in skill_mods:
-                if editor.modify_skill(skill_mod["old"], skill_mod["new"]):
-                    result["skills_modified"] += 1
-                    print(f"✅ Modified: {skill_mod['old']} → {skill_mod['new']}")
-
-            if result["skills_modified"] == 0:
-                print("ℹ️  No skills were modified (may not exist in resume)")
-
-            # Add Certifications
-            print("\n🎓 Adding Certifications...")
-            certifications = self.config.get_certifications()
-            for cert in certifications:
-                if editor.add_certification(cert):
-                    result["certifications_added"] += 1
-                    print(f"✅ Added: {cert}")
-
-            # Save
-            print("\n💾 Saving changes...")
-            if editor.save():
+            editor = PDFResumeEditor(str(input_pdf), None if self.dry_run else str(output_pdf),
+                                     analysis_cache=self.analysis_cache, timer=timer,
+                                     save_profile=self.save_profile,
+                                     template_cache=self.template_cache, lazy=self.lazy,
+                                     reflow=self.reflow, redact=self.redact,
+                                     lazy_sections=self.config.get_edited_sections())
+            if editor.template_hit is not None:
+                result["template_hit"] = editor.template_hit
+            if self.analysis_cache:
+                result["analysis_cached"] = editor.analysis_cached
+                if editor.analysis_cached:
+                    print("⚡ Reused cached analysis")
+
+            if self.dry_run:
+                # Predict the outcome from the plan alone: nothing is drawn
+                # or saved
+                plan = plan_config_edits(editor, self.config, timer)
+                record_plan_outcome(plan, self.config, result)
+                result["dry_run"] = True
+                result["planned_ops"] = len(plan.ops)
+                result["plan"] = plan.to_dict()
+                result["skills_missing"] = [old for old, count in plan.skills_modified.items() if not count]
                 result["success"] = True
-                result["output_path"] = str(output_pdf)
+            else:
+                apply_config_edits(editor, self.config, result, timer)
+
+                # Save
+                print("\n💾 Saving changes...")
+                with timer.stage("save"):
+                    saved = editor.save()
+                if saved:
+                    result["success"] = True
+                    result["output_path"] = str(output_pdf)
 
             editor.close()
 
@@ -158,24 +759,104 @@ class BatchResumeProcessor:
             result["errors"].append(str(e))
             print(f"\n❌ Error processing {input_pdf.name}: {str(e)}")
 
+        result["timings"] = timer.as_dict()
         return result
 
+    def _profile_slowest(self):
+        """
+        Re-run the N slowest files of the report under cProfile
+
+        The re-run writes to a scratch directory and skips the analysis and
+        template caches, so a file that was slow because it missed them is
+        profiled on the same path. Dumps go to output_dir/profiles.
+        """
+        timed = [r for r in latest_results(self.report_file)
+                 if r.get("timings") and not r.get("up_to_date")
+                 and (self.input_dir / r["filename"]).exists()]
+        slowest = heapq.nlargest(self.profile_slowest, timed,
+                                 key=lambda r: r["timings"]["total_ms"])
+        if not slowest:
+            return
+
+        print(f"\n🐢 Profiling the {len(slowest)} slowest file(s)...")
+        profile_dir = self.output_dir / "profiles"
+        profile_dir.mkdir(exist_ok=True)
+        with tempfile.TemporaryDirectory() as scratch:
+            options = dict(self._worker_options(), analysis_cache=None, template_cache=None)
+            rerun = BatchResumeProcessor(str(self.input_dir), scratch, **options)
+            for result in slowest:
+                input_pdf = self.input_dir / result["filename"]
+                profiler = cProfile.Profile()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    profiler.runcall(rerun.process_single_resume, input_pdf)
+                profile_path = profile_dir / f"{input_pdf.stem}.prof"
+                profiler.dump_stats(str(profile_path))
+                self.slowest_profiles.append(str(profile_path))
+
+    def _summarize_predictions(self):
+        """Count files per predicted problem in a dry-run report"""
+        predicted: Dict[str, int] = {}
+        for result in latest_results(self.report_file):
+            if not result.get("dry_run"):
+                continue
+            problems = list(result.get("plan_failures", {}).values())
+            problems += [f"Skill '{old}' not found" for old in result.get("skills_missing", [])]
+            for problem in problems:
+                predicted[problem] = predicted.get(problem, 0) + 1
+
+        self.summary["predicted_problems"] = dict(
+            sorted(predicted.items(), key=lambda item: item[1], reverse=True)
+        )
+        if predicted:
+            print("\n🧪 Predicted problems (files affected):")
+            for problem, count in self.summary["predicted_problems"].items():
+                print(f"  {count:>6}  {problem}")
+        else:
+            print("\n🧪 No problems predicted")
+
     def _generate_report(self):
-        """Generate processing report"""
+        """Generate processing report from the streamed results"""
         print("\n" + "="*70)
         print("📊 PROCESSING REPORT")
         print("="*70)
 
-        total = len(self.results)
-        successful = sum(1 for r in self.results if r["success"])
+        self.summary = summarize(self.report_file)
+        total = self.summary["total"]
+
+        print(f"\n✅ Successfully processed: {self.summary['successful']}/{total}")
+
+        if self.analysis_cache:
+            print(f"⚡ Analysis cache hits: {self.summary['analysis_cached']}/{total}")
+
+        if self.template_cache:
+            lookups = self.summary["template_hits"] + self.summary["template_misses"]
+            print(f"🧩 Template cache hits: {self.summary['template_hits']}/{lookups}")
 
-        print(f"\n✅ Successfully processed: {successful}/{total}")
+        if self.incremental:
+            print(f"♻️  Carried forward (up to date): {self.summary['up_to_date']}/{total}")
 
-        for result in self.results:
+        if self.dry_run:
+            self._summarize_predictions()
+
+        self.summary["stage_percentiles"] = stage_percentiles(latest_results(self.report_file))
+        if self.slowest_profiles:
+            self.summary["slowest_profiles"] = self.slowest_profiles
+
+        for result in latest_results(self.report_file):
             print(f"\n{'─'*70}")
             print(f"📄 {result['filename']}")
 
-            if result["success"]:
+            if result.get("up_to_date"):
+                print(f"  ♻️  Status: UP TO DATE")
+                print(f"  📂 Output: {result.get('output_path', 'N/A')}")
+            elif result.get("dry_run") and result["success"]:
+                print(f"  🧪 Status: PLANNED ({result['planned_ops']} operations)")
+                print(f"  📝 Experience: {'✓' if result['experience_added'] else '✗'}")
+                print(f"  🔄 Skills Modified: {result['skills_modified']}")
+                print(f"  🎓 Certifications Added: {result['certifications_added']}")
+                for edit, reason in result.get("plan_failures", {}).items():
+                    print(f"  ⚠️  {edit}: {reason}")
+            elif result["success"]:
                 print(f"  ✅ Status: SUCCESS")
                 print(f"  📝 Experience: {'✓' if result['experience_added'] else '✗'}")
                 print(f"  🔄 Skills Modified: {result['skills_modified']}")
@@ -186,23 +867,96 @@ class BatchResumeProcessor:
                 if result["errors"]:
                     print(f"  Errors: {', '.join(result['errors'])}")
 
-        # Save report to file
-        report_file = self.output_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w') as f:
-            json.dump(self.results, f, indent=2)
-
-        print(f"\n💾 Detailed report saved: {report_file}")
+        if self.summary["stage_percentiles"]:
+            print(f"\n{'─'*70}")
+            print("⏱️  Stage timings (ms)")
+            print(f"  {'stage':<22} {'p50':>10} {'p95':>10} {'p99':>10}")
+            for name, stats in self.summary["stage_percentiles"].items():
+                print(f"  {name:<22} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['p99_ms']:>10.1f}")
+
+        if self.slowest_profiles:
+            print(f"\n🐢 Profiles of the {len(self.slowest_profiles)} slowest file(s):")
+            for path in self.slowest_profiles:
+                print(f"  {path}")
+
+        # Save summary next to the report
+        summary_file = self.report_file.with_suffix(".summary.json")
+        with open(summary_file, 'w') as f:
+            json.dump(self.summary, f, indent=2)
+
+        print(f"\n💾 Detailed report saved: {self.report_file}")
+        print(f"💾 Summary saved: {summary_file}")
         print("\n" + "="*70)
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) > 1:
-        input_dir = sys.argv[1]
-        output_dir = sys.argv[2] if len(sys.argv) > 2 else "output_resumes"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch edit PDF resumes")
+    parser.add_argument("input_dir", nargs="?", default="input_resumes")
+    parser.add_argument("output_dir", nargs="?", default="output_resumes")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes (default: 1)")
+    parser.add_argument("--cache-dir",
+                        help="Reuse PDF analysis results stored in this directory")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Analysis cache size limit in MB (default: 256)")
+    parser.add_argument("--template-cache", metavar="DIR",
+                        help="Reuse section geometry of known resume templates")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Stop extracting pages once the edited sections are found")
+    parser.add_argument("--reflow", action="store_true",
+                        help="Move existing content down to make room for inserted lines instead of drawing over it")
+    parser.add_argument("--redact", action="store_true",
+                        help="Remove replaced skill text from the PDF instead of covering it with a white box")
+    parser.add_argument("--queue", metavar="DB",
+                        help="Shared work queue file; without --coordinator, run as a queue worker")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="With --queue: enqueue input_dir, wait for workers, merge the report")
+    parser.add_argument("--lease", type=float, default=300.0,
+                        help="Seconds before a stalled claim expires and is retried (default: 300)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip resumes whose output is up to date with the input and config")
+    parser.add_argument("--resume-from", metavar="REPORT",
+                        help="Continue an interrupted run, skipping files already successful in REPORT")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record peak Python allocation per stage (slower)")
+    parser.add_argument("--profile-slowest", type=int, default=0, metavar="N",
+                        help="Re-run the N slowest files under cProfile after the batch and keep the dumps")
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default="smallest",
+                        help="Trade save time against output size (default: smallest)")
+    parser.add_argument("--async-io", action="store_true",
+                        help="Overlap reading and writing files with editing")
+    parser.add_argument("--max-in-flight", type=int,
+                        help="Files held in memory at once with --async-io (default: 2 x workers)")
+    parser.add_argument("--memory-budget", type=int, default=512,
+                        help="Estimated memory limit in MB for in-flight files with --async-io (default: 512)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only analyze and plan edits; report predicted outcomes without writing PDFs")
+    args = parser.parse_args()
+    if args.dry_run and (args.incremental or args.resume_from):
+        parser.error("--dry-run cannot be combined with --incremental or --resume-from")
+    if args.lazy and args.reflow:
+        parser.error("--lazy cannot be combined with --reflow")
+
+    analysis_cache = None
+    if args.cache_dir:
+        analysis_cache = AnalysisCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+
+    template_cache = TemplateCache(args.template_cache) if args.template_cache else None
+
+    processor = BatchResumeProcessor(args.input_dir, args.output_dir, workers=args.workers,
+                                     analysis_cache=analysis_cache, incremental=args.incremental,
+                                     resume_from=args.resume_from, trace_memory=args.trace_memory,
+                                     profile_slowest=args.profile_slowest,
+                                     save_profile=args.save_profile, async_io=args.async_io,
+                                     max_in_flight=args.max_in_flight,
+                                     memory_budget=args.memory_budget * 1024 * 1024,
+                                     template_cache=template_cache, lazy=args.lazy,
+                                     dry_run=args.dry_run, reflow=args.reflow,
+                                     redact=args.redact)
+    if args.queue and args.coordinator:
+        processor.coordinate_queue(args.queue, args.lease)
+    elif args.queue:
+        processor.run_queue_workers(args.queue, args.lease)
     else:
-        input_dir = "input_resumes"
-        output_dir = "output_resumes"
-
-    processor = BatchResumeProcessor(input_dir, output_dir)
-    processor.process_all_resumes()
+        processor.process_all_resumes()
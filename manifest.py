@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+from analysis_cache import hash_pdf
+
+# Modules whose code decides what gets written for a given input and config
+OUTPUT_MODULES = ("main.py", "pdf_editor.py", "pdf_analyzer.py", "edit_plan.py", "reflow.py",
+                  "font_registry.py", "text_layout.py", "spatial_index.py")
+
+def _code_version() -> str:
+    """Digest of OUTPUT_MODULES, so any change to them regenerates old outputs"""
+    digest = hashlib.sha256()
+    here = Path(__file__).resolve().parent
+    for name in OUTPUT_MODULES:
+        digest.update(name.encode("utf-8"))
+        digest.update((here / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+TOOL_VERSION = _code_version()
+
+class OutputManifest:
+    """
+    Records which input/config/version produced each edited PDF
+
+    Stored as manifest.json next to the batch reports. An output is
+    up to date when its input hash, config hash, output options (save
+    profile, reflow, ...) and tool version all match the current run and
+    the output file still exists.
+    """
+
+    FILENAME = "manifest.json"
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / self.FILENAME
+        self.entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Ignoring unreadable manifest: {self.path}")
+            return {}
+        return data.get("files", {})
+
+    def input_hash(self, input_pdf: Path) -> str:
+        """
+        Content hash of input_pdf
+
+        Reuses the recorded hash when size and mtime are unchanged, so
+        unchanged inputs are not re-read on every run.
+        """
+        stat = input_pdf.stat()
+        entry = self.entries.get(input_pdf.name)
+        if entry and entry["input_size"] == stat.st_size and entry["input_mtime"] == stat.st_mtime:
+            return entry["input_hash"]
+        return hash_pdf(input_pdf)
+
+    def up_to_date_result(self, input_pdf: Path, input_hash: str, config_hash: str,
+                          options: Dict) -> Optional[Dict]:
+        """Previous result for input_pdf if its output needs no rebuild"""
+        entry = self.entries.get(input_pdf.name)
+        if not entry:
+            return None
+        if (entry["input_hash"] != input_hash or entry["config_hash"] != config_hash
+                or entry.get("options") != options or entry["tool_version"] != TOOL_VERSION):
+            return None
+
+        output_path = entry["result"].get("output_path")
+        if not output_path or not os.path.exists(output_path):
+            return None
+        return entry["result"]
+
+    def record(self, input_pdf: Path, input_hash: str, config_hash: str, options: Dict,
+               result: Dict):
+        """Record a finished result; failures are dropped so they are retried"""
+        if not result.get("success"):
+            self.entries.pop(input_pdf.name, None)
+            return
+
+        stat = input_pdf.stat()
+        self.entries[input_pdf.name] = {
+            "input_hash": input_hash,
+            "input_size": stat.st_size,
+            "input_mtime": stat.st_mtime,
+            "config_hash": config_hash,
+            "options": options,
+            "tool_version": TOOL_VERSION,
+            "result": {k: v for k, v in result.items() if k != "up_to_date"}
+        }
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -2,13 +2,18 @@
 import fitz  # PyMuPDF
 import re
 import json
-from typing import Dict, List, Tuple, Optional
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from pathlib import Path
 
 @dataclass
 class TextBlock:
     """Represents a text block with its properties"""
+    __slots__ = ("text", "x0", "y0", "x1", "y1", "font_name", "font_size", "color", "page_num")
+
     text: str
     x0: float
     y0: float
@@ -34,6 +39,88 @@ class TextBlock:
     def height(self):
         return self.y1 - self.y0
 
+class TextBlockTable(Sequence):
+    """
+    Columnar storage for extracted text blocks
+
+    Coordinates, sizes and page numbers live in typed arrays and font names
+    are interned, so a document costs a few machine words per span instead
+    of one object per span. Indexing and iteration yield TextBlock objects,
+    so code written against List[TextBlock] keeps working.
+    """
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.x0 = array("d")
+        self.y0 = array("d")
+        self.x1 = array("d")
+        self.y1 = array("d")
+        self.font_size = array("d")
+        self.font_id = array("I")
+        self.color = array("q")
+        self.page_num = array("I")
+        self.fonts: List[str] = []
+        self._font_ids: Dict[str, int] = {}
+
+    def append(self, text: str, x0: float, y0: float, x1: float, y1: float,
+               font_name: str, font_size: float, color: int, page_num: int):
+        """Add one span to the table"""
+        font_id = self._font_ids.get(font_name)
+        if font_id is None:
+            font_id = self._font_ids[font_name] = len(self.fonts)
+            self.fonts.append(font_name)
+
+        self.text.append(text)
+        self.x0.append(x0)
+        self.y0.append(y0)
+        self.x1.append(x1)
+        self.y1.append(y1)
+        self.font_size.append(font_size)
+        self.font_id.append(font_id)
+        self.color.append(color)
+        self.page_num.append(page_num)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TextBlockTable index out of range")
+        return TextBlock(
+            text=self.text[index],
+            x0=self.x0[index],
+            y0=self.y0[index],
+            x1=self.x1[index],
+            y1=self.y1[index],
+            font_name=self.fonts[self.font_id[index]],
+            font_size=self.font_size[index],
+            color=self.color[index],
+            page_num=self.page_num[index]
+        )
+
+    def __iter__(self) -> Iterator[TextBlock]:
+        fonts = self.fonts
+        for row in zip(self.text, self.x0, self.y0, self.x1, self.y1,
+                       self.font_id, self.font_size, self.color, self.page_num):
+            yield TextBlock(row[0], row[1], row[2], row[3], row[4],
+                            fonts[row[5]], row[6], row[7], row[8])
+
+@lru_cache(maxsize=None)
+def _compile_keywords(keywords: Tuple[str, ...]) -> Tuple["re.Pattern", Dict[str, int]]:
+    """
+    Compile section keywords into one matcher plus their priority ranks
+
+    The lookahead makes matches zero-width, so finditer reports every
+    keyword occurrence, including overlapping ones, in a single scan.
+    """
+    alternation = "|".join(re.escape(k) for k in keywords)
+    ranks = {keyword: i for i, keyword in reversed(list(enumerate(keywords)))}
+    return re.compile(f"(?=({alternation}))"), ranks
+
 @dataclass
 class Section:
     """Represents a resume section"""
@@ -46,6 +133,13 @@ class Section:
     x_start: float
     x_end: float
 
+# Text-only extraction flags: the default "dict" flags also decode images
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Bump whenever extraction or section detection changes what they produce,
+# so persisted analysis results from older versions are not reused
+ANALYZER_VERSION = "3"
+
 class PDFResumeAnalyzer:
     """Analyzes PDF resume structure and extracts sections"""
 
@@ -60,90 +154,259 @@ class PDFResumeAnalyzer:
         'summary', 'profile', 'objective'
     ]
 
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        self.doc = fitz.open(pdf_path)
-        self.text_blocks: List[TextBlock] = []
+    def __init__(self, pdf_source: Union[str, Path, bytes, "fitz.Document"]):
+        """
+        Args:
+            pdf_source: Path to a PDF, raw PDF bytes, or an already-open
+                fitz.Document. A passed-in document is shared, not copied,
+                and stays open when the analyzer is closed.
+        """
+        if isinstance(pdf_source, fitz.Document):
+            self.doc = pdf_source
+            self._owns_doc = False
+        elif isinstance(pdf_source, (bytes, bytearray, memoryview)):
+            self.doc = fitz.open(stream=pdf_source, filetype="pdf")
+            self._owns_doc = True
+        else:
+            self.doc = fitz.open(pdf_source)
+            self._owns_doc = True
+        self.pdf_path = self.doc.name or None
+        self.text_blocks: Sequence = TextBlockTable()
         self.sections: Dict[str, Section] = {}
+        # Block index range [start, end) covered by each section
+        self.section_ranges: Dict[str, Tuple[int, int]] = {}
+        # Every detected header as (block index, section name); a repeated
+        # name appears more than once here but only its last one is a section
+        self.section_headers: List[Tuple[int, str]] = []
+        # Pages covered by text_blocks (fewer than the document's after an
+        # early stop in extract_until_sections)
+        self.pages_extracted = 0
+        # Precomputed layout info (set when restored from an analysis cache)
+        self._layout_info: Optional[Dict] = None
 
-    def extract_text_blocks(self) -> List[TextBlock]:
+    def extract_text_blocks(self) -> TextBlockTable:
         """Extract all text blocks with their properties"""
-        all_blocks = []
+        all_blocks = TextBlockTable()
 
         for page_num in range(len(self.doc)):
-            page = self.doc[page_num]
-
-            # Get text blocks with detailed information
-            blocks = page.get_text("dict")["blocks"]
-
-            for block in blocks:
-                if block.get("type") == 0:  # Text block
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text_block = TextBlock(
-                                text=span["text"].strip(),
-                                x0=span["bbox"][0],
-                                y0=span["bbox"][1],
-                                x1=span["bbox"][2],
-                                y1=span["bbox"][3],
-                                font_name=span["font"],
-                                font_size=span["size"],
-                                color=span.get("color", 0),
-                                page_num=page_num
-                            )
-                            if text_block.text:
-                                all_blocks.append(text_block)
+            self._extract_page(page_num, all_blocks)
 
         self.text_blocks = all_blocks
+        self.pages_extracted = len(self.doc)
         return all_blocks
 
+    def _extract_page(self, page_num: int, table: TextBlockTable,
+                      page: Optional["fitz.Page"] = None,
+                      textpage: Optional["fitz.TextPage"] = None):
+        """Append one page's text spans to table (reusing the page's text page if given)"""
+        page = page or self.doc[page_num]
+
+        # Get text blocks with detailed information (image data is skipped,
+        # only text spans are used)
+        blocks = page.get_text("dict", flags=TEXT_FLAGS, textpage=textpage)["blocks"]
+
+        for block in blocks:
+            if block.get("type") == 0:  # Text block
+                for line in block.get("lines", []):
+                    for span in line.get("spans", []):
+                        text = span["text"].strip()
+                        if text:
+                            x0, y0, x1, y1 = span["bbox"]
+                            table.append(
+                                text, x0, y0, x1, y1,
+                                span["font"], span["size"],
+                                span.get("color", 0), page_num
+                            )
+
+    def extract_until_sections(self, required: Iterable[str],
+                               alternatives: Optional[Dict[str, Iterable[str]]] = None) -> bool:
+        """
+        Extract pages one at a time until the required sections are complete
+
+        A required section is complete once another header follows it, so
+        its content cannot continue on a later page; extraction stops on
+        the page of that header. A required section not found by then is
+        looked for in the plain text of the later pages, which is much
+        cheaper than extracting them, and extraction goes on to the first
+        page mentioning it; if none does, it is skipped. Header detection
+        uses the average font size of the pages extracted, so it can
+        differ from identify_sections when later pages are set in other
+        sizes or repeat a header.
+
+        Args:
+            required: Lowercase fragments of the section names needed,
+                e.g. ("experience", "skill")
+            alternatives: Fragments, in order of preference, of which the
+                first present is completed instead when a required section
+                is missing, e.g. where a new one would be added
+
+        Returns:
+            bool: True if extraction stopped before the last page
+        """
+        required = list(required)
+        alternatives = alternatives or {}
+        table = TextBlockTable()
+        self.text_blocks = table
+        # Keyword matches don't depend on the font threshold, so each block
+        # is matched once, when its page is extracted
+        candidates: List[Tuple[int, str, int]] = []
+        # Next page mentioning a required section not found yet, as (page,
+        # text page), kept so it is not laid out twice
+        mention = None
+
+        for page_num in range(len(self.doc)):
+            first = len(table)
+            if mention and mention[0].number == page_num:
+                self._extract_page(page_num, table, *mention)
+            else:
+                self._extract_page(page_num, table)
+            for i in range(first, len(table)):
+                keyword = self.match_section_keyword(table.text[i].lower().strip())
+                if keyword:
+                    candidates.append((i, keyword.title(), page_num))
+            self.pages_extracted = page_num + 1
+            if mention and page_num < mention[0].number:
+                continue
+
+            min_header_size = self.min_header_size()
+            last_page = self._last_page_needed(candidates, table.font_size, min_header_size,
+                                               required, alternatives)
+            # Until one shows up, required sections are expected further on
+            if last_page is None or last_page >= self.pages_extracted:
+                continue
+            names = {name.lower() for i, name, _ in candidates
+                     if table.font_size[i] >= min_header_size}
+            missing = [fragment for fragment in required
+                       if not any(fragment in name for name in names)]
+            mention = self._next_mention(missing, self.pages_extracted)
+            if mention is None:
+                break
+
+        min_header_size = self.min_header_size()
+        self.build_sections([(i, name) for i, name, _ in candidates
+                             if table.font_size[i] >= min_header_size])
+        return self.pages_extracted < len(self.doc)
+
+    def _next_mention(self, fragments: List[str],
+                      start: int) -> Optional[Tuple["fitz.Page", "fitz.TextPage"]]:
+        """First page from start whose plain text contains one of the fragments"""
+        if not fragments:
+            return None
+        for page_num in range(start, len(self.doc)):
+            page = self.doc[page_num]
+            textpage = page.get_textpage(flags=TEXT_FLAGS)
+            if any(fragment in page.get_text("text", textpage=textpage).lower()
+                   for fragment in fragments):
+                return page, textpage
+        return None
+
+    def _last_page_needed(self, candidates: List[Tuple[int, str, int]], sizes: Sequence,
+                          min_header_size: float, required: List[str],
+                          alternatives: Dict[str, Iterable[str]]) -> Optional[int]:
+        """
+        Page of the header closing the last required section found so far
+
+        Returns len(self.doc) when a required section runs to the end of
+        what has been read (it may continue on later pages), and None when
+        no required section has been found.
+        """
+        headers = [(name, page) for i, name, page in candidates if sizes[i] >= min_header_size]
+        names = {name for name, _ in headers}
+        needed = set()
+        for fragment in required:
+            matching = {name for name in names if fragment in name.lower()}
+            # Else the first alternative the document has stands in for it
+            for alt in alternatives.get(fragment, ()) if not matching else ():
+                matching = {name for name in names if alt in name.lower()}
+                if matching:
+                    break
+            needed |= matching
+        if not needed:
+            return None
+
+        last_page = -1
+        for name in needed:
+            # A repeated name's section is its last header's
+            n = max(n for n, (header_name, _) in enumerate(headers) if header_name == name)
+            if n + 1 == len(headers):
+                return len(self.doc)
+            last_page = max(last_page, headers[n + 1][1])
+        return last_page
+
     def identify_sections(self) -> Dict[str, Section]:
         """Identify resume sections based on headers"""
         if not self.text_blocks:
             self.extract_text_blocks()
 
-        sections = {}
-        current_section = None
-        section_blocks = []
-
+        headers = []
+        min_header_size = self.min_header_size()
         for i, block in enumerate(self.text_blocks):
-            text_lower = block.text.lower().strip()
-
-            # Check if this is a section header
-            is_section_header = False
-            section_name = None
-
-            for keyword in self.SECTION_KEYWORDS:
-                if keyword in text_lower:
-                    # Check if it's likely a header (larger font or bold)
-                    avg_font_size = sum(b.font_size for b in self.text_blocks) / len(self.text_blocks)
-                    if block.font_size >= avg_font_size * 0.9:
-                        is_section_header = True
-                        section_name = keyword.title()
-                        break
-
-            if is_section_header:
-                # Save previous section
-                if current_section and section_blocks:
-                    sections[current_section] = self._create_section(
-                        current_section, section_blocks
-                    )
-
-                # Start new section
-                current_section = section_name
-                section_blocks = [block]
-            elif current_section:
-                section_blocks.append(block)
-
-        # Save last section
-        if current_section and section_blocks:
-            sections[current_section] = self._create_section(
-                current_section, section_blocks
-            )
+            # Check if it's likely a header (larger font or bold)
+            if block.font_size >= min_header_size:
+                keyword = self.match_section_keyword(block.text.lower().strip())
+                if keyword:
+                    headers.append((i, keyword.title()))
+
+        return self.build_sections(headers)
+
+    def min_header_size(self) -> float:
+        """Smallest font size a section header may have (90% of the average)"""
+        # Font statistics are computed once, not per candidate header
+        if not self.text_blocks:
+            return 0.0
+        font_sizes = getattr(self.text_blocks, "font_size", None)
+        if font_sizes is None:
+            font_sizes = [b.font_size for b in self.text_blocks]
+        return sum(font_sizes) / len(font_sizes) * 0.9
+
+    def build_sections(self, headers: List[Tuple[int, str]]) -> Dict[str, Section]:
+        """
+        Build sections from header blocks
+
+        Args:
+            headers: (block index, section name) per header, in block order.
+                Each section runs from its header up to the next one.
+        """
+        sections = {}
+        section_ranges = {}
+        for n, (start, name) in enumerate(headers):
+            end = headers[n + 1][0] if n + 1 < len(headers) else len(self.text_blocks)
+            sections[name] = self._create_section(name, self.text_blocks[start:end])
+            section_ranges[name] = (start, end)
 
         self.sections = sections
+        self.section_ranges = section_ranges
+        self.section_headers = list(headers)
         return sections
 
+    def restore_analysis(self, text_blocks: TextBlockTable,
+                         section_ranges: Dict[str, Tuple[int, int]],
+                         layout_info: Optional[Dict] = None):
+        """Load previously computed analysis results instead of re-extracting"""
+        self.text_blocks = text_blocks
+        self.pages_extracted = max(text_blocks.page_num) + 1 if text_blocks else 0
+        self.section_ranges = dict(section_ranges)
+        self.rebuild_sections()
+        self._layout_info = layout_info
+
+    def rebuild_sections(self) -> Dict[str, Section]:
+        """Recreate sections from their block ranges, e.g. after blocks were moved"""
+        self.sections = {
+            name: self._create_section(name, self.text_blocks[start:end])
+            for name, (start, end) in self.section_ranges.items()
+        }
+        return self.sections
+
+    def match_section_keyword(self, text_lower: str) -> Optional[str]:
+        """Return the first SECTION_KEYWORDS entry contained in the text, if any"""
+        pattern, ranks = _compile_keywords(tuple(self.SECTION_KEYWORDS))
+        best = None
+        for match in pattern.finditer(text_lower):
+            keyword = match.group(1)
+            if best is None or ranks[keyword] < ranks[best]:
+                best = keyword
+        return best
+
     def _create_section(self, name: str, blocks: List[TextBlock]) -> Section:
         """Create a Section object from blocks"""
         if not blocks:
@@ -162,11 +425,19 @@ class PDFResumeAnalyzer:
 
     def get_layout_info(self) -> Dict:
         """Get comprehensive layout information"""
+        if self._layout_info is not None:
+            return dict(self._layout_info)
+
         if not self.text_blocks:
             self.extract_text_blocks()
 
-        font_sizes = [b.font_size for b in self.text_blocks]
-        fonts = list(set(b.font_name for b in self.text_blocks))
+        if isinstance(self.text_blocks, TextBlockTable):
+            # Read the columns directly instead of materialising every block
+            font_sizes = self.text_blocks.font_size
+            fonts = list(self.text_blocks.fonts)
+        else:
+            font_sizes = [b.font_size for b in self.text_blocks]
+            fonts = list(set(b.font_name for b in self.text_blocks))
 
         return {
             'total_pages': len(self.doc),
@@ -179,5 +450,6 @@ class PDFResumeAnalyzer:
         }
 
     def close(self):
-        """Close the PDF document"""
-        self.doc.close()
+        """Close the PDF document (only if the analyzer opened it)"""
+        if self._owns_doc:
+            self.doc.close()
@@ -1,97 +1,843 @@
 
 import fitz  # PyMuPDF
+import os
+import re
 import copy
-from typing import Dict, List, Tuple, Optional
+import shutil
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 from pdf_analyzer import PDFResumeAnalyzer, TextBlock, Section
+from analysis_cache import AnalysisCache, hash_pdf
+from template_cache import TemplateCache
+from spatial_index import SpatialIndex
+from font_registry import FontCache, FontRegistry, base14_for
+from text_layout import fit_lines
+from edit_plan import DrawOp, EditPlan, EditNotApplicable, ShiftOp, find_collisions
+from reflow import (EPSILON, LINE_SLACK, NoRoom, apply_shift, crosses_backdrops, plan_shift,
+                    shift_table, shifted_position, splits_images)
+from instrumentation import NULL_TIMER
+
+# Named option sets for PDFResumeEditor.save, fastest to smallest output.
+# "fast" appends an incremental update to a copy of the input when the
+# document allows it, so untouched objects are never rewritten.
+SAVE_PROFILES = {
+    "fast": {"incremental": True, "garbage": 0, "deflate": False},
+    "balanced": {"garbage": 1, "deflate": True},
+    "smallest": {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True},
+}
+
+# Sections the edit methods look for (as lowercase name fragments); lazy
+# extraction stops once all of them have been read in full
+EDITED_SECTIONS = ("experience", "skill", "certif")
+
+# Sections a missing Certifications section is added after, in order of preference
+CERTIFICATION_ANCHORS = ("skill", "education", "project")
+
+# Narrowest column inserted lines are wrapped to; a section narrower than
+# this (e.g. only a short header so far) wraps to the page margin instead
+MIN_WRAP_WIDTH = 144.0
 
 class PDFResumeEditor:
     """Edit PDF resumes while preserving layout"""
 
-    def __init__(self, input_pdf_path: str, output_pdf_path: str):
-        self.input_path = input_pdf_path
+    def __init__(self, input_pdf_path: Union[str, bytes, bytearray, memoryview],
+                 output_pdf_path: Optional[str] = None,
+                 analysis_cache: Optional[AnalysisCache] = None, timer=None,
+                 save_profile: str = "smallest",
+                 template_cache: Optional[TemplateCache] = None, lazy: bool = False,
+                 font_cache: Optional[FontCache] = None, reflow: bool = False,
+                 redact: bool = False, lazy_sections: Iterable[str] = EDITED_SECTIONS):
+        """
+        Args:
+            input_pdf_path: Resume to edit, as a path or as raw PDF bytes
+            output_pdf_path: Where save() writes the result (not needed
+                when the result is taken with to_bytes())
+            analysis_cache: Optional cache of analysis results
+            timer: Optional StageTimer that records open/analysis stages
+            save_profile: One of SAVE_PROFILES
+            template_cache: Optional cache of section geometry for
+                recurring resume templates
+            lazy: Extract pages only until the edited sections are
+                complete, instead of the whole document (the
+                template cache is not consulted in this mode; ignored
+                with reflow, which moves content on later pages)
+            font_cache: Fonts shared across documents (default: one per
+                process)
+            reflow: Make room for inserted experience and certification
+                lines by moving the content below them down (onto a new
+                page if needed) instead of drawing over it
+            redact: Remove replaced skill text from the page (redaction)
+                instead of covering it with a white box, so it is gone from
+                the text layer and the file
+            lazy_sections: Sections the edits will need, as lowercase name
+                fragments (see EDITED_SECTIONS), when lazy
+        """
+        if save_profile not in SAVE_PROFILES:
+            raise ValueError(f"Unknown save profile: {save_profile}")
+
+        timer = timer or NULL_TIMER
+        # Reflow may push content onto any later page, so it needs them all
+        lazy = lazy and not reflow
+        in_memory = isinstance(input_pdf_path, (bytes, bytearray, memoryview))
+        self.input_path = None if in_memory else input_pdf_path
+        self._input_bytes = input_pdf_path if in_memory else None
         self.output_path = output_pdf_path
-        self.doc = fitz.open(input_pdf_path)
-        self.analyzer = PDFResumeAnalyzer(input_pdf_path)
+        self.save_profile = save_profile
+        # Set once anything is drawn; an untouched document is saved as a copy
+        self.modified = False
+        # Working copy of the input for incremental saves
+        self._work_path = None
+
+        with timer.stage("open"):
+            if in_memory:
+                self.doc = fitz.open(stream=input_pdf_path, filetype="pdf")
+            elif SAVE_PROFILES[save_profile].get("incremental") and output_pdf_path:
+                # Incremental updates can only be appended to the file the
+                # document was opened from, so edit a copy next to the output
+                self._work_path = f"{output_pdf_path}.{os.getpid()}.tmp"
+                shutil.copyfile(input_pdf_path, self._work_path)
+                self.doc = fitz.open(self._work_path)
+            else:
+                self.doc = fitz.open(input_pdf_path)
+            # Share the open document instead of parsing the file a second time
+            self.analyzer = PDFResumeAnalyzer(self.doc)
+
+        # Analyze the PDF structure, reusing a cached analysis when available
+        self.analysis_cached = False
+        content_hash = None
+        if analysis_cache:
+            with timer.stage("analysis_cache_load"):
+                content_hash = hash_pdf(input_pdf_path)
+                if lazy:
+                    # A partial analysis must not be reused as a full one
+                    content_hash += "-lazy-" + "-".join(lazy_sections)
+                self.analysis_cached = analysis_cache.load(self.analyzer, content_hash)
+
+        # None when no template lookup happened, else whether it matched
+        self.template_hit = None
+        template = None
+        if not self.analysis_cached and lazy:
+            with timer.stage("extract_lazy"):
+                self.analyzer.extract_until_sections(
+                    lazy_sections, {"certif": CERTIFICATION_ANCHORS}
+                )
+        elif not self.analysis_cached:
+            with timer.stage("extract_text_blocks"):
+                self.analyzer.extract_text_blocks()
+            if template_cache:
+                # A known template resolves the sections without detection
+                with timer.stage("template_match"):
+                    template = template_cache.match(self.analyzer)
+                self.template_hit = template is not None
+            if template is None:
+                with timer.stage("identify_sections"):
+                    self.analyzer.identify_sections()
+        if analysis_cache and not self.analysis_cached:
+            with timer.stage("analysis_cache_store"):
+                analysis_cache.store(self.analyzer, content_hash)
+
+        if self.template_hit is False:
+            with timer.stage("template_store"):
+                template_cache.store(self.analyzer)
+
+        self.insertion_points = self._insertion_points()
+
+        # Where text sits on each page, including text planned by edits
+        self.index = SpatialIndex(self.analyzer.text_blocks)
+        # Fonts for new text, embedded once per document
+        self.fonts = FontRegistry(self.doc, font_cache)
+        # Certifications section created by an earlier edit, if any
+        self._created_cert_section: Optional[Dict] = None
+
+        self.reflow = reflow
+        self.redact = redact
+        # Every op planned so far; shifts move them with the page content
+        self._planned: List[DrawOp] = []
+        # Shifts planned but not applied yet
+        self._pending_shifts: List[ShiftOp] = []
+        # Edits reflow could not make room for, drawn over content instead
+        self.overdrawn: List[str] = []
+        # (rect, rotation) per page as planned, once a shift adds pages
+        self._page_geometry: Optional[List[Tuple[fitz.Rect, int]]] = None
+        # (page number, bbox, "image", "drawing", "backdrop" or "background")
+        # of pictures, moved along by shifts
+        self._pictures: List[Tuple[int, Tuple[float, float, float, float], str]] = []
+
+    def _page_rect(self, page_num: int) -> fitz.Rect:
+        """Page size, counting pages that planned shifts will insert"""
+        if self._page_geometry is not None:
+            return self._page_geometry[page_num][0]
+        return self.doc.page_cropbox(page_num)
+
+    def _text_op(self, edit: str, page_num: int, x: float, y_top: float, text: str,
+                 font_name: str, font_size: float) -> DrawOp:
+        """Plan one line of text (in a font from self.fonts) and reserve its space"""
+        if not self.fonts.known(font_name):
+            raise ValueError(f"Unknown font '{font_name}'")
+        # Text mostly below the bottom edge would be cut off, not drawn
+        if y_top + font_size / 2 > self._page_rect(page_num).height:
+            raise EditNotApplicable(f"No room on page {page_num + 1} for '{text}'")
+        width = self.fonts.text_length(font_name, text, font_size)
+        op = DrawOp("text", edit, page_num, (x, y_top, x + width, y_top + font_size),
+                    text, font_name, font_size, (0, 0, 0))
+        self._reserve(op)
+        return op
+
+    def _reserve(self, op: DrawOp):
+        """Record a planned op; text ops also take their space in the index"""
+        self._planned.append(op)
+        self._index_op(op)
+
+    def _index_op(self, op: DrawOp):
+        """Take a text op's space in the index"""
+        if op.kind == "text":
+            x0, y0, x1, y1 = op.rect
+            self.index.insert(TextBlock(
+                text=op.text, x0=x0, y0=y0, x1=x1, y1=y1, font_name=op.font_name,
+                font_size=op.font_size, color=0, page_num=op.page_num
+            ))
+
+    @contextmanager
+    def _rollback_on_error(self):
+        """
+        Undo what the enclosed planning did if it raises
+
+        An edit may reserve some of its lines (or a new section's header)
+        and open space for them before failing; without this those would
+        stay planned and crowd out later edits.
+        """
+        planned = len(self._planned)
+        indexed = len(self.index.blocks)
+        shifts = len(self._pending_shifts)
+        overdrawn = len(self.overdrawn)
+        moved = None
+        if self.reflow:
+            # Shifts move these in place
+            table = self.analyzer.text_blocks
+            moved = (table.page_num[:], table.y0[:], table.y1[:],
+                     [(op.page_num, op.rect) for op in self._planned], list(self._pictures),
+                     None if self._page_geometry is None else list(self._page_geometry),
+                     self.insertion_points)
+        try:
+            yield
+        except Exception:
+            del self._planned[planned:]
+            del self.overdrawn[overdrawn:]
+            if len(self._pending_shifts) == shifts:
+                self.index.truncate(indexed)
+                raise
+
+            # Put the content the failed edit moved back where it was
+            del self._pending_shifts[shifts:]
+            table = self.analyzer.text_blocks
+            (page_nums, y0s, y1s, positions, self._pictures, self._page_geometry,
+             self.insertion_points) = moved
+            table.page_num[:], table.y0[:], table.y1[:] = page_nums, y0s, y1s
+            self.analyzer.rebuild_sections()
+            self.index = SpatialIndex(table)
+            for op, (page_num, rect) in zip(self._planned, positions):
+                op.page_num, op.rect = page_num, rect
+                self._index_op(op)
+            raise
+
+    def _make_room(self, edit: str, page_num: int, y: float, height: float,
+                   x_range: Tuple[float, float]) -> bool:
+        """Reflow mode: open space for an edit, or warn that it will be drawn over content"""
+        if self._open_space(edit, page_num, y, height, x_range):
+            return True
+        print(f"⚠️  Cannot move content on page {page_num + 1} for {edit}, drawing over it instead")
+        self.overdrawn.append(edit)
+        return False
 
-        # Analyze the PDF structure
-        self.analyzer.extract_text_blocks()
-        self.analyzer.identify_sections()
+    def _open_space(self, edit: str, page_num: int, y: float, height: float,
+                    x_range: Tuple[float, float]) -> bool:
+        """
+        Plan moving the content below y down by height
+
+        What no longer fits flows to the top of the next page, pushing its
+        content down in turn; only the last page spills onto a new one.
+        The extracted blocks, sections and everything planned so far are
+        moved the same way, so later edits are planned against the page as
+        it will look once the shift is applied. Nothing is planned when the
+        page is rotated, the space (or what spills onto a new page) would
+        not fit, no band can be moved safely (see plan_shift), text
+        would move onto or off a backdrop (on this page or,
+        recursively, the next), the band holds images while a background
+        image reaches into it (see splits_images), or a page with a
+        background image would spill onto a new page, which could not get
+        that image.
 
-    def add_experience(self, experience_lines: List[str], position: str = "top") -> bool:
+        Returns:
+            bool: Whether the space was opened
         """
-        Add experience entry to the Experience section
+        if self._page_geometry is None:
+            self._load_page_geometry()
+        page_rect, rotation = self._page_geometry[page_num]
+        if rotation or y + height > page_rect.height:
+            return False
+
+        table = self.analyzer.text_blocks
+        # Moved text may go as low as text already goes on any page
+        limit = min(max(table.y1, default=0.0), page_rect.height)
+        on_page = [(bbox, kind) for page, bbox, kind in self._pictures if page == page_num]
+        headers = {start for start, _ in self.analyzer.section_ranges.values()}
+        try:
+            shift = plan_shift(table, page_rect.width, page_num, y, height, x_range, limit, edit,
+                               images=[bbox for bbox, kind in on_page if kind == "image"],
+                               drawings=[bbox for bbox, kind in on_page if kind == "drawing"],
+                               headers=headers)
+        except NoRoom:
+            return False
+        if shift is None:
+            # Nothing moves, so the space must already be free
+            space = (x_range[0], y + EPSILON, x_range[1], y + height - EPSILON)
+            return not self.index.blocks_in_rect(page_num, space) and not any(
+                bbox[0] < space[2] and bbox[2] > space[0] and bbox[1] < space[3] and bbox[3] > space[1]
+                for bbox, kind in on_page if kind in ("image", "drawing")
+            )
+
+        backdrops = [bbox for bbox, kind in on_page if kind == "backdrop"]
+        # A new page gets this page's background
+        next_backdrops = backdrops
+        spill_to_next = shift.cut is not None and page_num + 1 < len(self._page_geometry)
+        if spill_to_next:
+            # Overflow goes to the top of the next page, whose own content
+            # moves down first (and so on), keeping the line gap at the cut
+            next_page = [(bbox, kind) for page, bbox, kind in self._pictures if page == page_num + 1]
+            next_backdrops = [bbox for bbox, kind in next_page if kind == "backdrop"]
+            next_tops = [table.y0[i] for i, page in enumerate(table.page_num) if page == page_num + 1]
+            next_tops += [bbox[1] for bbox, kind in next_page if kind in ("image", "drawing")]
+            if next_tops:
+                shift.spill_top = min(next_tops) - EPSILON
+            shift.new_page = False
+        elif shift.cut is not None and (
+                shift.spill_top + shift.band[3] - shift.cut > page_rect.height
+                or any(kind == "background" for _, kind in on_page)):
+            return False
+        if crosses_backdrops(shift, table, backdrops, next_backdrops):
+            return False
+        if splits_images(shift.band, [bbox for bbox, kind in on_page
+                                      if kind in ("image", "background")]):
+            return False
+
+        if spill_to_next:
+            band_x0, top, band_x1, bottom = shift.band
+            above_cut = [y1 for page, x0, x1, y1 in zip(table.page_num, table.x0, table.x1, table.y1)
+                         if page == page_num and x0 >= band_x0 and x1 <= band_x1
+                         and top <= y1 <= shift.cut + EPSILON]
+            gap = shift.cut - max(above_cut) if above_cut else 0.0
+            if not self._open_space(edit, page_num + 1, shift.spill_top,
+                                    bottom - shift.cut + max(gap, 0.0), (band_x0, band_x1)):
+                return False
+
+        shift_table(shift, table)
+        self.analyzer.rebuild_sections()
+        if shift.cut is not None and shift.new_page:
+            self._page_geometry.insert(page_num + 1, (page_rect, 0))
+        self.insertion_points = self._insertion_points()
+
+        # Backdrops and backgrounds reach out of any band, so stay put
+        self._pictures = [(page, (bbox[0], y0, bbox[2], y1), kind)
+                          for page, bbox, kind in self._pictures
+                          for page, y0, y1 in [(page, bbox[1], bbox[3])
+                                               if page == shift.page_num
+                                               and kind in ("backdrop", "background")
+                                               else shifted_position(shift, page, *bbox)]]
+        if shift.cut is not None and shift.new_page:
+            self._pictures += [(page_num + 1, bbox, "backdrop") for bbox in backdrops]
+        planned, self._planned = self._planned, []
+        self.index = SpatialIndex(table)
+        for op in planned:
+            x0, _, x1, _ = op.rect
+            op.page_num, y0, y1 = shifted_position(shift, op.page_num, *op.rect)
+            op.rect = (x0, y0, x1, y1)
+            self._reserve(op)
+        self._pending_shifts.append(shift)
+        return True
+
+    def _load_page_geometry(self):
+        """Page sizes, rotations and pictures, read once per document"""
+        self._page_geometry = []
+        for page in self.doc:
+            self._page_geometry.append((page.rect, page.rotation))
+            boxes = [(tuple(info["bbox"]), "image") for info in page.get_image_info()]
+            for path in page.get_drawings():
+                # White fills don't show where they end
+                if path.get("fill") == (1.0, 1.0, 1.0) and not path.get("color"):
+                    continue
+                # Stroked lines reach half their width past their path
+                half = (path.get("width") or 0.0) / 2 if path.get("color") else 0.0
+                boxes.append((tuple(path["rect"] + (-half, -half, half, half)), "drawing"))
+
+            area = page.rect + (1, 1, -1, -1)
+            for box, kind in boxes:
+                height = box[3] - box[1]
+                if height >= page.rect.height / 2:
+                    # Page-high rules and drawn page backgrounds don't
+                    # matter here, panels and sidebars do; background
+                    # images decide how a band can be redacted
+                    if fitz.Rect(box).contains(area):
+                        if kind == "drawing":
+                            continue
+                        kind = "background"
+                    elif box[2] - box[0] < 6.0:
+                        continue
+                    else:
+                        kind = "backdrop"
+                self._pictures.append((page.number, box, kind))
+
+    def _take_shifts(self) -> List[ShiftOp]:
+        shifts, self._pending_shifts = self._pending_shifts, []
+        return shifts
+
+    def _find_section(self, fragment: str) -> Optional[Section]:
+        """First section whose name contains fragment (lowercase)"""
+        for section_name, section in self.analyzer.sections.items():
+            if fragment in section_name.lower():
+                return section
+        return None
+
+    def plan_experience(self, experience_lines: List[str], position: str = "top",
+                        min_font_scale: float = 1.0) -> List[DrawOp]:
+        """
+        Plan an experience entry in the Experience section
+
+        Lines wider than the section are wrapped to its right edge. In
+        reflow mode the content below the entry is moved down to make room.
 
         Args:
             experience_lines: List of text lines to add (minimum 5)
             position: Where to add ("top" or "bottom" of experience section)
+            min_font_scale: Shrink the entry down to this fraction of the
+                section's font size before wrapping (1.0: never shrink)
 
         Returns:
-            bool: Success status
+            List[DrawOp]: One text op per drawn (wrapped) line
+
+        Raises:
+            EditNotApplicable: The resume has no Experience section
         """
-        try:
-            # Find Experience section
-            experience_section = None
-            for section_name, section in self.analyzer.sections.items():
-                if 'experience' in section_name.lower():
-                    experience_section = section
-                    break
-
-            if not experience_section:
-                print("⚠️  Experience section not found")
-                return False
+        experience_section = self._find_section("experience")
+        if not experience_section:
+            raise EditNotApplicable("Experience section not found")
+
+        # Determine insertion point
+        if position == "top":
+            # Insert right after the section header
+            plan = self.insertion_points.get("experience") or self._experience_insertion(experience_section)
+            insert_y = plan["y"]
+            above = experience_section.start_block.y1
+        else:
+            # Insert at the bottom
+            plan = self._experience_insertion(experience_section)
+            insert_y = experience_section.y_end + 5
+            above = experience_section.y_end
+
+        font_size = plan["font_size"]
+        # One font for the whole entry, so its lines all look alike
+        font_name = self.fonts.resolve(plan["font_name"], "".join(experience_lines))
+        x_position = plan["x"]
+
+        # Wrap to the section's right edge, keeping the usual 1.2 leading
+        x_end = plan.get("x_end", experience_section.x_end)
+        if x_end - x_position < MIN_WRAP_WIDTH:
+            x_end = self._page_rect(experience_section.page_num).width - experience_section.x_start
+        layout = fit_lines(experience_lines, self.fonts.metrics(font_name), font_size,
+                           x_end - x_position, min_font_size=font_size * min_font_scale)
+
+        page_num = experience_section.page_num
+        if self.reflow:
+            if position == "top":
+                # Below the bar or box the header is drawn on, which stays put
+                bar = self._picture_under(page_num, experience_section.start_block)
+                if bar > above:
+                    insert_y, above = insert_y + bar - above, bar
+            self._make_room("experience", page_num, above, insert_y - above + layout.height,
+                            (x_position, x_end))
+
+        return [
+            self._text_op("experience", page_num, x_position + line.x_offset,
+                          insert_y + line.y_offset, line.text, font_name, layout.font_size)
+            for line in layout.lines
+        ]
+
+    def _picture_under(self, page_num: int, block: TextBlock) -> float:
+        """Lowest bottom of the images and drawings a block sits on (its own bottom if none)"""
+        if self._page_geometry is None:
+            self._load_page_geometry()
+        middle_x, middle_y = (block.x0 + block.x1) / 2, (block.y0 + block.y1) / 2
+        return max([block.y1] + [bbox[3] for page, bbox, kind in self._pictures
+                                 if page == page_num and kind in ("image", "drawing")
+                                 and bbox[0] <= middle_x <= bbox[2]
+                                 and bbox[1] <= middle_y <= bbox[3]])
+
+    def _experience_insertion(self, experience_section: Section) -> Dict:
+        """Insertion point and font for new lines at the top of Experience"""
+        # Get font properties from existing content
+        if experience_section.content_blocks:
+            ref_block = experience_section.content_blocks[0]
+        else:
+            ref_block = experience_section.start_block
+
+        return {
+            "x": experience_section.x_start,
+            "y": experience_section.start_block.y1 + 10,
+            "x_end": experience_section.x_end,
+            "font_name": ref_block.font_name,
+            "font_size": ref_block.font_size
+        }
+
+    def _insertion_points(self) -> Dict:
+        """Insertion points for this document's layout"""
+        points = {}
+        experience_section = self._find_section("experience")
+        if experience_section:
+            points["experience"] = self._experience_insertion(experience_section)
+        return points
+
+    def plan_skills(self, mapping: Dict[str, str]) -> Tuple[List[DrawOp], Dict[str, int]]:
+        """
+        Plan many skill replacements in a single pass over the Skills section
 
-            # Get the page and section details
-            page = self.doc[experience_section.page_num]
+        All rules are compiled into one case-insensitive matcher (longest
+        skill first, so "JavaScript" wins over "Java"). Every occurrence is
+        replaced, and each affected span gets exactly one cover (or redact)
+        + text op no matter how many rules hit it.
 
-            # Determine insertion point
-            if position == "top":
-                # Insert right after the section header
-                insert_y = experience_section.start_block.y1 + 10
-                reference_block = experience_section.start_block
-            else:
-                # Insert at the bottom
-                insert_y = experience_section.y_end + 5
-                reference_block = experience_section.content_blocks[-1] if experience_section.content_blocks else experience_section.start_block
+        Args:
+            mapping: Old skill text -> new skill text
+
+        Returns:
+            Tuple of (ops, number of spans modified per old skill)
+
+        Raises:
+            EditNotApplicable: The resume has no Skills section
+        """
+        counts = {old: 0 for old in mapping}
+        skills_section = self._find_section("skill")
+        if not skills_section:
+            raise EditNotApplicable("Skills section not found")
+
+        rules = {old.lower(): (old, new) for old, new in mapping.items() if old}
+        if not rules:
+            return [], counts
+        pattern = re.compile(
+            "|".join(re.escape(old) for old in sorted(rules, key=len, reverse=True)),
+            re.IGNORECASE
+        )
+
+        ops = []
+        for block in skills_section.content_blocks:
+            hit_rules = set()
+
+            def replace(match):
+                old, new = rules[match.group(0).lower()]
+                hit_rules.add(old)
+                return new
+
+            new_text = pattern.sub(replace, block.text)
+            if not hit_rules:
+                continue
+
+            # The old text is removed (or covered by a white rectangle), new
+            # text goes on top
+            font_name = self.fonts.resolve(block.font_name, new_text)
+            text_op = self._text_op("skills", block.page_num, block.x0, block.y0,
+                                    new_text, font_name, block.font_size)
+            cover_op = DrawOp("redact" if self.redact else "cover", "skills", block.page_num, block.bbox,
+                              None, None, None, (1, 1, 1))
+            self._reserve(cover_op)
+            ops.append(cover_op)
+            ops.append(text_op)
+
+            for old in hit_rules:
+                counts[old] += 1
+
+        return ops, counts
+
+    def plan_certification(self, certification_text: str) -> List[DrawOp]:
+        """
+        Plan a certification in the Certifications section
+
+        Creates the section (header plus entry) if the resume has none.
+        Later certifications planned in the same editor go under it. In
+        reflow mode the content below is moved down to make room.
+
+        Raises:
+            EditNotApplicable: No Certifications section and nowhere to add one
+        """
+        edit = f"certification:{certification_text}"
+        cert_section = self._find_section("certif")
+
+        if not cert_section:
+            if self._created_cert_section:
+                return [self._plan_under_created_section(edit, certification_text)]
+            print("⚠️  Certifications section not found, creating one...")
+            return self._plan_certification_section(edit, certification_text)
+
+        # Get font properties from existing certifications
+        if cert_section.content_blocks:
+            ref_block = cert_section.content_blocks[0]
+        else:
+            ref_block = cert_section.start_block
+
+        font_size = ref_block.font_size
+
+        # Add bullet point if other certs have them
+        if any('•' in b.text or '●' in b.text for b in cert_section.content_blocks):
+            certification_text = f"• {certification_text}"
+        font_name = self.fonts.resolve(ref_block.font_name, certification_text)
+
+        x_position = cert_section.x_start
+        if self.reflow:
+            # Right below the last certification, moving what follows down
+            page_num, above = self._certifications_end(cert_section.page_num, cert_section.y_end)
+            insert_y = above + font_size * 0.2
+            if self._make_room(edit, page_num, above, insert_y - above + font_size,
+                               (x_position, cert_section.x_end)):
+                return [self._text_op(edit, page_num, x_position, insert_y,
+                                      certification_text, font_name, font_size)]
+
+        # Insert at the end of certifications section, below anything
+        # already there (including certifications planned earlier)
+        text_width = self.fonts.text_length(font_name, certification_text, font_size)
+        insert_y = self.index.first_free_y(
+            cert_section.page_num, x_position, x_position + text_width,
+            cert_section.y_end + (font_size * 1.2), font_size
+        )
+        return [self._text_op(edit, cert_section.page_num, x_position, insert_y,
+                              certification_text, font_name, font_size)]
+
+    def _plan_certification_section(self, edit: str, certification_text: str) -> List[DrawOp]:
+        """Plan a new Certifications section after Skills, Education or Projects"""
+        # Find a good place to add it (usually after Skills or Education)
+        target_section = None
+        for section_name in CERTIFICATION_ANCHORS:
+            target_section = self._find_section(section_name)
+            if target_section:
+                break
+
+        if not target_section:
+            raise EditNotApplicable("Could not find suitable location for Certifications section")
+
+        page_num = target_section.page_num
+        x_position = target_section.x_start
+        header_font_size = target_section.start_block.font_size
+
+        # Styled like the other headers, entries like the target's content
+        header_font = self.fonts.resolve(target_section.start_block.font_name, "CERTIFICATIONS")
+        if target_section.content_blocks:
+            content_font = target_section.content_blocks[0].font_name
+            content_font_size = target_section.content_blocks[0].font_size
+        else:
+            content_font = "helv"
+            content_font_size = header_font_size * 0.85
+
+        # Header below the target section, clear of anything planned there
+        header_width = self.fonts.text_length(header_font, "CERTIFICATIONS", header_font_size)
+        # In reflow mode, room for the header and the first entry
+        room_made = self.reflow and self._make_room(
+            edit, page_num, target_section.y_end, 20 + header_font_size * 1.5 + content_font_size,
+            (x_position, target_section.x_end)
+        )
+        if room_made:
+            insert_y = target_section.y_end + 20
+        else:
+            insert_y = self.index.first_free_y(page_num, x_position, x_position + header_width,
+                                               target_section.y_end + 20, header_font_size)
+        header_op = self._text_op(edit, page_num, x_position, insert_y,
+                                  "CERTIFICATIONS", header_font, header_font_size)
+
+        section = {
+            "page_num": page_num,
+            "x": x_position,
+            "y": insert_y + header_font_size * 1.5,
+            "font_name": content_font,
+            "font_size": content_font_size
+        }
+        entry_op = self._plan_under_created_section(edit, certification_text, section,
+                                                    room_made=room_made)
+        self._created_cert_section = section
+        return [header_op, entry_op]
+
+    def _plan_under_created_section(self, edit: str, certification_text: str,
+                                    section: Optional[Dict] = None,
+                                    room_made: Optional[bool] = None) -> DrawOp:
+        """
+        Plan an entry in the Certifications section this editor created
+
+        room_made tells whether the caller already made room for the entry
+        in reflow mode (None: make it here).
+        """
+        section = section or self._created_cert_section
+        text = f"• {certification_text}"
+        font_name = self.fonts.resolve(section["font_name"], text)
+        font_size = section["font_size"]
+        width = self.fonts.text_length(font_name, text, font_size)
+        page_num = section["page_num"]
+        insert_y = section["y"] if room_made else None
+        if self.reflow and room_made is None:
+            # Right below the last certification, moving what follows down
+            end_page, above = self._certifications_end(page_num, section["y"])
+            if self._make_room(edit, end_page, above, font_size * 1.2,
+                               (section["x"], section["x"] + width)):
+                page_num, insert_y = end_page, above + font_size * 0.2
+        if insert_y is None:
+            insert_y = self.index.first_free_y(page_num, section["x"], section["x"] + width,
+                                               section["y"], font_size)
+        return self._text_op(edit, page_num, section["x"], insert_y, text, font_name, font_size)
+
+    def _certifications_end(self, page_num: int, y: float) -> Tuple[int, float]:
+        """Page and bottom of the last certification planned so far, else the given ones"""
+        for op in reversed(self._planned):
+            if op.edit.startswith("certification:"):
+                return op.page_num, op.rect[3]
+        return page_num, y
+
+    def compile_plan(self, experience_lines: List[str], skill_mapping: Dict[str, str],
+                     certifications: List[str], position: str = "top",
+                     min_font_scale: float = 1.0) -> EditPlan:
+        """
+        Resolve a full set of edits to draw operations without drawing
+
+        Edits are planned in order and each one's text is reserved in the
+        spatial index, so later edits are placed around earlier ones. Edits
+        that cannot apply are recorded in plan.failures; overlaps between
+        edits in plan.collisions.
+
+        Returns:
+            EditPlan: Apply it with apply_plan()
+        """
+        plan = EditPlan()
+
+        try:
+            with self._rollback_on_error():
+                plan.ops.extend(self.plan_experience(experience_lines, position, min_font_scale))
+            plan.experience_added = True
+        except Exception as e:
+            plan.failures["experience"] = self._report_failure("adding experience", e)
+
+        try:
+            with self._rollback_on_error():
+                ops, counts = self.plan_skills(skill_mapping)
+            plan.ops.extend(ops)
+            plan.skills_modified = counts
+            self._report_skill_counts(skill_mapping, counts)
+        except Exception as e:
+            plan.skills_modified = {old: 0 for old in skill_mapping}
+            plan.failures["skills"] = self._report_failure("modifying skill", e)
+
+        for cert in certifications:
+            try:
+                with self._rollback_on_error():
+                    plan.ops.extend(self.plan_certification(cert))
+                plan.certifications_added.append(cert)
+            except Exception as e:
+                plan.failures[f"certification:{cert}"] = self._report_failure("adding certification", e)
+
+        plan.shifts = self._take_shifts()
+        plan.overdrawn = list(self.overdrawn)
+        plan.collisions = find_collisions(plan.ops)
+        for first, second in plan.collisions:
+            print(f"⚠️  Edits overlap: {first} / {second}")
+        return plan
+
+    def apply_plan(self, plan: EditPlan):
+        """Apply a compiled plan: content shifts first, then the draw ops"""
+        for shift in plan.shifts:
+            apply_shift(self.doc, shift)
+        if plan.shifts:
+            self.fonts.forget_pages()
+            self.modified = True
+        self.apply_ops(plan.ops)
+
+    def _apply_planned(self, ops: List[DrawOp]):
+        """Apply ops just planned, with any shifts planned for them"""
+        self.apply_plan(EditPlan(ops=ops, shifts=self._take_shifts()))
+
+    def apply_ops(self, ops: List[DrawOp]):
+        """
+        Draw planned operations with one content update per page
 
-            # Get font properties from existing content
-            if experience_section.content_blocks:
-                ref_block = experience_section.content_blocks[0]
+        All ops for a page go into a single Shape that is committed once,
+        instead of one new content stream per rectangle or line. Covers
+        are drawn before text on each page. Redactions are applied first,
+        in one pass per page. Fonts are registered with the page once,
+        before drawing.
+        """
+        pages: Dict[int, List[DrawOp]] = {}
+        for op in ops:
+            pages.setdefault(op.page_num, []).append(op)
+
+        for page_num, page_ops in pages.items():
+            page = self.doc[page_num]
+            redactions = [op for op in page_ops if op.kind == "redact"]
+            if redactions:
+                for op in redactions:
+                    page.add_redact_annot(self._redaction_rect(op.rect), fill=False, cross_out=False)
+                # Only text goes; images and drawings under it stay as they are
+                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE,
+                                      graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                                      text=fitz.PDF_REDACT_TEXT_REMOVE)
+            for font_name in {op.font_name for op in page_ops if op.kind == "text"}:
+                self.fonts.register(page, font_name)
+            shape = page.new_shape()
+            for op in page_ops:
+                if op.kind == "redact":
+                    continue
+                if op.kind == "cover":
+                    shape.draw_rect(fitz.Rect(op.rect))
+                    shape.finish(color=op.color, fill=op.color)
+                else:
+                    shape.insert_text(op.baseline, op.text, fontname=op.font_name,
+                                      fontsize=op.font_size, color=op.color)
+            shape.commit()
+            self.modified = True
+
+    @staticmethod
+    def _redaction_rect(rect: Tuple[float, float, float, float]) -> fitz.Rect:
+        """A span's box, trimmed so glyphs of the lines above and below survive"""
+        x0, y0, x1, y1 = rect
+        slack = (y1 - y0) * LINE_SLACK
+        return fitz.Rect(x0, y0 + slack, x1, y1 - slack)
+
+    @staticmethod
+    def _report_failure(action: str, error: Exception) -> str:
+        if isinstance(error, EditNotApplicable):
+            print(f"⚠️  {error}")
+        else:
+            print(f"❌ Error {action}: {str(error)}")
+        return str(error)
+
+    @staticmethod
+    def _report_skill_counts(mapping: Dict[str, str], counts: Dict[str, int]):
+        for old, new in mapping.items():
+            if counts[old]:
+                print(f"✅ Modified skill: '{old}' → '{new}'")
             else:
-                ref_block = experience_section.start_block
-
-            font_size = ref_block.font_size
-            font_name = self._get_standard_font(ref_block.font_name)
-            x_position = experience_section.x_start
-
-            # Calculate line spacing
-            line_spacing = font_size * 1.2
-
-            # Insert text maintaining layout
-            current_y = insert_y
-            for line in experience_lines:
-                # Insert text at calculated position
-                text_rect = fitz.Rect(
-                    x_position,
-                    current_y,
-                    experience_section.x_end,
-                    current_y + font_size + 5
-                )
+                print(f"⚠️  Skill '{old}' not found")
 
-                page.insert_text(
-                    point=(x_position, current_y + font_size),
-                    text=line,
-                    fontname=font_name,
-                    fontsize=font_size,
-                    color=(0, 0, 0)
-                )
+    def add_experience(self, experience_lines: List[str], position: str = "top",
+                       min_font_scale: float = 1.0) -> bool:
+        """
+        Add experience entry to the Experience section
 
-                current_y += line_spacing
+        Args:
+            experience_lines: List of text lines to add (minimum 5)
+            position: Where to add ("top" or "bottom" of experience section)
+            min_font_scale: See plan_experience()
 
+        Returns:
+            bool: Success status
+        """
+        try:
+            with self._rollback_on_error():
+                ops = self.plan_experience(experience_lines, position, min_font_scale)
+            self._apply_planned(ops)
             print(f"✅ Added {len(experience_lines)} lines to Experience section")
             return True
-
         except Exception as e:
-            print(f"❌ Error adding experience: {str(e)}")
+            self._report_failure("adding experience", e)
             return False
 
     def modify_skill(self, old_skill: str, new_skill: str) -> bool:
@@ -105,46 +851,29 @@ class PDFResumeEditor:
         Returns:
             bool: Success status
         """
-        try:
-            # Find Skills section
-            skills_section = None
-            for section_name, section in self.analyzer.sections.items():
-                if 'skill' in section_name.lower():
-                    skills_section = section
-                    break
-
-            if not skills_section:
-                print("⚠️  Skills section not found")
-                return False
+        return self.modify_skills({old_skill: new_skill}).get(old_skill, 0) > 0
 
-            page = self.doc[skills_section.page_num]
-
-            # Find the skill to modify
-            for block in skills_section.content_blocks:
-                if old_skill.lower() in block.text.lower():
-                    # Create a white rectangle to cover old text
-                    cover_rect = fitz.Rect(block.bbox)
-                    page.draw_rect(cover_rect, color=(1, 1, 1), fill=(1, 1, 1))
-
-                    # Insert new text at same position
-                    font_name = self._get_standard_font(block.font_name)
-                    page.insert_text(
-                        point=(block.x0, block.y0 + block.font_size),
-                        text=block.text.replace(old_skill, new_skill),
-                        fontname=font_name,
-                        fontsize=block.font_size,
-                        color=(0, 0, 0)
-                    )
-
-                    print(f"✅ Modified skill: '{old_skill}' → '{new_skill}'")
-                    return True
-
-            print(f"⚠️  Skill '{old_skill}' not found")
-            return False
+    def modify_skills(self, mapping: Dict[str, str]) -> Dict[str, int]:
+        """
+        Apply many skill replacements in a single pass over the Skills section
+
+        See plan_skills() for how rules are matched.
 
+        Args:
+            mapping: Old skill text -> new skill text
+
+        Returns:
+            Dict[str, int]: Number of spans modified per old skill
+        """
+        try:
+            with self._rollback_on_error():
+                ops, counts = self.plan_skills(mapping)
+            self._apply_planned(ops)
+            self._report_skill_counts(mapping, counts)
+            return counts
         except Exception as e:
-            print(f"❌ Error modifying skill: {str(e)}")
-            return False
+            self._report_failure("modifying skill", e)
+            return {old: 0 for old in mapping}
 
     def add_certification(self, certification_text: str) -> bool:
         """
@@ -157,127 +886,80 @@ class PDFResumeEditor:
             bool: Success status
         """
         try:
-            # Find Certifications section
-            cert_section = None
-            for section_name, section in self.analyzer.sections.items():
-                if 'certif' in section_name.lower():
-                    cert_section = section
-                    break
-
-            if not cert_section:
-                print("⚠️  Certifications section not found, creating one...")
-                return self._create_certification_section(certification_text)
-
-            page = self.doc[cert_section.page_num]
-
-            # Get font properties from existing certifications
-            if cert_section.content_blocks:
-                ref_block = cert_section.content_blocks[0]
+            with self._rollback_on_error():
+                ops = self.plan_certification(certification_text)
+            self._apply_planned(ops)
+            if len(ops) > 1:
+                print(f"✅ Created Certifications section and added: '{certification_text}'")
             else:
-                ref_block = cert_section.start_block
-
-            font_size = ref_block.font_size
-            font_name = self._get_standard_font(ref_block.font_name)
-
-            # Insert at the end of certifications section
-            insert_y = cert_section.y_end + (font_size * 1.2)
-            x_position = cert_section.x_start
-
-            # Add bullet point if other certs have them
-            if any('•' in b.text or '●' in b.text for b in cert_section.content_blocks):
-                certification_text = f"• {certification_text}"
-
-            page.insert_text(
-                point=(x_position, insert_y + font_size),
-                text=certification_text,
-                fontname=font_name,
-                fontsize=font_size,
-                color=(0, 0, 0)
-            )
-
-            print(f"✅ Added certification: '{certification_text}'")
+                print(f"✅ Added certification: '{ops[0].text}'")
             return True
-
         except Exception as e:
-            print(f"❌ Error adding certification: {str(e)}")
-            return False
-
-    def _create_certification_section(self, certification_text: str) -> bool:
-        """Create a new Certifications section if it doesn't exist"""
-        try:
-            # Find a good place to add it (usually after Skills or Education)
-            target_section = None
-            for section_name in ['Skills', 'Education', 'Projects']:
-                for name, section in self.analyzer.sections.items():
-                    if section_name.lower() in name.lower():
-                        target_section = section
-                        break
-                if target_section:
-                    break
-
-            if not target_section:
-                print("⚠️  Could not find suitable location for Certifications section")
-                return False
-
-            page = self.doc[target_section.page_num]
-
-            # Insert section header
-            insert_y = target_section.y_end + 20
-            x_position = target_section.x_start
-
-            header_font_size = target_section.start_block.font_size
-            content_font_size = header_font_size * 0.85
-
-            # Add header
-            page.insert_text(
-                point=(x_position, insert_y + header_font_size),
-                text="CERTIFICATIONS",
-                fontname="helv-bold",
-                fontsize=header_font_size,
-                color=(0, 0, 0)
-            )
-
-            # Add certification
-            insert_y += header_font_size * 1.5
-            page.insert_text(
-                point=(x_position, insert_y + content_font_size),
-                text=f"• {certification_text}",
-                fontname="helv",
-                fontsize=content_font_size,
-                color=(0, 0, 0)
-            )
-
-            print(f"✅ Created Certifications section and added: '{certification_text}'")
-            return True
-
-        except Exception as e:
-            print(f"❌ Error creating certification section: {str(e)}")
+            self._report_failure("adding certification", e)
             return False
 
     def _get_standard_font(self, font_name: str) -> str:
-        """Map extracted font to standard PDF font"""
-        font_lower = font_name.lower()
-
-        if 'bold' in font_lower:
-            return "helv-bold"
-        elif 'italic' in font_lower:
-            return "helv-ital"
-        elif 'times' in font_lower:
-            return "times"
-        else:
-            return "helv"
+        """Map extracted font to the closest Base-14 font"""
+        return base14_for(font_name)
 
     def save(self) -> bool:
-        """Save the edited PDF"""
+        """Save the edited PDF using the editor's save profile"""
         try:
-            self.doc.save(self.output_path, garbage=4, deflate=True)
+            options = dict(SAVE_PROFILES[self.save_profile])
+            incremental = options.pop("incremental", False)
+
+            if not self.output_path:
+                raise ValueError("No output path given; use to_bytes() instead")
+
+            if not self.modified:
+                # Nothing was drawn: the input bytes are already the answer
+                if self.input_path:
+                    shutil.copyfile(self.input_path, self.output_path)
+                else:
+                    with open(self.output_path, 'wb') as f:
+                        f.write(self._input_bytes)
+            elif incremental and self._work_path and self.doc.can_save_incrementally():
+                self.doc.save(self._work_path, incremental=True,
+                              encryption=fitz.PDF_ENCRYPT_KEEP)
+                # Unlink first: renaming over an existing file makes some
+                # filesystems (ext4 auto_da_alloc) flush the data synchronously
+                if os.path.exists(self.output_path):
+                    os.remove(self.output_path)
+                os.rename(self._work_path, self.output_path)
+                self._work_path = None
+            else:
+                self.doc.save(self.output_path, **options)
             print(f"\n💾 Saved edited PDF to: {self.output_path}")
             return True
         except Exception as e:
             print(f"❌ Error saving PDF: {str(e)}")
             return False
 
+    def to_bytes(self) -> bytes:
+        """
+        Return the edited PDF as bytes without touching the filesystem
+
+        Uses the save profile's options; incremental updates need a backing
+        file, so the "fast" profile writes a plain uncompacted copy here.
+        """
+        if not self.modified:
+            if self._input_bytes is not None:
+                return bytes(self._input_bytes)
+            with open(self.input_path, 'rb') as f:
+                return f.read()
+
+        options = dict(SAVE_PROFILES[self.save_profile])
+        options.pop("incremental", None)
+        return self.doc.tobytes(**options)
+
+    @classmethod
+    def from_bytes(cls, pdf_bytes: Union[bytes, bytearray, memoryview], **kwargs) -> "PDFResumeEditor":
+        """Editor over an in-memory PDF; take the result with to_bytes()"""
+        return cls(pdf_bytes, None, **kwargs)
+
     def close(self):
         """Close all resources"""
         self.doc.close()
         self.analyzer.close()
+        if self._work_path and os.path.exists(self._work_path):
+            os.remove(self._work_path)
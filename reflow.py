@@ -0,0 +1,404 @@
+from typing import List, Optional, Sequence, Tuple
+import fitz  # PyMuPDF
+from edit_plan import ShiftOp
+from pdf_analyzer import TextBlockTable
+from text_layout import BULLETS
+
+Rect = Tuple[float, float, float, float]
+
+class NoRoom(Exception):
+    """No content can be moved to open the space without spoiling the layout"""
+
+# Tolerance when testing whether a block lies inside a band
+EPSILON = 0.5
+
+# Redaction leaves a glyph alone when its box reaches only about a tenth of
+# its height into the redacted area, so a cut may clip line boxes this much
+# (line boxes of tightly set text overlap, leaving no clean gap otherwise)
+LINE_SLACK = 0.08
+
+# Lines further apart than this share of a line's height are separate
+# paragraphs; a cut never splits a paragraph
+PARAGRAPH_GAP = 0.3
+
+def plan_shift(table: TextBlockTable, page_width: float, page_num: int, y: float,
+               dy: float, x_range: Rect, limit: float, edit: str,
+               images: Sequence[Rect] = (), drawings: Sequence[Rect] = (),
+               headers: Sequence[int] = ()) -> Optional[ShiftOp]:
+    """
+    Work out which content to move to open dy points of space at y
+
+    The moved band is the column given by x_range, widened to the gutters,
+    when the text below y keeps to it (a two-column layout), else the full
+    page width. It runs from y (or higher, so no line or image is cut in
+    two) to the lowest text line on the page, or picture starting above
+    it, so footers drawn without text stay put. Drawings crossing y, such
+    as a section header's bar, stay where they are, as do drawings reaching
+    out of the band and footer bars, with the text on them. Moved content
+    stops above whatever stays put below the band.
+
+    Content that would be pushed below limit (or that line, if lower) goes
+    to the next page instead, cut at a gap no paragraph or picture crosses
+    and never right below a section header. The shift returned puts it on
+    a new page at this page's top margin; the caller may redirect it to an
+    existing page.
+
+    No band is planned when that would move content above y in the edited
+    column, or move content across pictures that stay put.
+
+    Args:
+        table: The document's text blocks, in current coordinates
+        page_width: Width of the page
+        page_num: Page to open space on
+        y: Where the space opens
+        dy: How much space to open
+        x_range: (x0, x1) of the column being edited
+        limit: Lowest y moved content may reach, e.g. the document's
+            bottom text margin
+        edit: Label of the edit, for the plan
+        images: Image boxes on the page
+        drawings: Boxes of vector drawings on the page
+        headers: Indices of section header blocks
+
+    Returns:
+        The shift, or None if nothing sits below y
+
+    Raises:
+        NoRoom: No band can be moved safely
+    """
+    on_page = [i for i, page in enumerate(table.page_num) if page == page_num]
+    below = [i for i in on_page if table.y1[i] > y]
+    if not below:
+        return None
+    pictures = [b for b in list(images) + list(drawings) if b[3] > y]
+
+    x0, x1 = x_range[0] - EPSILON, x_range[1] + EPSILON
+    straddles = any(table.x0[i] < x0 < table.x1[i] or table.x0[i] < x1 < table.x1[i] for i in below)
+    outside = any(table.x1[i] <= x0 or table.x0[i] >= x1 for i in below)
+    if straddles or not outside:
+        x0, x1 = 0.0, page_width
+    else:
+        # Out into the gutters, so bars and rules drawn across this column
+        # move with it
+        left = max([0.0] + [table.x1[i] for i in below if table.x1[i] <= x0])
+        right = min([page_width] + [table.x0[i] for i in below if table.x0[i] >= x1])
+        x0 = _gutter_edge(left, x0, [(b[0], b[2]) for b in pictures])
+        x1 = -_gutter_edge(-right, -x1, [(-b[2], -b[0]) for b in pictures])
+
+    inside = lambda b: b[0] >= x0 and b[2] <= x1
+    across = lambda b: b[0] < x1 and b[2] > x0
+    # Drawings reaching out of the band stay put, as do footer bars (drawings
+    # with text on them and none below); so does the text on them
+    lowest = lambda b: not any(table.y0[i] >= b[3] for i in below)
+    fixed = [b for b in drawings if b[3] > y and across(b)
+             and (not inside(b) or (lowest(b) and any(_holds(b, table, i) for i in below)))]
+    pinned = {i for i in below if any(_holds(b, table, i) for b in fixed)}
+    in_band = [i for i in on_page if table.x0[i] >= x0 and table.x1[i] <= x1 and i not in pinned]
+    if not any(table.y1[i] > y for i in in_band):
+        return None
+    paragraphs = _paragraphs(table, in_band, headers)
+    # Start above any paragraph or image the opening point falls inside of,
+    # as long as that moves nothing in the edited column down past it
+    top = _cut_above(paragraphs + [(b[1], b[3]) for b in images if inside(b)], y)
+    moving = [i for i in in_band if table.y0[i] + table.y1[i] >= 2 * top]
+    if any(table.x0[i] < x_range[1] and table.x1[i] > x_range[0]
+           and table.y0[i] + table.y1[i] < 2 * y for i in moving):
+        raise NoRoom(f"content above the opening on page {page_num + 1} would move")
+    bottom = max(table.y1[i] for i in moving) + EPSILON
+    pictures_in_band = [(b[1], b[3]) for b in pictures if inside(b) and top <= b[1] < bottom]
+    bottom = max([bottom] + [y1 + EPSILON for _, y1 in pictures_in_band])
+    boxes = [p for p in paragraphs if p[0] >= top] + pictures_in_band
+
+    # Nothing moves onto what stays below the band
+    stays = [table.y0[i] for i in pinned] + [b[1] for b in pictures if across(b)]
+    limit = min([limit] + [y0 - EPSILON for y0 in stays if y0 >= bottom])
+
+    cut = None
+    spill_top = None
+    limit = max(limit, bottom)
+    overflowing = [y0 for y0, y1 in boxes if y1 + dy > limit]
+    if overflowing:
+        cut = _cut_above(boxes, min(overflowing) - EPSILON)
+        # Keep a section header with the content under it
+        above = [i for i in moving if table.y0[i] + table.y1[i] < 2 * cut]
+        if above:
+            last = max(above, key=lambda i: table.y1[i])
+            if last in headers:
+                cut = _cut_above(boxes, table.y0[last] - EPSILON)
+        cut = max(cut, top)
+        spill_top = max(0.0, min(table.y0[i] for i in on_page) - EPSILON)
+
+    shift = ShiftOp(edit, page_num, (x0, top, x1, bottom), dy, cut, spill_top, True)
+    if _crosses_pictures(shift, table, list(images) + list(drawings)):
+        raise NoRoom(f"content would move across a picture on page {page_num + 1}")
+    return shift
+
+def _gutter_edge(neighbour: float, column: float, spans: List[Tuple[float, float]]) -> float:
+    """
+    Where a column's band starts in the gutter next to it
+
+    Works on an axis pointing into the column: neighbour is where the next
+    column's text ends, column where this column's text starts, spans the
+    (start, end) of pictures. Pictures in the gutter go with whichever side
+    is closer.
+    """
+    # The column starts at its first picture reaching into it, e.g. a header bar
+    column = min([column] + [start for start, end in spans if start > neighbour and end > column])
+    edge = neighbour
+    for start, end in spans:
+        if end <= column and start - neighbour < column - end:
+            edge = max(edge, end)
+    return edge + EPSILON
+
+def _holds(picture: Rect, table: TextBlockTable, i: int) -> bool:
+    """Whether block i sits on the picture"""
+    middle_x = (table.x0[i] + table.x1[i]) / 2
+    middle_y = (table.y0[i] + table.y1[i]) / 2
+    return picture[0] <= middle_x <= picture[2] and picture[1] <= middle_y <= picture[3]
+
+def _paragraphs(table: TextBlockTable, blocks: List[int],
+                headers: Sequence[int] = ()) -> List[Tuple[float, float]]:
+    """
+    (y0, y1) of the paragraphs the blocks form, with the slack of single lines
+
+    A line continues the paragraph above it when they overlap horizontally,
+    the gap between them is under PARAGRAPH_GAP of a line's height, the line
+    above runs (about) as wide as the paragraph, so it wrapped rather than
+    ended, and the line doesn't start with a bullet. Section headers are
+    paragraphs of their own.
+    """
+    paragraphs = []
+    for i in sorted(blocks, key=lambda i: table.y0[i]):
+        x0, y0, x1, y1 = table.x0[i], table.y0[i], table.x1[i], table.y1[i]
+        height = y1 - y0
+        # Another span of a paragraph's last line, a word space or so away
+        paragraph = next((p for p in reversed(paragraphs)
+                          if p.line_y0 <= (y0 + y1) / 2 <= p.y1
+                          and p.x0 - height < x1 and x0 < p.x1 + height), None)
+        if paragraph is not None:
+            paragraph.add(x0, y0, x1, y1, height, same_line=True)
+            continue
+        paragraph = next((p for p in reversed(paragraphs)
+                          if p.x0 < x1 and x0 < p.x1 and y0 <= p.y1 + height * PARAGRAPH_GAP), None)
+        if paragraph is not None and paragraph.open and i not in headers \
+                and paragraph.line_x1 >= paragraph.x1 - height \
+                and not table.text[i].lstrip().startswith(BULLETS):
+            paragraph.add(x0, y0, x1, y1, height, same_line=False)
+        else:
+            paragraphs.append(_Paragraph(x0, y0, x1, y1, height, open=i not in headers))
+    return [(p.top, p.end) for p in paragraphs]
+
+class _Paragraph:
+    """Extent of a paragraph being collected by _paragraphs()"""
+    __slots__ = ("x0", "x1", "y1", "top", "end", "line_y0", "line_x1", "open")
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float, height: float, open: bool):
+        self.x0, self.x1, self.y1 = x0, x1, y1
+        self.top, self.end = y0 + height * LINE_SLACK, y1 - height * LINE_SLACK
+        self.line_y0, self.line_x1 = y0, x1
+        self.open = open
+
+    def add(self, x0: float, y0: float, x1: float, y1: float, height: float, same_line: bool):
+        self.x0 = min(self.x0, x0)
+        self.x1 = max(self.x1, x1)
+        if same_line:
+            self.line_x1 = max(self.line_x1, x1)
+        else:
+            self.line_y0, self.line_x1 = y0, x1
+        if y1 > self.y1:
+            self.y1, self.end = y1, y1 - height * LINE_SLACK
+
+def _cut_above(boxes: List[Tuple[float, float]], cut: float) -> float:
+    """Raise cut until it crosses none of the (y0, y1) boxes"""
+    while True:
+        crossing = [y0 for y0, y1 in boxes if y0 < cut < y1]
+        if not crossing:
+            return cut
+        cut = min(crossing) - EPSILON
+
+def crosses_backdrops(shift: ShiftOp, table: TextBlockTable, backdrops: Sequence[Rect],
+                      next_backdrops: Sequence[Rect] = ()) -> bool:
+    """
+    Whether a shift would move text onto or off a backdrop
+
+    Backdrops are panels and sidebars: page-high pictures that don't cover
+    the whole page. They stay put, so text moved across their edges would
+    change the look of the page.
+
+    Args:
+        shift: The planned shift
+        table: Text blocks before the shift
+        backdrops: Backdrops on the shifted page
+        next_backdrops: Backdrops on the page overflow goes to
+    """
+    for i in range(len(table)):
+        if table.page_num[i] != shift.page_num:
+            continue
+        x0, y0, x1, y1 = table.x0[i], table.y0[i], table.x1[i], table.y1[i]
+        page, new_y0, new_y1 = shifted_position(shift, shift.page_num, x0, y0, x1, y1)
+        if page == shift.page_num and new_y0 == y0:
+            continue
+        target = backdrops if page == shift.page_num else next_backdrops
+        if any(_overlaps((x0, y0, x1, y1), b) for b in backdrops) \
+                or any(_overlaps((x0, new_y0, x1, new_y1), b) for b in target):
+            return True
+    return False
+
+def _crosses_pictures(shift: ShiftOp, table: TextBlockTable, pictures: Sequence[Rect]) -> bool:
+    """
+    Whether content would move across a picture that stays put
+
+    Pictures reaching out of the band stay on the page; content moved or
+    inserted over one (e.g. a rule running on into the next column) would
+    be drawn across it, and text on one would move off it. A picture
+    starting above the band, such as a section header's bar, may reach
+    into it as long as no moved text sits on it. Pictures below the band
+    are left out: plan_shift keeps moved content clear of them.
+
+    Args:
+        shift: The planned shift
+        table: Text blocks before the shift
+        pictures: Image and drawing boxes on the shifted page
+    """
+    x0, top, x1, bottom = shift.band
+    moved = [(table.x0[i], table.y0[i] + slack, table.x1[i], table.y1[i] - slack)
+             for i in range(len(table))
+             for slack in [(table.y1[i] - table.y0[i]) * LINE_SLACK]
+             if table.page_num[i] == shift.page_num and table.x0[i] >= x0 and table.x1[i] <= x1
+             and top <= (table.y0[i] + table.y1[i]) / 2 <= bottom]
+    for b in pictures:
+        if (b[0] >= x0 and b[2] <= x1 and b[1] >= top and b[3] <= bottom) \
+                or b[0] >= x1 or b[2] <= x0 or b[1] >= bottom or b[3] <= top:
+            continue
+        if b[1] >= top or any(_overlaps(box, b) for box in moved):
+            return True
+    return False
+
+def _overlaps(a: Rect, b: Rect) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def shifted_position(shift: ShiftOp, page_num: int, x0: float, y0: float,
+                     x1: float, y1: float) -> Tuple[int, float, float]:
+    """Where a box ends up after a shift: (page_num, y0, y1)"""
+    bx0, by0, bx1, by1 = shift.band
+    # Boxes go by their middle, as lines may reach a little past a cut
+    middle = (y0 + y1) / 2
+    if page_num == shift.page_num:
+        if x0 >= bx0 and x1 <= bx1 and by0 <= middle <= by1:
+            if shift.cut is not None and middle >= shift.cut:
+                offset = shift.spill_top - shift.cut
+                return page_num + 1, y0 + offset, y1 + offset
+            return page_num, y0 + shift.dy, y1 + shift.dy
+    elif page_num > shift.page_num and shift.cut is not None and shift.new_page:
+        return page_num + 1, y0, y1
+    return page_num, y0, y1
+
+def shift_table(shift: ShiftOp, table: TextBlockTable):
+    """Move extracted blocks in place the way apply_shift moves the page content"""
+    for i in range(len(table)):
+        page, y0, y1 = shifted_position(shift, table.page_num[i], table.x0[i], table.y0[i],
+                                        table.x1[i], table.y1[i])
+        table.page_num[i] = page
+        table.y0[i] = y0
+        table.y1[i] = y1
+
+def splits_images(band: Rect, images: Sequence[Rect]) -> bool:
+    """
+    Whether the band holds images while others reach out of it
+
+    Images reaching out of the band, such as a page's background, stay put,
+    so apply_shift leaves every image the band touches in place; one inside
+    the band would then be left behind as well as moved.
+    """
+    return any(_within(b, band) for b in images) and \
+        any(_overlaps(b, band) and not _within(b, band) for b in images)
+
+def _within(box: Rect, band: Rect) -> bool:
+    return box[0] >= band[0] - EPSILON and box[1] >= band[1] - EPSILON \
+        and box[2] <= band[2] + EPSILON and box[3] <= band[3] + EPSILON
+
+def _redact(page: "fitz.Page", rects: List["fitz.Rect"], graphics: int,
+            images: int = fitz.PDF_REDACT_IMAGE_REMOVE):
+    """Remove content in rects (not just cover it); untouched content is kept as is"""
+    for rect in rects:
+        if not rect.is_empty:
+            page.add_redact_annot(rect, fill=False, cross_out=False)
+    page.apply_redactions(images=images, graphics=graphics, text=fitz.PDF_REDACT_TEXT_REMOVE)
+
+def _outside(page_rect: "fitz.Rect", keep: "fitz.Rect") -> List["fitz.Rect"]:
+    """Rectangles covering page_rect except keep"""
+    p = page_rect
+    return [fitz.Rect(p.x0, p.y0, p.x1, keep.y0), fitz.Rect(p.x0, keep.y1, p.x1, p.y1),
+            fitz.Rect(p.x0, keep.y0, keep.x0, keep.y1), fitz.Rect(keep.x1, keep.y0, p.x1, keep.y1)]
+
+def _background(page: "fitz.Page") -> List[dict]:
+    """The page's page-high drawings: fills, panels, sidebar rules"""
+    return [path for path in page.get_drawings() if path["rect"].height >= page.rect.height / 2]
+
+def _draw_paths(page: "fitz.Page", paths: List[dict]):
+    """Redraw paths from get_drawings() on page"""
+    shape = page.new_shape()
+    for path in paths:
+        for item in path["items"]:
+            if item[0] == "l":
+                shape.draw_line(item[1], item[2])
+            elif item[0] == "re":
+                shape.draw_rect(item[1])
+            elif item[0] == "qu":
+                shape.draw_quad(item[1])
+            elif item[0] == "c":
+                shape.draw_bezier(item[1], item[2], item[3], item[4])
+        shape.finish(fill=path.get("fill"), color=path.get("color"),
+                     width=path.get("width") or 1.0, even_odd=path.get("even_odd", False),
+                     closePath=path.get("closePath", False),
+                     fill_opacity=path.get("fill_opacity") or 1.0,
+                     stroke_opacity=path.get("stroke_opacity") or 1.0)
+    shape.commit()
+
+def apply_shift(doc: "fitz.Document", shift: ShiftOp):
+    """
+    Move the shift's band down its page (and onto the next page past the cut)
+
+    The band's content is removed from the page by redaction, which
+    rewrites only the objects inside it. A one-page copy, redacted down to
+    just the band, is then placed back lower on the page as a form
+    XObject. Nothing outside the band is re-rendered. Drawings reaching
+    out of the band stay on the page and are left out of the copy, and so
+    do images: when one reaches out of the band (e.g. a full-page
+    background), the images the band touches are left alone rather than cut
+    out, so the planner never moves a band holding images along with such
+    an image (see splits_images). A new page for the overflow gets the
+    page's background drawings first.
+    """
+    page = doc[shift.page_num]
+    page_rect = page.rect
+    images = [info["bbox"] for info in page.get_image_info()]
+    reaching_out = any(_overlaps(b, shift.band) and not _within(b, shift.band) for b in images)
+    background = _background(page) if shift.cut is not None and shift.new_page else []
+    band = fitz.Rect(shift.band)
+    keep = fitz.Rect(band.x0, band.y0, band.x1, shift.cut if shift.cut is not None else band.y1)
+
+    source = fitz.open()
+    try:
+        source.insert_pdf(doc, from_page=shift.page_num, to_page=shift.page_num)
+        _redact(source[0], _outside(page_rect, keep), fitz.PDF_REDACT_LINE_ART_REMOVE_IF_TOUCHED)
+        if shift.cut is not None:
+            spill = fitz.Rect(band.x0, shift.cut, band.x1, band.y1)
+            source.insert_pdf(doc, from_page=shift.page_num, to_page=shift.page_num)
+            _redact(source[1], _outside(page_rect, spill), fitz.PDF_REDACT_LINE_ART_REMOVE_IF_TOUCHED)
+
+        _redact(page, [band], fitz.PDF_REDACT_LINE_ART_REMOVE_IF_COVERED,
+                fitz.PDF_REDACT_IMAGE_NONE if reaching_out else fitz.PDF_REDACT_IMAGE_REMOVE)
+        if not keep.is_empty:
+            page.show_pdf_page(keep + (0, shift.dy, 0, shift.dy), source, 0, clip=keep)
+        if shift.cut is not None:
+            if shift.new_page:
+                next_page = doc.new_page(shift.page_num + 1, width=page_rect.width,
+                                         height=page_rect.height)
+                _draw_paths(next_page, background)
+            else:
+                next_page = doc[shift.page_num + 1]
+            offset = shift.spill_top - shift.cut
+            next_page.show_pdf_page(spill + (0, offset, 0, offset), source, 1, clip=spill)
+    finally:
+        source.close()
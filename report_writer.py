@@ -0,0 +1,120 @@
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Set
+
+class ReportWriter:
+    """
+    Append-only JSONL batch report
+
+    Each result is written as one line the moment its resume finishes, so
+    a crash loses at most the records since the last fsync. fsync is
+    batched: it runs every fsync_every records or fsync_interval seconds,
+    whichever comes first, and on close().
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 50, fsync_interval: float = 2.0):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        # A crash mid-write can leave a partial last line; start on a fresh one
+        if self._file.tell() > 0 and not _ends_with_newline(self.path):
+            self._file.write("\n")
+
+    def write(self, result: Dict):
+        """Append one result record"""
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Flush, fsync and close the report"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        self._sync()
+        self._file.close()
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def read_results(path: Path) -> Iterator[Dict]:
+    """Yield result records from a JSONL report, skipping a torn last line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def latest_results(path: Path) -> Iterator[Dict]:
+    """
+    Yield the final record per filename, in first-seen order
+
+    A resumed run appends retries to the same report, so later records
+    supersede earlier ones for the same file. Only line offsets are kept in
+    memory, not the records themselves.
+    """
+    offsets: Dict[str, int] = {}
+    with open(path, 'rb') as f:
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            try:
+                record = json.loads(line)
+                offsets[record["filename"]] = offset
+            except (ValueError, KeyError):
+                pass
+            offset = f.tell()
+
+        for offset in offsets.values():
+            f.seek(offset)
+            yield json.loads(f.readline())
+
+def successful_filenames(path: Path) -> Set[str]:
+    """Filenames whose latest record in the report is a success"""
+    return {r["filename"] for r in latest_results(path) if r.get("success")}
+
+def summarize(path: Path) -> Dict:
+    """Aggregate counts for a report, derived from the stream"""
+    summary = {
+        "total": 0,
+        "successful": 0,
+        "failed": 0,
+        "experience_added": 0,
+        "skills_modified": 0,
+        "certifications_added": 0,
+        "analysis_cached": 0,
+        "up_to_date": 0,
+        "template_hits": 0,
+        "template_misses": 0
+    }
+    for result in latest_results(path):
+        summary["total"] += 1
+        summary["successful" if result.get("success") else "failed"] += 1
+        summary["experience_added"] += 1 if result.get("experience_added") else 0
+        summary["skills_modified"] += result.get("skills_modified", 0)
+        summary["certifications_added"] += result.get("certifications_added", 0)
+        summary["analysis_cached"] += 1 if result.get("analysis_cached") else 0
+        summary["up_to_date"] += 1 if result.get("up_to_date") else 0
+        if "template_hit" in result:
+            summary["template_hits" if result["template_hit"] else "template_misses"] += 1
+    return summary
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from pdf_analyzer import TextBlock
+
+Rect = Tuple[float, float, float, float]
+
+class SpatialIndex:
+    """
+    Uniform-grid spatial index over text blocks, one grid per page
+
+    Each block is registered in every cell its bbox touches, so a
+    rectangle query only looks at the handful of cells it covers instead
+    of every block in the document. Text inserted by edits is added with
+    insert() so later edits see it.
+    """
+
+    def __init__(self, blocks: Iterable[TextBlock] = (), cell_size: float = 36.0):
+        self.cell_size = cell_size
+        self.blocks: List[TextBlock] = []
+        # (page_num, cell_x, cell_y) -> indices into self.blocks
+        self._cells: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        # Lowest occupied cell row per page, bounds nearest_below's search
+        self._max_row: Dict[int, int] = {}
+
+        for block in blocks:
+            self.insert(block)
+
+    def _cell_range(self, x0: float, y0: float, x1: float, y1: float):
+        size = self.cell_size
+        return (range(int(x0 // size), int(x1 // size) + 1),
+                range(int(y0 // size), int(y1 // size) + 1))
+
+    def insert(self, block: TextBlock):
+        """Add a block (existing or newly drawn text) to the index"""
+        index = len(self.blocks)
+        self.blocks.append(block)
+        xs, ys = self._cell_range(block.x0, block.y0, block.x1, block.y1)
+        for cx in xs:
+            for cy in ys:
+                self._cells[(block.page_num, cx, cy)].append(index)
+        self._max_row[block.page_num] = max(self._max_row.get(block.page_num, ys[-1]), ys[-1])
+
+    def truncate(self, count: int):
+        """Remove every block inserted after the first count"""
+        for block in self.blocks[count:]:
+            xs, ys = self._cell_range(block.x0, block.y0, block.x1, block.y1)
+            for cx in xs:
+                for cy in ys:
+                    cell = self._cells[(block.page_num, cx, cy)]
+                    # Cells list indices in insertion order
+                    while cell and cell[-1] >= count:
+                        cell.pop()
+        # _max_row is left as is: a bound deeper than needed only costs
+        # nearest_below a few empty rows
+        del self.blocks[count:]
+
+    def blocks_in_rect(self, page_num: int, rect: Rect) -> List[TextBlock]:
+        """Blocks on page_num whose bbox intersects rect"""
+        rx0, ry0, rx1, ry1 = rect
+        xs, ys = self._cell_range(rx0, ry0, rx1, ry1)
+
+        seen = set()
+        hits = []
+        for cx in xs:
+            for cy in ys:
+                for index in self._cells.get((page_num, cx, cy), ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    b = self.blocks[index]
+                    if b.x0 < rx1 and b.x1 > rx0 and b.y0 < ry1 and b.y1 > ry0:
+                        hits.append(b)
+        return hits
+
+    def nearest_below(self, block: TextBlock) -> Optional[TextBlock]:
+        """Closest block starting below block that overlaps it horizontally"""
+        xs, ys = self._cell_range(block.x0, block.y1, block.x1, block.y1)
+        max_row = self._max_row.get(block.page_num, ys.start)
+
+        for cy in range(ys.start, max_row + 1):
+            best = None
+            for cx in xs:
+                for index in self._cells.get((block.page_num, cx, cy), ()):
+                    b = self.blocks[index]
+                    if b.y0 >= block.y1 and b.x0 < block.x1 and b.x1 > block.x0:
+                        if best is None or b.y0 < best.y0:
+                            best = b
+            # Anything in a later row starts below everything found in this one
+            if best is not None:
+                return best
+        return None
+
+    def first_free_y(self, page_num: int, x0: float, x1: float, y: float,
+                     height: float, gap: float = 2.0) -> float:
+        """Lowest y >= the given one where a height-tall strip over [x0, x1] is empty"""
+        while True:
+            hits = self.blocks_in_rect(page_num, (x0, y, x1, y + height))
+            if not hits:
+                return y
+            y = max(b.y1 for b in hits) + gap
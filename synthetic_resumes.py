@@ -0,0 +1,135 @@
+import math
+import random
+from typing import Dict, Iterable
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 50
+BODY_LEADING = 12.0
+HEADER_FONT = "Helvetica-Bold"
+BODY_FONTS = ["Helvetica", "Times-Roman", "Courier", "Helvetica-Oblique"]
+
+# Section header and body lines, in document order. The skills and lines
+# match the default edit_config.json so every edit has something to hit.
+SECTION_CONTENT = {
+    "experience": ("EXPERIENCE", [
+        "Software Engineer | Example Corp | 2019 - 2023",
+        "• Built internal tooling for data pipelines",
+        "• Reduced build times by 30% with caching"
+    ]),
+    "skills": ("SKILLS", [
+        "Python, JavaScript, React, SQL",
+        "Docker, Kubernetes, Terraform"
+    ]),
+    "certifications": ("CERTIFICATIONS", [
+        "• Certified Kubernetes Administrator (2022)"
+    ]),
+    "education": ("EDUCATION", [
+        "BSc Computer Science, State University, 2018"
+    ])
+}
+ALL_SECTIONS = tuple(SECTION_CONTENT)
+
+# Filler avoids section keywords so it never reads as a header
+FILLER_WORDS = ["alpha", "delivered", "platform", "quarterly", "roadmap", "vendor",
+                "migration", "latency", "customers", "budget", "design", "review",
+                "onboarding", "metrics", "rollout", "partner", "audit", "pipeline"]
+
+def generate_resume(path: str, pages: int = 1, spans: int = 300, font_count: int = 3,
+                    sections: Iterable[str] = ALL_SECTIONS, seed: int = 0) -> Dict:
+    """
+    Write a synthetic resume PDF of controlled size
+
+    The named sections come first, followed by a PROJECTS section of filler
+    lines spread over the requested number of pages. Each filler line is
+    split into segments in alternating fonts (one span each), which is how
+    large span counts fit on few pages.
+
+    Args:
+        path: Output PDF path
+        pages: Target page count
+        spans: Target number of text spans
+        font_count: Number of body fonts to alternate (1-4)
+        sections: Which of ALL_SECTIONS to include
+        seed: Seed for the filler text
+
+    Returns:
+        Dict: The generation parameters, for recording with results
+    """
+    rng = random.Random(seed)
+    fonts = BODY_FONTS[:max(1, min(font_count, len(BODY_FONTS)))]
+    sections = [name for name in ALL_SECTIONS if name in set(sections)]
+
+    fixed_lines = [(None, "Jordan Example")]
+    for name in sections:
+        header, lines = SECTION_CONTENT[name]
+        fixed_lines.append((HEADER_FONT, header))
+        fixed_lines.extend((fonts[0], line) for line in lines)
+    fixed_lines.append((HEADER_FONT, "PROJECTS"))
+
+    # Vertical space taken by the name line, section headers and lines
+    fixed_height = 0.0
+    for font, _ in fixed_lines:
+        fixed_height += 26 if font is None else 24 if font == HEADER_FONT else BODY_LEADING
+
+    # Lay filler lines out so they end on the last requested page
+    page_height = PAGE_HEIGHT - 2 * MARGIN
+    available = max(BODY_LEADING, pages * page_height - fixed_height)
+    filler_spans = max(1, spans - len(fixed_lines))
+    capacity = max(1, int(available // BODY_LEADING))
+    segments_per_line = 1 if len(fonts) == 1 else max(1, math.ceil(filler_spans / capacity))
+    filler_lines = math.ceil(filler_spans / segments_per_line)
+
+    # Spread lines over the available height; a single font cannot split
+    # lines into spans, so many lines get squeezed instead
+    leading = min(2 * BODY_LEADING, max(2.0, available / filler_lines))
+    font_size = min(10.0, leading / 1.2)
+
+    pdf = canvas.Canvas(path, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    y = PAGE_HEIGHT - MARGIN
+
+    def advance(step: float):
+        # Break the page lazily, so nothing ends on an empty page
+        nonlocal y
+        y -= step
+        if y < MARGIN:
+            pdf.showPage()
+            y = PAGE_HEIGHT - MARGIN
+
+    for font, text in fixed_lines:
+        if font is None:
+            pdf.setFont(HEADER_FONT, 18)
+            pdf.drawString(MARGIN, y, text)
+            advance(26)
+        elif font == HEADER_FONT:
+            advance(6)
+            pdf.setFont(HEADER_FONT, 14)
+            pdf.drawString(MARGIN, y, text)
+            advance(18)
+        else:
+            pdf.setFont(font, 10)
+            pdf.drawString(MARGIN, y, text)
+            advance(BODY_LEADING)
+
+    slot = (PAGE_WIDTH - 2 * MARGIN) / segments_per_line
+    remaining = filler_spans
+    for _ in range(filler_lines):
+        for i in range(min(segments_per_line, remaining)):
+            font = fonts[i % len(fonts)]
+            words = []
+            while True:
+                candidate = " ".join(words + [rng.choice(FILLER_WORDS)])
+                if words and stringWidth(candidate, font, font_size) > slot - 4:
+                    break
+                words = candidate.split(" ")
+                if len(words) >= 12:
+                    break
+            pdf.setFont(font, font_size)
+            pdf.drawString(MARGIN + i * slot, y, " ".join(words))
+        remaining -= segments_per_line
+        advance(leading)
+
+    pdf.save()
+    return {"pages": pages, "spans": spans, "font_count": len(fonts),
+            "sections": sections, "seed": seed}
@@ -0,0 +1,152 @@
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from cache_directory import CacheDirectory
+from pdf_analyzer import PDFResumeAnalyzer, TextBlockTable, ANALYZER_VERSION
+
+# Distinct templates kept per layout key (same page sizes and font set)
+MAX_TEMPLATES_PER_KEY = 8
+
+def layout_key(analyzer: PDFResumeAnalyzer) -> str:
+    """
+    Cheap layout signature available right after text extraction
+
+    Built from the page count and sizes and the font set, so every
+    document from one template shares it regardless of its content.
+    """
+    doc = analyzer.doc
+    layout = analyzer.get_layout_info()
+    pages = []
+    for page_num in range(layout["total_pages"]):
+        rect = doc.page_cropbox(page_num)
+        pages.append((round(rect.width), round(rect.height)))
+    signature = json.dumps([pages, sorted(layout["unique_fonts"])])
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+def header_geometry(analyzer: PDFResumeAnalyzer) -> List[List]:
+    """[name, page, x0, y0] of each detected section header, in block order"""
+    table = analyzer.text_blocks
+    return [[name, table.page_num[i], round(table.x0[i]), round(table.y0[i])]
+            for i, name in analyzer.section_headers]
+
+def layout_fingerprint(analyzer: PDFResumeAnalyzer) -> str:
+    """Template fingerprint: layout key plus the header positions"""
+    signature = json.dumps([layout_key(analyzer), header_geometry(analyzer)])
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+class TemplateCache:
+    """
+    Cache of resolved section geometry per resume template
+
+    Documents sharing a layout key are checked against the known templates
+    for that key. Only the spans at a template's header positions are
+    tested: each must be large enough to be a header and hold the same
+    section keyword. If all are, sections are built from them without
+    scanning the rest of the document, so a header the template lacks
+    goes undetected on a hit. Insertion points are still computed from the
+    document's own content.
+
+    Templates are stored as one small JSON file per layout key; the least
+    recently used files are dropped beyond max_entries.
+    """
+
+    def __init__(self, cache_dir: str = ".template_cache", max_entries: int = 1024):
+        self.directory = CacheDirectory(cache_dir, "*.json", max_entries=max_entries)
+        self.hits = 0
+        self.misses = 0
+        # Templates already read in this process, by layout key
+        self._loaded: Dict[str, List[Dict]] = {}
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory.path(f"{key}.v{ANALYZER_VERSION}.json")
+
+    def _read(self, key: str) -> List[Dict]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                templates = json.load(f)["templates"]
+            self.directory.touch(path)
+        except (OSError, ValueError, KeyError):
+            templates = []
+        self._loaded[key] = templates
+        return templates
+
+    def match(self, analyzer: PDFResumeAnalyzer) -> Optional[Dict]:
+        """
+        Build the analyzer's sections from a matching template
+
+        Args:
+            analyzer: Analyzer with text blocks extracted, sections not yet
+                identified
+
+        Returns:
+            The matching template, or None on a miss
+        """
+        if not isinstance(analyzer.text_blocks, TextBlockTable) or not analyzer.text_blocks:
+            self.misses += 1
+            return None
+
+        key = layout_key(analyzer)
+        template = self._match_any(analyzer, self._loaded.get(key, []))
+        if template is None:
+            # Other processes may have added templates for this key since
+            template = self._match_any(analyzer, self._read(key))
+
+        if template is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return template
+
+    def _match_any(self, analyzer: PDFResumeAnalyzer, templates: List[Dict]) -> Optional[Dict]:
+        for template in templates:
+            headers = self._find_headers(analyzer, template)
+            if headers is not None:
+                analyzer.build_sections(headers)
+                return template
+        return None
+
+    def _find_headers(self, analyzer: PDFResumeAnalyzer,
+                      template: Dict) -> Optional[List[Tuple[int, str]]]:
+        """Headers at exactly the template's positions, or None if one is missing"""
+        table = analyzer.text_blocks
+        positions = {(page, x0, y0): name for name, page, x0, y0 in template["headers"]}
+        min_header_size = analyzer.min_header_size()
+        # Block index of the header found at each position
+        found: Dict[Tuple[int, int, int], int] = {}
+        for i, (page, x0, y0) in enumerate(zip(table.page_num, table.x0, table.y0)):
+            position = (page, round(x0), round(y0))
+            name = positions.get(position)
+            if name is None or position in found or table.font_size[i] < min_header_size:
+                continue
+            keyword = analyzer.match_section_keyword(table.text[i].lower().strip())
+            if keyword and keyword.title() == name:
+                found[position] = i
+
+        if len(found) != len(template["headers"]):
+            return None
+        found_order = sorted((i, position) for position, i in found.items())
+        # Headers must also come in the template's order
+        if [[positions[p], *p] for _, p in found_order] != template["headers"]:
+            return None
+        return [(i, positions[p]) for i, p in found_order]
+
+    def store(self, analyzer: PDFResumeAnalyzer):
+        """Record the analyzer's detected section headers as a template"""
+        if not analyzer.section_headers:
+            return
+
+        key = layout_key(analyzer)
+        template = {
+            "fingerprint": layout_fingerprint(analyzer),
+            "headers": header_geometry(analyzer)
+        }
+
+        templates = [t for t in self._read(key) if t["fingerprint"] != template["fingerprint"]]
+        templates.insert(0, template)
+        del templates[MAX_TEMPLATES_PER_KEY:]
+        self._loaded[key] = templates
+
+        data = json.dumps({"templates": templates}, separators=(",", ":")).encode("utf-8")
+        self.directory.write(self._entry_path(key), data, "template")
@@ -1,6 +1,9 @@
 
 import sys
+from pathlib import Path
+from main import ResumeEditConfig
 from pdf_editor import PDFResumeEditor
+from visual_diff import compare_pdfs
 
 def test_pdf_editing(input_pdf: str, output_pdf: str):
     """Test PDF editing functionality"""
@@ -58,11 +61,20 @@ def test_pdf_editing(input_pdf: str, output_pdf: str):
         print("✅ TESTING COMPLETE")
         print("="*60)
         print(f"\n📄 Check the output file: {output_pdf}")
+
+        # Overlapping text is checked automatically
+        report = compare_pdfs(input_pdf, output_pdf)
+        if report["flagged"]:
+            print(f"⚠️  {report['overlaps']} overlapping line(s), "
+                  f"{report['ink_overlaps']} drawn over existing ink "
+                  f"(details: python visual_diff.py {input_pdf} {output_pdf})")
+        else:
+            print("✅ No overlapping text")
+
         print("👀 Verify that:")
         print("  1. Layout is preserved")
         print("  2. Fonts match the original")
-        print("  3. No text overlapping")
-        print("  4. All edits are visible")
+        print("  3. All edits are visible")
 
         return True
 
@@ -72,11 +84,67 @@ def test_pdf_editing(input_pdf: str, output_pdf: str):
         traceback.print_exc()
         return False
 
+def test_reflow_samples(input_dir: str, output_dir: str,
+                        config_path: str = "edit_config.json") -> bool:
+    """
+    Reflow every resume in input_dir with the configured edits and check the outputs
+
+    Fails when the visual diff flags a line of an edit that reflow made
+    room for. Edits reflow gave up on are drawn over the content, so their
+    flags are expected; they are listed, not failed.
+    """
+    print(f"\n{'='*60}")
+    print("Testing reflow on sample resumes")
+    print('='*60)
+
+    config = ResumeEditConfig(config_path)
+    mapping = {m["old"]: m["new"] for m in config.get_skill_modifications()}
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    passed = True
+    for input_pdf in sorted(Path(input_dir).glob("*.pdf")):
+        output_pdf = Path(output_dir) / f"edited_{input_pdf.name}"
+        editor = PDFResumeEditor(str(input_pdf), str(output_pdf), reflow=True)
+        plan = editor.compile_plan(config.get_experience_lines(), mapping,
+                                   config.get_certifications(), position="top",
+                                   min_font_scale=config.get_min_font_scale())
+        editor.apply_plan(plan)
+        editor.save()
+        editor.close()
+
+        # Lines drawn over content on purpose, by where they were drawn
+        expected = [(op.page_num, op.rect) for op in plan.ops if op.edit in plan.overdrawn]
+        overdrawn = lambda page, bbox: any(
+            page_num == page and rect[0] < bbox[2] and bbox[0] < rect[2]
+            and rect[1] < bbox[3] and bbox[1] < rect[3]
+            for page_num, rect in expected
+        )
+        report = compare_pdfs(str(input_pdf), str(output_pdf))
+        unexpected = [f"'{o['line'][:50]}' over '{o['other'][:50]}'"
+                      for page in report["pages"] for o in page["overlaps"]
+                      if not overdrawn(page["page"], o["bbox"])
+                      and not overdrawn(page["page"], o["other_bbox"])]
+        unexpected += [f"'{o['line'][:50]}' over ink ({o['coverage']:.0%})"
+                       for page in report["pages"] for o in page["ink_overlaps"]
+                       if not overdrawn(page["page"], o["bbox"])]
+        if unexpected:
+            passed = False
+            print(f"❌ {input_pdf.name}: reflowed text overlaps content")
+            for overlap in unexpected:
+                print(f"     {overlap}")
+        elif plan.overdrawn:
+            print(f"⚠️  {input_pdf.name}: drawn over content for {', '.join(plan.overdrawn)}")
+        else:
+            print(f"✅ {input_pdf.name}: {report['pages_before']}→{report['pages_after']} pages, "
+                  f"no overlapping text")
+    return passed
+
 if __name__ == "__main__":
     print("🧪 PDF Resume Editor - Phase 2 Testing")
     print("=" * 60)
 
-    if len(sys.argv) >= 3:
+    if len(sys.argv) >= 4 and sys.argv[1] == "--reflow-samples":
+        sys.exit(0 if test_reflow_samples(sys.argv[2], sys.argv[3]) else 1)
+    elif len(sys.argv) >= 3:
         input_pdf = sys.argv[1]
         output_pdf = sys.argv[2]
         test_pdf_editing(input_pdf, output_pdf)
@@ -84,3 +152,5 @@ if __name__ == "__main__":
         print("\n📋 Usage: python test_phase2.py <input_pdf> <output_pdf>")
         print("\nExample:")
         print("python test_phase2.py resume1.pdf resume1_edited.pdf")
+        print("\nReflow check over a folder of resumes:")
+        print("python test_phase2.py --reflow-samples input_resumes /tmp/reflowed")
@@ -0,0 +1,121 @@
+from itertools import accumulate
+from typing import List, NamedTuple, Optional, Tuple
+from font_registry import FontMetrics
+
+# Bullets that start a list item; wrapped lines are indented past them
+BULLETS = ("•", "●", "◦", "▪", "-", "–", "*")
+
+class LaidOutLine(NamedTuple):
+    """One line of wrapped text, relative to the block's top-left corner"""
+    text: str
+    x_offset: float
+    y_offset: float
+
+class TextBlockLayout(NamedTuple):
+    """Lines of a block of inserted text, fitted to a width"""
+    lines: List[LaidOutLine]
+    font_size: float
+    line_height: float
+
+    @property
+    def height(self) -> float:
+        return len(self.lines) * self.line_height
+
+def fit_lines(lines: List[str], metrics: FontMetrics, font_size: float, max_width: float,
+              min_font_size: Optional[float] = None, leading: float = 1.2) -> TextBlockLayout:
+    """
+    Wrap (and optionally shrink) lines of text to fit a width
+
+    Words are measured once each through the font's word-width cache, and
+    all fitting works on those widths at size 1, so hundreds of lines cost
+    a few list operations per line rather than per-character work. Lines
+    starting with a bullet wrap with a hanging indent past the bullet.
+
+    Args:
+        lines: Text lines, one entry (e.g. bullet) each
+        metrics: Width metrics of the font the text is drawn in
+        font_size: Preferred font size
+        max_width: Width available to each line
+        min_font_size: Shrink the whole block down to this size, if that
+            avoids wrapping (default: never shrink)
+        leading: Line height as a multiple of the font size
+
+    Returns:
+        TextBlockLayout: The lines to draw, with offsets from the top-left
+    """
+    space = metrics.word_widths([" "])[0]
+    split_lines = [line.split(" ") for line in lines]
+    all_words = [word for words in split_lines for word in words]
+    # Word widths at size 1, then each line's natural width
+    widths_flat = metrics.word_widths(all_words)
+    bounds = list(accumulate(len(words) for words in split_lines))
+    word_widths = [widths_flat[end - len(words):end] for words, end in zip(split_lines, bounds)]
+    natural = [sum(w) + space * (len(w) - 1) for w in word_widths]
+
+    # One size for the whole block, so shrinking never mixes sizes
+    if min_font_size and natural:
+        widest = max(natural)
+        if widest * font_size > max_width:
+            font_size = max(min_font_size, min(font_size, max_width / widest))
+
+    limit = max_width / font_size  # available width at size 1
+    wrapped: List[Tuple[str, float]] = []
+    for line, words, widths, width in zip(lines, split_lines, word_widths, natural):
+        if width <= limit:
+            wrapped.append((line, 0.0))
+            continue
+        wrapped.extend(_wrap(words, widths, space, limit, metrics))
+
+    line_height = font_size * leading
+    laid_out = [LaidOutLine(text, indent * font_size, n * line_height)
+                for n, (text, indent) in enumerate(wrapped)]
+    return TextBlockLayout(laid_out, font_size, line_height)
+
+def _wrap(words: List[str], widths: List[float], space: float, limit: float,
+          metrics: FontMetrics) -> List[Tuple[str, float]]:
+    """Greedy word wrap of one line; returns (text, indent at size 1) pairs"""
+    indent = 0.0
+    if len(words) > 1 and words[0] in BULLETS:
+        indent = widths[0] + space
+
+    out: List[Tuple[str, float]] = []
+    current: List[str] = []
+    current_width = 0.0
+    for word, width in zip(words, widths):
+        if indent + width > limit:
+            # A word wider than the line is broken between characters,
+            # starting on the current line if it only holds the bullet
+            pieces = _break_word(word, metrics, limit - indent)
+            if current and not (len(current) == 1 and not out and indent):
+                out.append((" ".join(current), indent if out else 0.0))
+                current = []
+            for piece, _ in pieces[:-1]:
+                out.append((" ".join(current + [piece]), indent if out else 0.0))
+                current = []
+            word, width = pieces[-1]
+        elif current and (indent if out else 0.0) + current_width + space + width > limit:
+            out.append((" ".join(current), indent if out else 0.0))
+            current, current_width = [], 0.0
+
+        if current:
+            current_width += space + width
+        else:
+            current_width = width
+        current.append(word)
+
+    if current:
+        out.append((" ".join(current), indent if out else 0.0))
+    return out
+
+def _break_word(word: str, metrics: FontMetrics, limit: float) -> List[Tuple[str, float]]:
+    """Split word into pieces no wider than limit (at size 1), with their widths"""
+    pieces = []
+    start = 0
+    piece_width = 0.0
+    for i, advance in enumerate(metrics.char_advances(word)):
+        if i > start and piece_width + advance > limit:
+            pieces.append((word[start:i], piece_width))
+            start, piece_width = i, 0.0
+        piece_width += advance
+    pieces.append((word[start:], piece_width))
+    return pieces
@@ -0,0 +1,454 @@
+import sys
+import json
+import zlib
+import struct
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import fitz  # PyMuPDF
+from analysis_cache import hash_pdf
+from cache_directory import CacheDirectory
+
+try:
+    import numpy as np
+except ImportError:
+    # Pixel diffs fall back to pure Python (slower, same results)
+    np = None
+
+# Entry layout: MAGIC, then a zlib-compressed payload of
+#   uint32 metadata length | metadata JSON | grayscale samples of each page
+MAGIC = b"RRC1"
+
+# Rendering resolution; enough to see misplaced lines, cheap to render
+DEFAULT_DPI = 36
+
+# Gray levels two renderings may differ by before a pixel counts as changed
+# (anti-aliasing differs slightly when content is re-laid out)
+PIXEL_TOLERANCE = 48
+
+# Pixels darker than this are ink
+INK_LEVEL = 160
+
+# Part of a line box's height trimmed off top and bottom before overlap
+# tests; boxes of tightly set lines reach into each other this much
+LINE_SLACK = 0.15
+
+# Share of the smaller of two line boxes they must cover together to
+# count as overlapping text
+OVERLAP_RATIO = 0.1
+
+# Share of an inserted line's box that may have had ink under it before
+INK_RATIO = 0.05
+
+class TextLine(NamedTuple):
+    text: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+class PageSnapshot(NamedTuple):
+    """A page rendered in gray at low resolution, with its text lines"""
+    width: int
+    height: int
+    samples: bytes
+    lines: List[TextLine]
+
+def snapshot_pdf(pdf_path: str, dpi: int = DEFAULT_DPI) -> List[PageSnapshot]:
+    """Render every page of a PDF and extract its text lines"""
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            lines = []
+            for block in page.get_text("dict", flags=0)["blocks"]:
+                for line in block.get("lines", []):
+                    text = "".join(span["text"] for span in line["spans"]).strip()
+                    if text:
+                        lines.append(TextLine(text, *line["bbox"]))
+            pages.append(PageSnapshot(pix.width, pix.height, pix.samples, lines))
+    return pages
+
+class RenderCache:
+    """
+    Persistent, size-bounded cache of page snapshots
+
+    Entries are keyed by PDF content hash and resolution, so inputs shared
+    by many runs and outputs that did not change since the last run are
+    rendered once. Least recently used entries are evicted once the
+    directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = ".render_cache", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = CacheDirectory(cache_dir, "*.rrc", max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, content_hash: str, dpi: int) -> Path:
+        return self.directory.path(f"{content_hash}.d{dpi}.rrc")
+
+    def snapshot(self, pdf_path: str, dpi: int = DEFAULT_DPI) -> List[PageSnapshot]:
+        """Snapshots of every page, rendered only on a cache miss"""
+        path = self._entry_path(hash_pdf(pdf_path), dpi)
+        try:
+            with open(path, 'rb') as f:
+                pages = self._decode(f.read())
+            self.directory.touch(path)
+            self.hits += 1
+            return pages
+        except (OSError, ValueError, zlib.error, struct.error, KeyError):
+            self.misses += 1
+
+        pages = snapshot_pdf(pdf_path, dpi)
+        self.directory.write(path, self._encode(pages), "render")
+        return pages
+
+    @staticmethod
+    def _encode(pages: List[PageSnapshot]) -> bytes:
+        meta = [{"width": p.width, "height": p.height, "lines": [list(line) for line in p.lines]}
+                for p in pages]
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        parts = [struct.pack("<I", len(meta_bytes)), meta_bytes]
+        parts.extend(p.samples for p in pages)
+        return MAGIC + zlib.compress(b"".join(parts), 6)
+
+    @staticmethod
+    def _decode(data: bytes) -> List[PageSnapshot]:
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a render cache entry")
+
+        payload = zlib.decompress(data[len(MAGIC):])
+        (meta_len,) = struct.unpack_from("<I", payload)
+        offset = 4 + meta_len
+        pages = []
+        for page in json.loads(payload[4:offset].decode("utf-8")):
+            size = page["width"] * page["height"]
+            samples = payload[offset:offset + size]
+            if len(samples) != size:
+                raise ValueError("Truncated render cache entry")
+            offset += size
+            lines = [TextLine(*line) for line in page["lines"]]
+            pages.append(PageSnapshot(page["width"], page["height"], samples, lines))
+        return pages
+
+def pixel_diff(before: PageSnapshot, after: PageSnapshot,
+               tolerance: int = PIXEL_TOLERANCE) -> Tuple[int, Optional[Tuple[int, int, int, int]]]:
+    """
+    Changed pixels between two renderings of a page
+
+    Returns:
+        Tuple of (number of changed pixels, their bounding box in pixels
+        as (x0, y0, x1, y1), or None if nothing changed)
+    """
+    if (before.width, before.height) != (after.width, after.height):
+        return after.width * after.height, (0, 0, after.width, after.height)
+    width = before.width
+
+    if np is not None:
+        a = np.frombuffer(before.samples, np.uint8).reshape(before.height, width).astype(np.int16)
+        b = np.frombuffer(after.samples, np.uint8).reshape(after.height, width).astype(np.int16)
+        changed = np.abs(a - b) > tolerance
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            return 0, None
+        cols = np.flatnonzero(changed.any(axis=0))
+        return int(changed.sum()), (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+    count = 0
+    x0 = y0 = sys.maxsize
+    x1 = y1 = -1
+    for y in range(before.height):
+        start = y * width
+        row_a = before.samples[start:start + width]
+        row_b = after.samples[start:start + width]
+        # Most rows are untouched; compare them as a whole first
+        if row_a == row_b:
+            continue
+        xs = [x for x, (p, q) in enumerate(zip(row_a, row_b)) if abs(p - q) > tolerance]
+        if xs:
+            count += len(xs)
+            x0, x1 = min(x0, xs[0]), max(x1, xs[-1] + 1)
+            y0, y1 = min(y0, y), y + 1
+    if not count:
+        return 0, None
+    return count, (x0, y0, x1, y1)
+
+def ink_ratio(snapshot: PageSnapshot, rect: Tuple[float, float, float, float], scale: float) -> float:
+    """Share of rect (in points) that is ink in the rendering"""
+    x0 = max(0, int(rect[0] * scale))
+    x1 = min(snapshot.width, int(rect[2] * scale) + 1)
+    y0 = max(0, int(rect[1] * scale))
+    y1 = min(snapshot.height, int(rect[3] * scale) + 1)
+    if x1 <= x0 or y1 <= y0:
+        return 0.0
+
+    if np is not None:
+        pixels = np.frombuffer(snapshot.samples, np.uint8).reshape(snapshot.height, snapshot.width)
+        return float((pixels[y0:y1, x0:x1] < INK_LEVEL).mean())
+    dark = 0
+    for y in range(y0, y1):
+        start = y * snapshot.width
+        dark += sum(1 for p in snapshot.samples[start + x0:start + x1] if p < INK_LEVEL)
+    return dark / ((x1 - x0) * (y1 - y0))
+
+def snapshot_without_lines(pdf_path: str, page_num: int, lines: List[TextLine],
+                           dpi: int = DEFAULT_DPI) -> PageSnapshot:
+    """
+    Render a page with the text of the given lines removed
+
+    Drawings and images are left alone, so this shows what the lines were
+    drawn over: on a reflowed page, the original content where it moved to.
+    """
+    with fitz.open(pdf_path) as doc:
+        page = doc[page_num]
+        for line in lines:
+            page.add_redact_annot(fitz.Rect(_trimmed(line)), fill=False, cross_out=False)
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE,
+                              graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                              text=fitz.PDF_REDACT_TEXT_REMOVE)
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        return PageSnapshot(pix.width, pix.height, pix.samples, [])
+
+def _trimmed(line: TextLine) -> Tuple[float, float, float, float]:
+    slack = (line.y1 - line.y0) * LINE_SLACK
+    return (line.x0, line.y0 + slack, line.x1, line.y1 - slack)
+
+def overlap_ratio(a: TextLine, b: TextLine) -> float:
+    """Share of the smaller line box the two cover together (trimmed by LINE_SLACK)"""
+    ax0, ay0, ax1, ay1 = _trimmed(a)
+    bx0, by0, bx1, by1 = _trimmed(b)
+    width = min(ax1, bx1) - max(ax0, bx0)
+    height = min(ay1, by1) - max(ay0, by0)
+    if width <= 0 or height <= 0:
+        return 0.0
+    smaller = min((ax1 - ax0) * (ay1 - ay0), (bx1 - bx0) * (by1 - by0))
+    return width * height / smaller if smaller > 0 else 0.0
+
+def _bbox(line: TextLine) -> List[float]:
+    return [round(line.x0, 1), round(line.y0, 1), round(line.x1, 1), round(line.y1, 1)]
+
+def _same_place(a: TextLine, b: TextLine, tolerance: float = 1.0) -> bool:
+    return abs(a.x0 - b.x0) <= tolerance and abs(a.y0 - b.y0) <= tolerance
+
+def classify_lines(before: List[PageSnapshot], after: List[PageSnapshot]) -> List[Dict[int, str]]:
+    """
+    Label every line of the edited document against the original
+
+    A line is "unchanged" if the original has the same text at the same
+    spot on that page, "moved" if the original has the text elsewhere
+    (reflow), else "inserted".
+
+    Returns:
+        Per edited page, line index -> label
+    """
+    remaining = Counter(line.text for page in before for line in page.lines)
+    labels: List[Dict[int, str]] = [{} for _ in after]
+    for page_num, page in enumerate(after):
+        originals = before[page_num].lines if page_num < len(before) else []
+        for i, line in enumerate(page.lines):
+            if any(o.text == line.text and _same_place(o, line) for o in originals):
+                labels[page_num][i] = "unchanged"
+                remaining[line.text] -= 1
+    for page_num, page in enumerate(after):
+        for i, line in enumerate(page.lines):
+            if i in labels[page_num]:
+                continue
+            if remaining[line.text] > 0:
+                labels[page_num][i] = "moved"
+                remaining[line.text] -= 1
+            else:
+                labels[page_num][i] = "inserted"
+    return labels
+
+def compare_pdfs(original_path: str, edited_path: str, dpi: int = DEFAULT_DPI,
+                 cache: Optional[RenderCache] = None) -> Dict:
+    """
+    Compare an edited resume with its original, page by page
+
+    Pixel diffs show where each page changed. Text lines are matched by
+    content, and inserted or moved lines are checked against the other
+    lines of their page: one drawn over another is reported as an
+    overlap. An inserted line drawn over ink of the original page (a
+    picture, rule or text) is reported as well, unless it replaces a line
+    that started at the same spot. On pages content moved onto or off
+    (reflow) and on added pages, what was under an inserted line may have
+    moved, so it is checked against the edited page with the inserted
+    lines removed instead: the original content where it ended up.
+
+    Args:
+        original_path: The input PDF
+        edited_path: The edited PDF
+        dpi: Rendering resolution
+        cache: Optional cache of page snapshots
+
+    Returns:
+        Dict: Per-page diffs and the overall verdict ("flagged")
+    """
+    if cache:
+        before, after = cache.snapshot(original_path, dpi), cache.snapshot(edited_path, dpi)
+    else:
+        before, after = snapshot_pdf(original_path, dpi), snapshot_pdf(edited_path, dpi)
+    scale = dpi / 72
+    labels = classify_lines(before, after)
+    edited_texts = Counter(line.text for page in after for line in page.lines)
+
+    report = {
+        "original": str(original_path),
+        "edited": str(edited_path),
+        "pages_before": len(before),
+        "pages_after": len(after),
+        "pages": [],
+        "overlaps": 0,
+        "ink_overlaps": 0
+    }
+    for page_num, page in enumerate(after):
+        original = before[page_num] if page_num < len(before) else None
+        blank = PageSnapshot(page.width, page.height, b"\xff" * (page.width * page.height), [])
+        changed, box = pixel_diff(original or blank, page)
+        page_labels = labels[page_num]
+
+        overlaps = []
+        for i, line in enumerate(page.lines):
+            label = page_labels[i]
+            if label == "unchanged":
+                continue
+            for j, other in enumerate(page.lines):
+                other_label = page_labels[j]
+                # Lines moved together keep their original spacing, and
+                # each pair of inserted lines is seen twice
+                if j == i or (label == other_label and (label == "moved" or j < i)):
+                    continue
+                # A replacement drawn where the old line starts (the old
+                # one is covered, not visible)
+                if label == "inserted" and other_label == "unchanged" and _same_place(line, other):
+                    continue
+                if overlap_ratio(line, other) > OVERLAP_RATIO:
+                    overlaps.append({"line": line.text, "other": other.text,
+                                     "bbox": _bbox(line), "other_bbox": _bbox(other)})
+
+        ink_overlaps = []
+        inserted = [line for i, line in enumerate(page.lines) if page_labels[i] == "inserted"]
+        # Content moved onto or off the page
+        reflowed = original is None or "moved" in page_labels.values() or any(
+            edited_texts[o.text] and not any(o.text == line.text and _same_place(o, line)
+                                             for line in page.lines)
+            for o in original.lines
+        )
+        if inserted and reflowed:
+            shifted = snapshot_without_lines(edited_path, page_num, inserted, dpi)
+            for line in inserted:
+                coverage = ink_ratio(shifted, _trimmed(line), scale)
+                if coverage > INK_RATIO:
+                    ink_overlaps.append({"line": line.text, "bbox": _bbox(line),
+                                         "coverage": round(coverage, 3)})
+        elif inserted:
+            replaced = [o for o in original.lines if edited_texts[o.text] == 0]
+            for line in inserted:
+                if any(_same_place(line, o) for o in original.lines):
+                    continue
+                # Ink of removed lines (redacted text) does not count
+                if any(overlap_ratio(line, o) > 0 for o in replaced):
+                    continue
+                coverage = ink_ratio(original, _trimmed(line), scale)
+                if coverage > INK_RATIO:
+                    ink_overlaps.append({"line": line.text, "bbox": _bbox(line),
+                                         "coverage": round(coverage, 3)})
+
+        counts = Counter(page_labels.values())
+        report["pages"].append({
+            "page": page_num,
+            "changed_pixels": round(changed / (page.width * page.height), 4),
+            "changed_bbox": [round(v / scale, 1) for v in box] if box else None,
+            "inserted": counts["inserted"],
+            "moved": counts["moved"],
+            "overlaps": overlaps,
+            "ink_overlaps": ink_overlaps
+        })
+        report["overlaps"] += len(overlaps)
+        report["ink_overlaps"] += len(ink_overlaps)
+
+    report["flagged"] = bool(report["overlaps"] or report["ink_overlaps"])
+    return report
+
+def find_pairs(input_dir: str, output_dir: str) -> List[Tuple[Path, Path]]:
+    """(original, edited) pairs, matched by the batch processor's output naming"""
+    pairs = []
+    for original in sorted(Path(input_dir).glob("*.pdf")):
+        edited = Path(output_dir) / f"edited_{original.name}"
+        if edited.exists():
+            pairs.append((original, edited))
+    return pairs
+
+# Per-process cache used by pool workers (set by _init_worker)
+_worker_cache: Optional[RenderCache] = None
+
+def _init_worker(cache: Optional[RenderCache]):
+    global _worker_cache
+    _worker_cache = cache
+
+def _compare_in_worker(pair: Tuple[Path, Path], dpi: int) -> Dict:
+    return compare_pdfs(str(pair[0]), str(pair[1]), dpi, _worker_cache)
+
+def _print_report(report: Dict):
+    name = Path(report["original"]).name
+    pages = f"{report['pages_before']}→{report['pages_after']} pages"
+    if not report["flagged"]:
+        print(f"✅ {name}: {pages}, no overlapping text")
+        return
+    print(f"⚠️  {name}: {pages}, {report['overlaps']} overlap(s), "
+          f"{report['ink_overlaps']} drawn over existing ink")
+    for page in report["pages"]:
+        for overlap in page["overlaps"]:
+            print(f"     page {page['page'] + 1}: '{overlap['line'][:50]}' over '{overlap['other'][:50]}'")
+        for overlap in page["ink_overlaps"]:
+            print(f"     page {page['page'] + 1}: '{overlap['line'][:50]}' "
+                  f"over ink ({overlap['coverage']:.0%})")
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compare edited resumes with their originals")
+    parser.add_argument("original", help="Original resume, or a directory of them")
+    parser.add_argument("edited", help="Edited resume, or a directory of edited_<name>.pdf")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                        help=f"Rendering resolution (default: {DEFAULT_DPI})")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Reuse page renderings stored in this directory")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Render cache size limit in MB (default: 256)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--report", metavar="JSONL", help="Write one JSON diff per file here")
+    args = parser.parse_args()
+
+    cache = RenderCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    if Path(args.original).is_file():
+        pairs = [(Path(args.original), Path(args.edited))]
+    else:
+        pairs = find_pairs(args.original, args.edited)
+    if not pairs:
+        print(f"❌ No edited_<name>.pdf outputs in {args.edited} for {args.original}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(cache,)) as pool:
+            reports = list(pool.map(_compare_in_worker, pairs, [args.dpi] * len(pairs),
+                                    chunksize=8))
+    else:
+        reports = [compare_pdfs(str(a), str(b), args.dpi, cache) for a, b in pairs]
+    elapsed = time.perf_counter() - start
+
+    for report in reports:
+        _print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            for report in reports:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+
+    flagged = sum(1 for r in reports if r["flagged"])
+    print(f"\n📊 {len(reports)} file(s) compared in {elapsed:.2f}s, {flagged} flagged")
+    if cache and args.workers <= 1:
+        print(f"   Render cache: {cache.hits} hits, {cache.misses} misses")
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,141 @@
+import json
+import time
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+class WorkQueue:
+    """
+    Durable work queue shared by a coordinator and any number of workers
+
+    Backed by a single SQLite file, so workers on different hosts only need
+    the same mount (one with working POSIX locks). A claimed file is leased
+    for lease_seconds; if its worker dies or stalls the lease expires and
+    the file is handed out again, up to max_attempts claims in total.
+
+    Filenames are stored relative to the input directory, so hosts may
+    mount the shared directories at different paths.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Autocommit mode; write transactions are opened explicitly with
+        # BEGIN IMMEDIATE so two workers can never claim the same row.
+        # The default rollback journal is kept: WAL does not work over
+        # network filesystems.
+        self._conn = sqlite3.connect(str(self.db_path), timeout=60, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT UNIQUE NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, seq)")
+
+    def enqueue(self, filenames: Iterable[str]) -> int:
+        """Add files to the queue (already queued ones are left alone); returns how many were new"""
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (filename) VALUES (?)",
+                ((name,) for name in filenames)
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return self._conn.total_changes - before
+
+    def claim(self, worker: str) -> Optional[str]:
+        """
+        Lease the next pending (or expired) file to worker
+
+        Returns:
+            The filename, or None if nothing is claimable right now
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT seq, filename, state, attempts FROM tasks "
+                    "WHERE state = 'pending' OR (state = 'claimed' AND lease_until < ?) "
+                    "ORDER BY seq LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                seq, filename, state, attempts = row
+                if state == "claimed" and attempts >= self.max_attempts:
+                    # Expired too often: give up on it rather than let it
+                    # take down workers forever
+                    result = {"filename": Path(filename).name, "success": False,
+                              "experience_added": False, "skills_modified": 0,
+                              "certifications_added": 0,
+                              "errors": [f"Claim expired {attempts} times"]}
+                    self._conn.execute(
+                        "UPDATE tasks SET state = 'failed', worker = NULL, lease_until = NULL, "
+                        "result = ? WHERE seq = ?",
+                        (json.dumps(result, ensure_ascii=False), seq)
+                    )
+                    continue
+
+                self._conn.execute(
+                    "UPDATE tasks SET state = 'claimed', worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1 WHERE seq = ?",
+                    (worker, now + self.lease_seconds, seq)
+                )
+                self._conn.execute("COMMIT")
+                return filename
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def ack(self, filename: str, worker: str, result: Dict) -> bool:
+        """
+        Record the result for a file claimed by worker
+
+        Returns:
+            bool: False if the claim had already expired and moved on, in
+            which case the result is discarded
+        """
+        cursor = self._conn.execute(
+            "UPDATE tasks SET state = ?, result = ?, worker = NULL, lease_until = NULL "
+            "WHERE filename = ? AND worker = ? AND state = 'claimed'",
+            ("done" if result.get("success") else "failed",
+             json.dumps(result, ensure_ascii=False), filename, worker)
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        """Number of files per state: pending, claimed, done, failed"""
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        for state, count in self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def outstanding(self) -> int:
+        """Files not yet finished (pending or claimed)"""
+        counts = self.counts()
+        return counts["pending"] + counts["claimed"]
+
+    def results(self) -> Iterator[Dict]:
+        """Results of finished files, in enqueue order"""
+        for (result,) in self._conn.execute(
+            "SELECT result FROM tasks WHERE result IS NOT NULL ORDER BY seq"
+        ):
+            yield json.loads(result)
+
+    def close(self):
+        self._conn.close()